@@ -5,7 +5,8 @@
 
 # Purpose:
 # Given coastal river discharge output files from previous scripts, calculate
-# global discharge to the ocean summary terms for each sampling scenario.
+# global discharge to the ocean summary terms for each sampling scenario. All
+# regions are summarized at once with vectorized reductions (see mws_sum.py).
 
 # Author:
 # Jeffrey Wade, Cedric H. David, 2025
@@ -13,11 +14,9 @@
 # ******************************************************************************
 # Import packages
 # ******************************************************************************
-import pandas as pd
-import numpy as np
-import glob
 import sys
 import os
+import mws_sum
 
 
 # ******************************************************************************
@@ -28,14 +27,18 @@ import os
 # 3 - Qout_prop_out
 # 4 - Qout_range_out
 # 5 - Qout_range_prop_out
+# 6 - Qout_npz (optional, regional Qout cached and updated for changed regions,
+#     or 'no_Qout_npz')
+# 7 - Qout_var_out (optional, variability statistics by calendar and water
+#     year)
 
 
 # ******************************************************************************
 # Get command line arguments
 # ******************************************************************************
 IS_arg = len(sys.argv)
-if IS_arg != 6:
-    print('ERROR - 5 arguments must be used')
+if (IS_arg < 6) or (IS_arg > 8):
+    print('ERROR - 5, 6, or 7 arguments must be used')
     raise SystemExit(22)
 
 Qout_rivwid_csv = sys.argv[1]
@@ -44,6 +47,15 @@ Qout_prop_out = sys.argv[3]
 Qout_range_out = sys.argv[4]
 Qout_range_prop_out = sys.argv[5]
 
+# Allow option of caching regional Qout
+Qout_npz = None
+if IS_arg >= 7 and sys.argv[6] != 'no_Qout_npz':
+    Qout_npz = sys.argv[6]
+
+# Allow option of writing variability statistics
+if IS_arg == 8:
+    Qout_var_out = sys.argv[7]
+
 
 # ******************************************************************************
 # Check if files/folders exist
@@ -63,13 +75,9 @@ print('- Reading files')
 # ------------------------------------------------------------------------------
 # Qout to ocean: Rivwidth
 # ------------------------------------------------------------------------------
-Qout_rivwid_files = list(glob.iglob(Qout_rivwid_csv+'*'))
-Qout_rivwid_files.sort()
-Qout_rivwid = [pd.read_csv(j) for j in Qout_rivwid_files]
-
-# Retrieve numbers of pfafs
-pfaf_list = pd.Series([x.partition("pfaf_")[-1][0:2] for x in
-                       Qout_rivwid_files]).sort_values(ignore_index=True)
+# All regions are loaded into one (region x time x scenario) array, only
+# changed regions are read again if cached
+IM_Qout_rivwid = mws_sum.sum_read(Qout_rivwid_csv, Qout_npz)
 
 
 # ******************************************************************************
@@ -79,69 +87,19 @@ print('- Computing global Q summary')
 # ------------------------------------------------------------------------------
 # Qout Global Summary
 # ------------------------------------------------------------------------------
-# Set max river width scenario
-n_s = 500
-
-# Set river width step size
-step = 5
-
-# Set river width scenario values
-wid_scen = list(range(n_s, -1, -step))
-
-# Create dataframe to store meanQ values for each region
-Q_df = pd.DataFrame(index=["wid_" + str(x) for x in
-                           (wid_scen)], columns=range(len(pfaf_list)))
+# Mean of each region, proportion of Q to ocean captured by each scenario, and
+# mean annual range of total global Q to ocean at each time step
+IM_Q_glb = mws_sum.sum_glb(IM_Qout_rivwid['val'])
 
-# Give column names
-pfaf_str = ('pfaf_' + pfaf_list).tolist()
-Q_df.columns = pfaf_str
-
-# Calculate mean of each scenario across times steps and store in Q_df
-for i in range(len(pfaf_list)):
-    temp_df = Qout_rivwid[i].select_dtypes(include=['float64'])
-    Q_df.iloc[:, i] = np.mean(temp_df, axis=0)
-
-# Write file to csv
-Q_df.to_csv(Qout_out)
-
-# ------------------------------------------------------------------------------
-# Calculate proportion of Q to ocean captured by each scenario
-# ------------------------------------------------------------------------------
-Q_sum_global = np.sum(Q_df, axis=1)
-Q_prop = 100 * Q_sum_global / Q_sum_global.iloc[len(wid_scen) - 1]
-
-# Write file to csv
-Q_prop.to_csv(Qout_prop_out)
+# Write files to csv
+mws_sum.sum_write(IM_Q_glb, IM_Qout_rivwid, Qout_out, Qout_prop_out,
+                  Qout_range_out, Qout_range_prop_out)
 
 # ------------------------------------------------------------------------------
-# Calculate total global Q to ocean at each time step for each scenario
+# Qout variability statistics
 # ------------------------------------------------------------------------------
-# Initialize dataframe to store global Q values
-Q_global = pd.DataFrame(np.zeros(Qout_rivwid[0].shape))
-
-# Set column names
-Q_global.columns = Qout_rivwid[0].columns
-
-# Set time column
-Q_global.time = Qout_rivwid[0].time
-
-# Loop through pfaf regions
-for j in range(len(Qout_rivwid)):
-
-    # Sum Q to ocean at each time step for each river width scenario
-    Q_global.iloc[:, 1:] = Q_global.iloc[:, 1:] + Qout_rivwid[j].iloc[:, 1:]
-
-# Summarize Q mean annual range for river width scenarios
-Q_range = []
-chunk = 12
-for i in range(1, Q_global.shape[1]):
-    Q_slice = Q_global.iloc[:, i].values.reshape(-1, chunk)
-    Q_range.append(np.mean(Q_slice.max(axis=1) - Q_slice.min(axis=1)))
-
-# Calculate proportion of Q range of each scenario compared to global range
-Q_range_prop = 100 * pd.Series(Q_range/Q_range[-1])
-Q_range = pd.Series(Q_range)
-
-# Write files to csv
-Q_range.to_csv(Qout_range_out)
-Q_range_prop.to_csv(Qout_range_prop_out)
+# All statistics of all scenarios by calendar and water year, complete years
+# only
+if IS_arg == 8:
+    IM_Q_vtb = mws_sum.sum_vtb(IM_Q_glb['glb'], IM_Qout_rivwid['time'])
+    mws_sum.sum_vwr(IM_Q_vtb, IM_Qout_rivwid, Qout_var_out)
@@ -5,7 +5,9 @@
 
 # Purpose:
 # Given river volume output files from previous scripts, calculate global V
-# summary terms for each sampling scenario.
+# summary terms for each sampling scenario. All regions and the three volume
+# scenarios are summarized at once with vectorized reductions (see
+# mws_sum.py).
 
 # Author:
 # Jeffrey Wade, Cedric H. David, 2025
@@ -13,11 +15,9 @@
 # ******************************************************************************
 # Import packages
 # ******************************************************************************
-import pandas as pd
-import numpy as np
-import glob
 import sys
 import os
+import mws_sum
 
 
 # ******************************************************************************
@@ -38,14 +38,26 @@ import os
 # 13 - V_low_range_prop_out
 # 14 - V_nrm_range_prop_out
 # 15 - V_hig_range_prop_out
+# 16 - V_low_npz (optional, regional V cached and updated for changed regions,
+#      or 'no_V_low_npz')
+# 17 - V_nrm_npz (optional, regional V cached and updated for changed regions,
+#      or 'no_V_nrm_npz')
+# 18 - V_hig_npz (optional, regional V cached and updated for changed regions,
+#      or 'no_V_hig_npz')
+# 19 - V_low_var_out (optional, variability statistics by calendar and water
+#      year)
+# 20 - V_nrm_var_out (optional, variability statistics by calendar and water
+#      year)
+# 21 - V_hig_var_out (optional, variability statistics by calendar and water
+#      year)
 
 
 # ******************************************************************************
 # Get command line arguments
 # ******************************************************************************
 IS_arg = len(sys.argv)
-if IS_arg != 16:
-    print('ERROR - 15 arguments must be used')
+if IS_arg not in [16, 19, 22]:
+    print('ERROR - 15, 18, or 21 arguments must be used')
     raise SystemExit(22)
 
 V_rivwid_low_csv = sys.argv[1]
@@ -64,6 +76,22 @@ V_low_range_prop_out = sys.argv[13]
 V_nrm_range_prop_out = sys.argv[14]
 V_hig_range_prop_out = sys.argv[15]
 
+# Allow option of caching regional V
+V_low_npz, V_nrm_npz, V_hig_npz = None, None, None
+if IS_arg >= 19:
+    if sys.argv[16] != 'no_V_low_npz':
+        V_low_npz = sys.argv[16]
+    if sys.argv[17] != 'no_V_nrm_npz':
+        V_nrm_npz = sys.argv[17]
+    if sys.argv[18] != 'no_V_hig_npz':
+        V_hig_npz = sys.argv[18]
+
+# Allow option of writing variability statistics
+if IS_arg == 22:
+    V_low_var_out = sys.argv[19]
+    V_nrm_var_out = sys.argv[20]
+    V_hig_var_out = sys.argv[21]
+
 
 # ******************************************************************************
 # Check if files/folders exist
@@ -97,21 +125,13 @@ print('- Reading files')
 # ------------------------------------------------------------------------------
 # Total V: Rivwidth
 # ------------------------------------------------------------------------------
-V_rivwid_low_files = list(glob.iglob(V_rivwid_low_csv+'*'))
-V_rivwid_low_files.sort()
-V_rivwid_low = [pd.read_csv(j) for j in V_rivwid_low_files]
-
-V_rivwid_nrm_files = list(glob.iglob(V_rivwid_nrm_csv+'*'))
-V_rivwid_nrm_files.sort()
-V_rivwid_nrm = [pd.read_csv(j) for j in V_rivwid_nrm_files]
-
-V_rivwid_hig_files = list(glob.iglob(V_rivwid_hig_csv+'*'))
-V_rivwid_hig_files.sort()
-V_rivwid_hig = [pd.read_csv(j) for j in V_rivwid_hig_files]
+# All regions of the low, normal, and high volume scenarios are loaded into one
+# (volume x region x time x scenario) array, only changed regions are read
+# again if cached
+IM_V_rivwid = mws_sum.sum_stk([mws_sum.sum_read(V_rivwid_low_csv, V_low_npz),
+                               mws_sum.sum_read(V_rivwid_nrm_csv, V_nrm_npz),
+                               mws_sum.sum_read(V_rivwid_hig_csv, V_hig_npz)])
 
-# Retrieve numbers of pfafs
-pfaf_list = pd.Series([x.partition("pfaf_")[-1][0:2] for x in
-                       V_rivwid_low_files]).sort_values(ignore_index=True)
 
 # ******************************************************************************
 # Generate V summary files
@@ -120,94 +140,32 @@ print('- Computing global V summary')
 # ------------------------------------------------------------------------------
 # V Global Summary
 # ------------------------------------------------------------------------------
-# Set max river width scenario
-n_s = 500
-
-# Set river width step size
-step = 5
-
-# Set river width scenario values
-wid_scen = list(range(n_s, -1, -step))
-
-
-def Vsum(V_in, V_out, V_prop_out, V_range_out, V_range_prop_out):    
-
-    # Create dataframe to store V values for each region
-    V_df = pd.DataFrame(index=["wid_" + str(x) for x in
-                               (wid_scen)], columns=range(len(V_in)))
-
-    # Give column names
-    pfaf_str = ('pfaf_' + pfaf_list).tolist()
-    V_df.columns = pfaf_str
-
-    # Calculate mean of each scenario across times steps and store in V_df
-    for i in range(len(V_in)):
-        temp_df = V_in[i].select_dtypes(include=['float64'])
-        V_df.iloc[:, i] = np.mean(temp_df, axis=0)
-
-    # Write file to csv
-    V_df.to_csv(V_out)
-
-    # --------------------------------------------------------------------------
-    # Calculate proportion of V to ocean captured by each scenario
-    # --------------------------------------------------------------------------
-    V_sum_global = np.sum(V_df, axis=1)
-    V_prop = 100 * V_sum_global/V_sum_global.iloc[len(wid_scen)-1]
-
-    # Write to file
-    V_prop.to_csv(V_prop_out)
-
-    # --------------------------------------------------------------------------
-    # Calculate total global V at each time step for each scenario
-    # --------------------------------------------------------------------------
-    # Initialize dataframe to store global V values
-    V_global = pd.DataFrame(np.zeros(V_in[0].shape))
-
-    # Set column names
-    V_global.columns = V_in[0].columns
-
-    # Set time column
-    V_global.time = V_in[0].time
-
-    # Loop through pfaf regions
-    for j in range(len(V_in)):
-
-        # Sum V at each time step for each river width scenario
-        V_global.iloc[:, 1:] = V_global.iloc[:, 1:] +                          \
-            V_in[j].iloc[:, 1:]
-
-    # --------------------------------------------------------------------------
-    # Calculate standard deviation of each river width scenario
-    # --------------------------------------------------------------------------
-    # Summarize V range for river width scenarios
-    V_range = []
-    chunk = 12
-    for i in range(1, V_global.shape[1]):
-        V_slice = V_global.iloc[:, i].values.reshape(-1, chunk)
-        V_range.append(np.mean(V_slice.max(axis=1) - V_slice.min(axis=1)))
-
-    # Calculate proportion of V range of each scenario compared to global range
-    V_range_prop = 100 * pd.Series(V_range/V_range[-1])
-    V_range = pd.Series(V_range)
-
-    # --------------------------------------------------------------------------
-    # Write files
-    # --------------------------------------------------------------------------
-    V_range.to_csv(V_range_out)
-    V_range_prop.to_csv(V_range_prop_out)
-
+# Summary terms of the three volume scenarios are computed in one call
+IM_V_glb = mws_sum.sum_glb(IM_V_rivwid['val'])
 
 # ------------------------------------------------------------------------------
-# Run volume summary functions
+# Write files
 # ------------------------------------------------------------------------------
-# V_low
-Vsum(V_rivwid_low, V_low_out, V_low_prop_out, V_low_range_out,
-     V_low_range_prop_out)
+V_out_all = [[V_low_out, V_low_prop_out, V_low_range_out,
+              V_low_range_prop_out],
+             [V_nrm_out, V_nrm_prop_out, V_nrm_range_out,
+              V_nrm_range_prop_out],
+             [V_hig_out, V_hig_prop_out, V_hig_range_out,
+              V_hig_range_prop_out]]
 
-# V_nrm
-Vsum(V_rivwid_nrm, V_nrm_out, V_nrm_prop_out, V_nrm_range_out,
-     V_nrm_range_prop_out)
+for i in range(len(V_out_all)):
+    mws_sum.sum_write({x: IM_V_glb[x][i] for x in IM_V_glb}, IM_V_rivwid,
+                      *V_out_all[i])
 
-# V_hig
-Vsum(V_rivwid_hig, V_hig_out, V_hig_prop_out, V_hig_range_out,
-     V_hig_range_prop_out)
+# ------------------------------------------------------------------------------
+# V variability statistics
+# ------------------------------------------------------------------------------
+# All statistics of all scenarios by calendar and water year, complete years
+# only, for the three volume scenarios at once
+if IS_arg == 22:
+    IM_V_vtb = mws_sum.sum_vtb(IM_V_glb['glb'], IM_V_rivwid['time'])
+
+    V_var_out_all = [V_low_var_out, V_nrm_var_out, V_hig_var_out]
+    for i in range(len(V_var_out_all)):
+        mws_sum.sum_vwr({x: IM_V_vtb[x][i] for x in IM_V_vtb}, IM_V_rivwid,
+                        V_var_out_all[i])
@@ -0,0 +1,264 @@
+# ******************************************************************************
+# mws_dis.py
+# ******************************************************************************
+
+# Purpose:
+# Functions shared by the mws_*.py scripts to dissolve MERIT-Basins catchments.
+# Catchments of a traced river network are merged bottom-up along the network:
+# the network is cut at major confluences into sub-basins of bounded size, the
+# catchments of independent sub-basins are merged in parallel, and the merged
+# polygon upstream of each cut is cached so that the basin of any outlet is
+# assembled from a few cached pieces instead of all of its catchments.
+# Catchments of several files (e.g. of all regions) are merged hierarchically:
+# each file is merged in a process pool, then results are merged pairwise until
+# a single polygon remains, intermediate results being spilled to disk so that
+# only the polygons being merged are held in memory.
+
+# Author:
+# Jeffrey Wade, Cedric H. David, 2025
+
+# ******************************************************************************
+# Import packages
+# ******************************************************************************
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import fiona
+import os
+import shapely.geometry
+import shapely.ops
+import shapely.wkb
+import tempfile
+
+
+# ******************************************************************************
+# Declaration of variables
+# ******************************************************************************
+# Minimum number of catchments upstream of a confluence for it to be cut
+IS_dis_blk = 10000
+
+
+# ******************************************************************************
+# Define function to fill holes of merged catchments
+# ******************************************************************************
+# Keep exterior rings only so that the dissolved basin has no interior holes
+def dis_fil(cat_merge):
+
+    if cat_merge.geom_type == 'Polygon':
+        cat_dis = shapely.geometry.Polygon(cat_merge.exterior)
+
+    if cat_merge.geom_type == 'MultiPolygon':
+        cat_dis = shapely.geometry.MultiPolygon(
+            shapely.geometry.Polygon(p.exterior) for p in cat_merge.geoms)
+
+    return cat_dis
+
+
+# ******************************************************************************
+# Define function to merge a list of geometries
+# ******************************************************************************
+def dis_uni(cat_geom):
+
+    return shapely.ops.unary_union(cat_geom)
+
+
+# ******************************************************************************
+# Define function to merge lists of geometries in a process pool
+# ******************************************************************************
+# The mws_*.py scripts run at module level and cannot be re-imported safely by
+# worker processes, so workers are forked from the parent
+def dis_map(cat_geom_lst, IS_cpu):
+
+    if IS_cpu <= 1 or len(cat_geom_lst) <= 1:
+        return [dis_uni(x) for x in cat_geom_lst]
+
+    with ProcessPoolExecutor(max_workers=min(IS_cpu, len(cat_geom_lst)),
+                             mp_context=multiprocessing.get_context('fork')
+                             ) as executor:
+        return list(executor.map(dis_uni, cat_geom_lst))
+
+
+# ******************************************************************************
+# Define function to dissolve catchments along a river network
+# ******************************************************************************
+# IV_riv_id:     COMIDs of reaches in the network
+# IV_riv_dwn_id: COMIDs of next downstream reaches (outlets point outside)
+# IM_cat_geom:   dictionary of catchment geometry of each COMID
+# IS_blk:        minimum number of catchments upstream of a cut confluence
+# IS_cpu:        number of processes used to merge sub-basins
+# Returns a dictionary describing the network in which 'cch' holds the merged
+# polygon upstream of each cut reach (including all outlets)
+def dis_net(IV_riv_id, IV_riv_dwn_id, IM_cat_geom, IS_blk=IS_dis_blk,
+            IS_cpu=1):
+
+    # --------------------------------------------------------------------------
+    # Build upstream lists of the network
+    # --------------------------------------------------------------------------
+    IS_riv_tot = len(IV_riv_id)
+
+    IM_hsh = {}
+    for JS_riv_tot in range(IS_riv_tot):
+        IM_hsh[IV_riv_id[JS_riv_tot]] = JS_riv_tot
+
+    IM_ups = [[] for JS_riv_tot in range(IS_riv_tot)]
+    IV_out = []
+    for JS_riv_tot in range(IS_riv_tot):
+        IS_dwn = IV_riv_dwn_id[JS_riv_tot]
+        if IS_dwn in IM_hsh:
+            IM_ups[IM_hsh[IS_dwn]].append(JS_riv_tot)
+        else:
+            IV_out.append(JS_riv_tot)
+
+    # --------------------------------------------------------------------------
+    # Order reaches so that downstream reaches come before upstream reaches
+    # --------------------------------------------------------------------------
+    IV_ord = []
+    IV_stk = list(IV_out)
+    while len(IV_stk) != 0:
+        JS_riv_tot = IV_stk.pop()
+        IV_ord.append(JS_riv_tot)
+        IV_stk.extend(IM_ups[JS_riv_tot])
+
+    # --------------------------------------------------------------------------
+    # Cut network at major confluences, walking from sources to outlets
+    # --------------------------------------------------------------------------
+    # Number of pieces (catchments or cached polygons) left to merge upstream
+    IV_cnt = [0] * IS_riv_tot
+    IV_cut = [False] * IS_riv_tot
+
+    for JS_riv_tot in IV_out:
+        IV_cut[JS_riv_tot] = True
+
+    for JS_riv_tot in reversed(IV_ord):
+        IS_cnt = 1 + sum(IV_cnt[x] for x in IM_ups[JS_riv_tot])
+        if len(IM_ups[JS_riv_tot]) >= 2 and IS_cnt >= IS_blk:
+            IV_cut[JS_riv_tot] = True
+        if IV_cut[JS_riv_tot]:
+            IS_cnt = 1
+        IV_cnt[JS_riv_tot] = IS_cnt
+
+    # --------------------------------------------------------------------------
+    # Assign each reach to the sub-basin of its closest downstream cut
+    # --------------------------------------------------------------------------
+    IV_pce = [0] * IS_riv_tot
+    IM_pce_geom = {}
+    IM_pce_ups = {}
+
+    for JS_riv_tot in IV_ord:
+        if IV_cut[JS_riv_tot]:
+            IV_pce[JS_riv_tot] = JS_riv_tot
+            IM_pce_geom[JS_riv_tot] = []
+            IM_pce_ups[JS_riv_tot] = []
+        else:
+            IV_pce[JS_riv_tot] = IV_pce[IM_hsh[IV_riv_dwn_id[JS_riv_tot]]]
+
+        if IV_cut[JS_riv_tot] and JS_riv_tot not in IV_out:
+            IS_dwn_pce = IV_pce[IM_hsh[IV_riv_dwn_id[JS_riv_tot]]]
+            IM_pce_ups[IS_dwn_pce].append(JS_riv_tot)
+
+        if IV_riv_id[JS_riv_tot] in IM_cat_geom:
+            IM_pce_geom[IV_pce[JS_riv_tot]].append(
+                IM_cat_geom[IV_riv_id[JS_riv_tot]])
+
+    # --------------------------------------------------------------------------
+    # Merge catchments of each sub-basin, independent sub-basins in parallel
+    # --------------------------------------------------------------------------
+    IV_pce_ord = [x for x in IV_ord if IV_cut[x]]
+    cat_pce = dis_map([IM_pce_geom[x] for x in IV_pce_ord], IS_cpu)
+
+    # --------------------------------------------------------------------------
+    # Cache merged polygon upstream of each cut, from sources to outlets
+    # --------------------------------------------------------------------------
+    IM_cch = {}
+    IM_pce = dict(zip(IV_pce_ord, cat_pce))
+
+    for JS_riv_tot in reversed(IV_pce_ord):
+        IM_cch[IV_riv_id[JS_riv_tot]] = dis_uni(
+            [IM_pce[JS_riv_tot]] +
+            [IM_cch[IV_riv_id[x]] for x in IM_pce_ups[JS_riv_tot]])
+
+    return {'id': IV_riv_id, 'hsh': IM_hsh, 'ups': IM_ups, 'cut': IV_cut,
+            'out': [IV_riv_id[x] for x in IV_out], 'geom': IM_cat_geom,
+            'cch': IM_cch}
+
+
+# ******************************************************************************
+# Define functions to spill merged geometries to disk and load them back
+# ******************************************************************************
+def dis_spl(cat_merge, tmp_fp):
+
+    with open(tmp_fp, 'wb') as tmp:
+        tmp.write(shapely.wkb.dumps(cat_merge))
+
+    return tmp_fp
+
+
+def dis_lod(tmp_fp):
+
+    with open(tmp_fp, 'rb') as tmp:
+        cat_merge = shapely.wkb.loads(tmp.read())
+
+    os.remove(tmp_fp)
+
+    return cat_merge
+
+
+# ******************************************************************************
+# Define function to merge all catchments of a file and spill the result
+# ******************************************************************************
+def dis_shp(cat_fp, tmp_fp):
+
+    with fiona.open(cat_fp, 'r') as cat:
+        cat_geom = [shapely.geometry.shape(cat_fea['geometry'])
+                    for cat_fea in cat]
+
+    return dis_spl(dis_uni(cat_geom), tmp_fp)
+
+
+# ******************************************************************************
+# Define function to merge two spilled geometries and spill the result
+# ******************************************************************************
+def dis_two(tmp_fp_1, tmp_fp_2, tmp_fp):
+
+    return dis_spl(dis_uni([dis_lod(tmp_fp_1), dis_lod(tmp_fp_2)]), tmp_fp)
+
+
+# ******************************************************************************
+# Define function to merge catchments of several files hierarchically
+# ******************************************************************************
+# cat_files: shapefiles of catchments (e.g. one per region)
+# IS_cpu:    number of processes used to merge files and pairs of results
+# tmp_dir:   folder in which intermediate results are spilled (system default
+#            temporary folder if not given)
+def dis_glb(cat_files, IS_cpu=1, tmp_dir=None):
+
+    if len(cat_files) == 0:
+        print('ERROR - No catchment files to dissolve')
+        raise SystemExit(22)
+
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as tmp_pth, \
+        ProcessPoolExecutor(max_workers=max(IS_cpu, 1),
+                            mp_context=multiprocessing.get_context('fork')
+                            ) as executor:
+
+        # ----------------------------------------------------------------------
+        # Merge catchments of each file
+        # ----------------------------------------------------------------------
+        tmp_files = list(executor.map(
+            dis_shp, cat_files,
+            [os.path.join(tmp_pth, 'lvl0_'+str(j)+'.wkb')
+             for j in range(len(cat_files))]))
+
+        # ----------------------------------------------------------------------
+        # Merge pairs of results until one remains
+        # ----------------------------------------------------------------------
+        JS_lvl = 0
+        while len(tmp_files) > 1:
+            JS_lvl = JS_lvl+1
+            IS_two = len(tmp_files)//2
+            tmp_nxt = list(executor.map(
+                dis_two, tmp_files[0:2*IS_two:2], tmp_files[1:2*IS_two:2],
+                [os.path.join(tmp_pth, 'lvl'+str(JS_lvl)+'_'+str(j)+'.wkb')
+                 for j in range(IS_two)]))
+            tmp_files = tmp_nxt + tmp_files[2*IS_two:]
+
+        return dis_lod(tmp_files[0])
@@ -0,0 +1,213 @@
+# ******************************************************************************
+# mws_fig.py
+# ******************************************************************************
+
+# Purpose:
+# Functions shared by the mws_plots*.py scripts to write figures. The format of
+# each figure follows the extension of its file name (svg, png, or pdf). Two
+# output modes can be selected with the MWS_FIG_MODE environment variable:
+# 'vector' (default) draws all layers as vector elements, while 'hybrid' draws
+# the heavy layers of a figure (e.g. histogram bars and long time series) as
+# one embedded image and keeps axes, labels and legends as vector elements. The
+# resolution of png files and embedded images (dots per inch) can be selected
+# with the MWS_FIG_DPI environment variable. The exact data plotted in figures
+# can be stored with the content hash of their inputs, so that figures can be
+# restyled without computing their data again. Figures comparing datasets
+# across river width scenarios are rendered from compact specifications.
+
+# Author:
+# Jeffrey Wade, Cedric H. David, 2025
+
+# ******************************************************************************
+# Import packages
+# ******************************************************************************
+import hashlib
+import matplotlib.pyplot as plt
+import numpy as np
+import os
+
+
+# ******************************************************************************
+# Declaration of variables
+# ******************************************************************************
+IV_fig_fmt = ['svg', 'png', 'pdf']
+IV_fig_mode = ['vector', 'hybrid']
+
+fig_mode = os.environ.get('MWS_FIG_MODE', 'vector')
+if fig_mode not in IV_fig_mode:
+    print('ERROR - MWS_FIG_MODE must be one of '+', '.join(IV_fig_mode))
+    raise SystemExit(22)
+
+# Extensions of files that are not hashed as inputs of figure data (geometries
+# of shapefiles, which are never read by the plotting scripts)
+IV_fig_ign = ['.shp', '.shx']
+
+# The resolution of matplotlib is used unless given
+fig_dpi = os.environ.get('MWS_FIG_DPI')
+if fig_dpi is not None:
+    fig_dpi = float(fig_dpi)
+
+# River width scenarios of summary files (500m to 0m every 5m), and scenarios
+# shown as points in scenario-comparison figures (every 25m)
+ZV_fig_scn = np.arange(500, -1, -5)
+IV_fig_scn_pt = list(range(0, len(ZV_fig_scn), 5))
+
+
+# ******************************************************************************
+# Define function to write the current figure
+# ******************************************************************************
+# fig_out: file name of figure, with extension giving the format
+# IV_ras:  optional list of heavy artists (or containers of artists) that are
+#          rasterized in the hybrid mode
+def fig_save(fig_out, IV_ras=None):
+
+    fig_fmt = os.path.splitext(fig_out)[1][1:].lower()
+    if fig_fmt not in IV_fig_fmt:
+        print('ERROR - '+fig_out+' must have one of the extensions '
+              + ', '.join(IV_fig_fmt))
+        raise SystemExit(22)
+
+    if fig_mode == 'hybrid' and IV_ras is not None:
+        for ras in IV_ras:
+            for art in (ras if isinstance(ras, (list, tuple)) else [ras]):
+                art.set_rasterized(True)
+
+    plt.savefig(fig_out, format=fig_fmt, dpi=fig_dpi)
+
+
+# ******************************************************************************
+# Define function to hash inputs of figure data
+# ******************************************************************************
+# IV_in: list of input files, folders (all files within are hashed), or arrays
+#        of parameters (e.g. bins of a histogram)
+def fig_hsh(IV_in):
+
+    IM_hsh = hashlib.sha256()
+    for fig_in in IV_in:
+        if isinstance(fig_in, np.ndarray):
+            IM_hsh.update(str(fig_in.dtype).encode())
+            IM_hsh.update(np.ascontiguousarray(fig_in).tobytes())
+            continue
+
+        if os.path.isdir(fig_in):
+            fig_fps = sorted(os.path.join(x, y) for x, _, z in
+                             os.walk(fig_in) for y in z if
+                             os.path.splitext(y)[1].lower() not in IV_fig_ign)
+        else:
+            fig_fps = [fig_in]
+
+        for fig_fp in fig_fps:
+            IM_hsh.update(os.path.relpath(fig_fp, fig_in).encode())
+            with open(fig_fp, 'rb') as fig_fl:
+                for fig_chk in iter(lambda: fig_fl.read(1 << 20), b''):
+                    IM_hsh.update(fig_chk)
+
+    return IM_hsh.hexdigest()
+
+
+# ******************************************************************************
+# Define functions to save and load stored figure data
+# ******************************************************************************
+# IM_fig_dat: dictionary with, for each figure, the hash of its inputs and a
+#             dictionary of plotted arrays
+def fig_dat_save(IM_fig_dat, fig_npz):
+
+    IM_npz = {}
+    for fig in IM_fig_dat:
+        IM_npz[fig+'.hash'] = IM_fig_dat[fig][0]
+        for dat in IM_fig_dat[fig][1]:
+            IM_npz[fig+'.'+dat] = IM_fig_dat[fig][1][dat]
+
+    with open(fig_npz, 'wb') as fig_fl:
+        np.savez_compressed(fig_fl, **IM_npz)
+
+
+def fig_dat_load(fig_npz):
+
+    IM_fig_dat = {}
+    if fig_npz is None or not os.path.isfile(fig_npz):
+        return IM_fig_dat
+
+    with np.load(fig_npz) as fig_fl:
+        for fig_key in fig_fl.files:
+            fig, dat = fig_key.split('.', 1)
+            if fig not in IM_fig_dat:
+                IM_fig_dat[fig] = ('', {})
+            if dat == 'hash':
+                IM_fig_dat[fig] = (str(fig_fl[fig_key]), IM_fig_dat[fig][1])
+            else:
+                IM_fig_dat[fig][1][dat] = fig_fl[fig_key]
+
+    return IM_fig_dat
+
+
+# ******************************************************************************
+# Define function to retrieve stored figure data
+# ******************************************************************************
+# Returns the plotted arrays of a figure if they were stored for the same hash
+# of inputs, and None otherwise
+def fig_dat_get(IM_fig_dat, fig, hsh):
+
+    if IM_fig_dat.get(fig, ('',))[0] == hsh:
+        return IM_fig_dat[fig][1]
+
+    return None
+
+
+# ******************************************************************************
+# Define function to read series of scenario-comparison figures
+# ******************************************************************************
+# IV_fig:   list of figure specifications (see fig_cmp)
+# fig_read: function reading an input into a proportion table, whose second
+#           column holds values of all river width scenarios
+# Each input is read and sliced once, however many figures refer to it
+def fig_cmp_read(IV_fig, fig_read):
+
+    IM_pt = {}
+    for IM_fig in IV_fig:
+        for fig_in in IM_fig['in']:
+            if fig_in not in IM_pt:
+                IM_pt[fig_in] = fig_read(fig_in).iloc[IV_fig_scn_pt, 1]      \
+                    .to_numpy()
+
+    return IM_pt
+
+
+# ******************************************************************************
+# Define function to render a scenario-comparison figure
+# ******************************************************************************
+# IM_fig: figure specification, with:
+#         'out':     file name of figure
+#         'in':      inputs of series (keys of IM_pt), drawn in this order
+#         'sty':     styles of series, with 'label', 'color', and optional
+#                    'plot' and 'scatter' properties
+#         'ylabel':  label of y axis
+#         'ylim':    limits of y axis
+#         'plot':    optional line properties of all series
+#         'scatter': optional scatter properties of all series
+# IM_pt:  series of all inputs (see fig_cmp_read)
+def fig_cmp(IM_fig, IM_pt):
+
+    ZV_x = ZV_fig_scn[IV_fig_scn_pt]
+
+    fig, ax = plt.subplots()
+    for fig_in, IM_sty in zip(IM_fig['in'], IM_fig['sty']):
+        ax.plot(ZV_x, IM_pt[fig_in], color=IM_sty['color'],
+                label=IM_sty['label'], **IM_fig.get('plot', {}),
+                **IM_sty.get('plot', {}))
+        ax.scatter(ZV_x, IM_pt[fig_in], color=IM_sty['color'],
+                   label=IM_sty['label'], **IM_fig.get('scatter', {}),
+                   **IM_sty.get('scatter', {}))
+
+    ax.set_xlabel('Aggregation for All Rivers Wider Than Given Width (m)')
+    ax.set_ylabel(IM_fig['ylabel'])
+
+    ax.set_ylim(IM_fig['ylim'])
+    plt.xticks(rotation=0, ha='center')
+    plt.legend()
+
+    fig.tight_layout()
+    plt.gca().invert_xaxis()
+
+    fig_save(IM_fig['out'])
+    plt.close(fig)
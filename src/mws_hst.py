@@ -0,0 +1,226 @@
+# ******************************************************************************
+# mws_hst.py
+# ******************************************************************************
+
+# Purpose:
+# Functions shared by the mws_plots*.py scripts to build histograms of the
+# estimated width of all MeanDRS river reaches. Mean discharge is read in bulk
+# one region at a time, converted to width, and binned on the fly, so that no
+# global list of widths is held. Bins can be fixed, or depend on the smallest
+# and largest widths of all reaches, in which case widths are binned in a
+# second pass once these are known. Counts of each region can be cached with
+# the content hash of its attributes, so that only regions that changed are
+# read again.
+
+# Author:
+# Jeffrey Wade, Cedric H. David, 2025
+
+# ******************************************************************************
+# Import packages
+# ******************************************************************************
+import fiona
+import glob
+import hashlib
+import numpy as np
+import os
+import mws_tbl
+
+
+# ******************************************************************************
+# Define function to bin widths of a region
+# ******************************************************************************
+# ZV_wid: widths of reaches (m)
+# IM_bin: dictionary of bin edges, binned as in np.histogram (widths outside
+#         of edges are not counted)
+# Returns a dictionary with counts for each set of edges ('hst_<name>'), and
+# number, smallest and largest of positive widths ('n_wid', 'min_wid',
+# 'max_wid')
+def hst_cnt(ZV_wid, IM_bin):
+
+    ZV_wid = np.asarray(ZV_wid, dtype=np.float64)
+
+    IM_hst = {}
+    for hst in IM_bin:
+        IM_hst['hst_'+hst] = np.histogram(ZV_wid, bins=IM_bin[hst])[0]
+
+    ZV_wid = ZV_wid[ZV_wid > 0]
+    IM_hst['n_wid'] = len(ZV_wid)
+    IM_hst['min_wid'] = np.min(ZV_wid, initial=np.inf)
+    IM_hst['max_wid'] = np.max(ZV_wid, initial=0.)
+
+    return IM_hst
+
+
+# ******************************************************************************
+# Define function to merge histograms of several regions
+# ******************************************************************************
+def hst_add(IM_hst_all):
+
+    IM_hst = {}
+    for hst in IM_hst_all[0]:
+        if hst == 'min_wid':
+            IM_hst[hst] = min(x[hst] for x in IM_hst_all)
+        elif hst == 'max_wid':
+            IM_hst[hst] = max(x[hst] for x in IM_hst_all)
+        else:
+            IM_hst[hst] = np.sum([x[hst] for x in IM_hst_all], axis=0)
+
+    return IM_hst
+
+
+# ******************************************************************************
+# Define function to read mean discharge of a region in bulk
+# ******************************************************************************
+# Geometries and other attributes are not read
+def hst_riv_read(riv_fp):
+
+    with fiona.open(riv_fp, 'r') as riv:
+        riv_ign = [x for x in riv.schema['properties'] if x != 'meanQ']
+
+    with fiona.open(riv_fp, 'r', ignore_fields=riv_ign,
+                    ignore_geometry=True) as riv:
+        ZV_Q = np.fromiter((riv_fea['properties']['meanQ'] for riv_fea in riv),
+                           dtype=np.float64, count=len(riv))
+
+    return ZV_Q
+
+
+# ******************************************************************************
+# Define function to hash attributes of a region
+# ******************************************************************************
+# Mean discharge is stored in the dBASE file of each shapefile
+def hst_hsh(riv_fp):
+
+    IM_hsh = hashlib.sha256()
+    with open(os.path.splitext(riv_fp)[0]+'.dbf', 'rb') as riv_dbf:
+        for riv_chk in iter(lambda: riv_dbf.read(1 << 20), b''):
+            IM_hsh.update(riv_chk)
+
+    return IM_hsh.hexdigest()
+
+
+# ******************************************************************************
+# Define functions to save and load cached histograms of regions
+# ******************************************************************************
+def hst_save(IM_hst_reg, IM_bin, hst_npz):
+
+    IV_fl = list(IM_hst_reg)
+    IM_npz = {'fl': IV_fl, 'hash': [IM_hst_reg[x][0] for x in IV_fl]}
+    for hst in IM_hst_reg[IV_fl[0]][1]:
+        IM_npz[hst] = np.stack([IM_hst_reg[x][1][hst] for x in IM_hst_reg])
+    for hst in IM_bin:
+        IM_npz['bin_'+hst] = IM_bin[hst]
+
+    with open(hst_npz, 'wb') as hst_fl:
+        np.savez_compressed(hst_fl, **IM_npz)
+
+
+def hst_load(hst_npz):
+
+    with np.load(hst_npz) as hst_fl:
+        IM_bin = {x[4:]: hst_fl[x] for x in hst_fl.files if
+                  x.startswith('bin_')}
+        IV_hst = [x for x in hst_fl.files if x not in ['fl', 'hash'] and
+                  not x.startswith('bin_')]
+        IM_hst_reg = {}
+        for j, (fl, hsh) in enumerate(zip(hst_fl['fl'], hst_fl['hash'])):
+            IM_hst_reg[str(fl)] = (str(hsh), {x: hst_fl[x][j] for x in
+                                              IV_hst})
+
+    return IM_hst_reg, IM_bin
+
+
+# ******************************************************************************
+# Define function to retrieve bins depending on widths of all reaches
+# ******************************************************************************
+# Bins given as functions are computed from the smallest and largest positive
+# widths of all regions
+def hst_bin(IM_bin, IM_hst_all):
+
+    ZS_min = min(x['min_wid'] for x in IM_hst_all)
+    ZS_max = max(x['max_wid'] for x in IM_hst_all)
+
+    return {x: IM_bin[x](ZS_min, ZS_max) if callable(IM_bin[x]) else
+            IM_bin[x] for x in IM_bin}
+
+
+# ******************************************************************************
+# Define function to build histograms of widths of all MeanDRS reaches
+# ******************************************************************************
+# riv_in:  folder of uncorrected MeanDRS river shapefiles, or reach attribute
+#          table (see mws_tbl.py)
+# IM_bin:  dictionary of bin edges (see hst_cnt), or of functions returning
+#          bin edges given the smallest and largest positive widths
+# hst_npz: optional cache of regional counts, only used with shapefiles
+# Widths are estimated from mean discharge by Moody & Troutman, 2002
+def hst_riv(riv_in, IM_bin, hst_npz=None):
+
+    IM_bin_fix = {x: IM_bin[x] for x in IM_bin if not callable(IM_bin[x])}
+
+    # --------------------------------------------------------------------------
+    # Reach attribute table, binned region by region
+    # --------------------------------------------------------------------------
+    if mws_tbl.tbl_chk(riv_in):
+        tbl_df = mws_tbl.tbl_read(riv_in, ['pfaf', 'meanQ_uncor'])
+        ZV_wid_all = [7.2*(x.meanQ_uncor.to_numpy()**0.5) for _, x in
+                      tbl_df.groupby('pfaf', sort=True)]
+        IM_bin = hst_bin(IM_bin, [hst_cnt(x, {}) for x in ZV_wid_all])
+        return hst_add([hst_cnt(x, IM_bin) for x in ZV_wid_all])
+
+    # --------------------------------------------------------------------------
+    # River shapefiles, only new or changed regions are read if cached
+    # --------------------------------------------------------------------------
+    riv_files = list(glob.iglob(riv_in+'*.shp'))
+    riv_files.sort()
+
+    if len(riv_files) == 0:
+        print('ERROR - No river shapefiles found in '+riv_in)
+        raise SystemExit(22)
+
+    IM_hst_chd = {}
+    IM_bin_chd = {}
+    if hst_npz is not None and os.path.isfile(hst_npz):
+        IM_hst_chd, IM_bin_chd = hst_load(hst_npz)
+
+    # First pass: extremes of widths, and counts on fixed bins, of new or
+    # changed regions
+    IM_hst_reg = {}
+    IV_red = set()
+    for riv_fp in riv_files:
+        riv_fl = os.path.basename(riv_fp)
+        riv_hsh = hst_hsh(riv_fp)
+        if IM_hst_chd.get(riv_fl, ('',))[0] == riv_hsh and                    \
+                'n_wid' in IM_hst_chd[riv_fl][1]:
+            IM_hst_reg[riv_fl] = IM_hst_chd[riv_fl]
+        else:
+            ZV_wid = 7.2*(hst_riv_read(riv_fp)**0.5)
+            IM_hst_reg[riv_fl] = (riv_hsh, hst_cnt(ZV_wid, IM_bin_fix))
+            IV_red.add(riv_fl)
+
+    # Second pass: regions whose counts are missing, or were cached on other
+    # bins
+    IM_bin = hst_bin(IM_bin, [IM_hst_reg[x][1] for x in IM_hst_reg])
+    BV_bin = {x: x in IM_bin_chd and np.array_equal(IM_bin_chd[x], IM_bin[x])
+              for x in IM_bin}
+    for riv_fp in riv_files:
+        riv_fl = os.path.basename(riv_fp)
+        riv_hsh, IM_hst = IM_hst_reg[riv_fl]
+        if any('hst_'+x not in IM_hst or
+               (riv_fl not in IV_red and not BV_bin[x]) for x in IM_bin):
+            ZV_wid = 7.2*(hst_riv_read(riv_fp)**0.5)
+            IM_hst_reg[riv_fl] = (riv_hsh, hst_cnt(ZV_wid, IM_bin))
+            IV_red.add(riv_fl)
+
+    # Only counts on current bins are kept
+    IV_hst = ['hst_'+x for x in IM_bin] + ['n_wid', 'min_wid', 'max_wid']
+    for riv_fl in IM_hst_reg:
+        riv_hsh, IM_hst = IM_hst_reg[riv_fl]
+        IM_hst_reg[riv_fl] = (riv_hsh, {x: IM_hst[x] for x in IV_hst})
+
+    BS_hst_chg = len(IV_red) > 0 or IM_hst_reg.keys() != IM_hst_chd.keys() or \
+        not all(BV_bin.values())
+
+    if hst_npz is not None and BS_hst_chg:
+        hst_save(IM_hst_reg, IM_bin, hst_npz)
+
+    return hst_add([IM_hst_reg[x][1] for x in IM_hst_reg])
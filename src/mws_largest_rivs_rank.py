@@ -7,7 +7,12 @@
 # Given corrected and uncorrected shapefiles of MeanDRS coastal river,
 # corrected and uncorrected shapefiles of all MeanDRS rivers, and catchments
 # from MERIT-Basins corresponding to each reach, identify the 10 largest global
-# river basins based on discharge to coastal outlet
+# river basins based on discharge to coastal outlet. Optionally, the number of
+# largest basins to identify can be given. Only the COMID and meanQ attributes
+# of coastal rivers are read, and the largest basins are kept in a bounded heap
+# while reading instead of sorting all coastal rivers. The global table of
+# reach attributes built by mws_riv_tbl.py (.nc) can be given instead of the
+# corrected coastal rivers, in which case no shapefile is read.
 
 # Author:
 # Jeffrey Wade, Cedric H. David, 2025
@@ -18,27 +23,30 @@
 import pandas as pd
 import fiona
 import glob
+import heapq
 import sys
 import os
+import mws_tbl
 
 
 # ******************************************************************************
 # Declaration of variables (given as command line arguments)
 # ******************************************************************************
-# 2 - riv_cst_cor_shp
-# 3 - riv_cst_uncor_shp
+# 1 - riv_cst_cor_shp (or riv_tbl_nc)
+# 2 - riv_cst_uncor_shp
 # 3 - riv_cor_shp
 # 4 - riv_uncor_shp
 # 5 - cat_shp
 # 6 - ranking_out
+# 7 - IS_top (optional, number of largest basins, 10 by default)
 
 
 # ******************************************************************************
 # Get command line arguments
 # ******************************************************************************
 IS_arg = len(sys.argv)
-if IS_arg != 7:
-    print('ERROR - 6 arguments must be used')
+if (IS_arg < 7) or (IS_arg > 8):
+    print('ERROR - 6 or 7 arguments must be used')
     raise SystemExit(22)
 
 riv_cst_cor_shp = sys.argv[1]
@@ -48,6 +56,16 @@ riv_uncor_shp = sys.argv[4]
 cat_shp = sys.argv[5]
 ranking_out = sys.argv[6]
 
+# Allow option of ranking a different number of largest basins
+if IS_arg == 7:
+    IS_top = 10
+
+elif IS_arg == 8:
+    try:
+        IS_top = int(sys.argv[7])
+    except ValueError:
+        IS_top = 0
+
 
 # ******************************************************************************
 # Check if folders exist
@@ -87,94 +105,102 @@ except IOError:
     print('ERROR - '+cat_shp+' invalid folder path')
     raise SystemExit(22)
 
+if IS_top < 1:
+    print('ERROR - '+sys.argv[7]+' not a positive number of basins')
+    raise SystemExit(22)
+
 
 # ******************************************************************************
-# Read files
+# List files
 # ******************************************************************************
-print('- Reading files')
-
+print('- Listing files')
 # ------------------------------------------------------------------------------
-# Load river files discharging into ocean
+# List river files discharging into ocean
 # ------------------------------------------------------------------------------
+# All rivers and catchments are not needed to rank coastal outlets
 riv_cst_cor_files = list(glob.iglob(riv_cst_cor_shp+'*.shp'))
 riv_cst_cor_files.sort()
-riv_cst_cor = [fiona.open(j, 'r') for j in riv_cst_cor_files]
 
 riv_cst_uncor_files = list(glob.iglob(riv_cst_uncor_shp+'*.shp'))
 riv_cst_uncor_files.sort()
-riv_cst_uncor = [fiona.open(j, 'r') for j in riv_cst_uncor_files]
-
-# ------------------------------------------------------------------------------
-# Load all river files
-# ------------------------------------------------------------------------------
-riv_cor_files = list(glob.iglob(riv_cor_shp+'*.shp'))
-riv_cor_files.sort()
-riv_cor = [fiona.open(j, 'r') for j in riv_cor_files]
-
-riv_uncor_files = list(glob.iglob(riv_uncor_shp+'*.shp'))
-riv_uncor_files.sort()
-riv_uncor = [fiona.open(j, 'r') for j in riv_uncor_files]
 
 # Retrieve numbers of pfafs
 pfaf_list = pd.Series([x.partition("pfaf_")[-1][0:2] for x in
-                       riv_cor_files]).sort_values(ignore_index=True)
-
-# ------------------------------------------------------------------------------
-# Load catchment files
-# ------------------------------------------------------------------------------
-cat_files = list(glob.iglob(cat_shp+'*.shp'))
-cat_files.sort()
-cat = [fiona.open(j, 'r') for j in cat_files]
+                       riv_cst_cor_files]).sort_values(ignore_index=True)
 
 
 # ******************************************************************************
-# Retrieve COMIDs and Qout of reaches draining to ocean
+# Define function to open river files without geometries and unused fields
 # ******************************************************************************
-print('- Identifying largest river basins')
-# Initialize list for storing features ids, Q, pfaf, and width region
-riv_id = []
-riv_uncor_Q = []
-riv_cor_Q = []
-riv_pfaf = []
+def cst_open(riv_fp):
 
-# Loop through regions
-for j in range(len(riv_cor_files)):
+    with fiona.open(riv_fp, 'r') as riv:
+        riv_ign = [x for x in riv.schema['properties']
+                   if x not in ('COMID', 'meanQ')]
 
-    # Retrieve shapefile from selected region
-    riv_uncor_sel = riv_cst_uncor[j]
-    riv_cor_sel = riv_cst_cor[j]
+    return fiona.open(riv_fp, 'r', ignore_fields=riv_ign,
+                      ignore_geometry=True)
 
-    # --------------------------------------------------------------------------
-    # Loop through rivers, storing COMID and Q
-    # --------------------------------------------------------------------------
-    for riv_fea in riv_uncor_sel:
 
-        riv_id.append(riv_fea['properties']['COMID'])
-        riv_pfaf.append(pfaf_list[j])
-        # Convert discharge to km3/yr
-        riv_uncor_Q.append(riv_fea['properties']['meanQ'] * 0.031536)
+# ******************************************************************************
+# Define function to stream COMID, pfaf and Q of all coastal rivers
+# ******************************************************************************
+# Yields (COMID, pfaf, uncorrected Q, corrected Q) in m3/s, region by region
+def cst_iter():
+
+    if mws_tbl.tbl_chk(riv_cst_cor_shp):
+        tbl_df = mws_tbl.tbl_read(riv_cst_cor_shp,
+                                  ['COMID', 'pfaf', 'meanQ_cst', 'meanQ_cor'],
+                                  BS_cst=True)
+        yield from tbl_df.itertuples(index=False, name=None)
+        return
 
-    for riv_fea in riv_cor_sel:
-        # Convert discharge to km3/yr
-        riv_cor_Q.append(riv_fea['properties']['meanQ'] * 0.031536)
+    for j in range(len(riv_cst_cor_files)):
+        with cst_open(riv_cst_uncor_files[j]) as riv_uncor_sel,               \
+                cst_open(riv_cst_cor_files[j]) as riv_cor_sel:
+            for riv_uncor_fea, riv_cor_fea in zip(riv_uncor_sel, riv_cor_sel):
+                yield (riv_uncor_fea['properties']['COMID'], pfaf_list[j],
+                       riv_uncor_fea['properties']['meanQ'],
+                       riv_cor_fea['properties']['meanQ'])
 
 
+# ******************************************************************************
+# Retrieve COMIDs and Qout of largest reaches draining to ocean
+# ******************************************************************************
+print('- Identifying largest river basins')
+# Heap of the largest coastal outlets found so far, smallest one first
+riv_top = []
+
 # ------------------------------------------------------------------------------
-# Identify largest coastal rivers
+# Stream COMID and Q of rivers, keeping the largest ones
 # ------------------------------------------------------------------------------
-# Combine lists into dataframe
-Q_df = pd.DataFrame({'COMID': riv_id, 'pfaf': riv_pfaf,
-                     'Qout_uncor': riv_uncor_Q, 'Qout_cor': riv_cor_Q})
+for JS_cst, (IS_riv_id, riv_pfaf, riv_uncor_Q, riv_cor_Q) in                  \
+        enumerate(cst_iter()):
+
+    # Convert discharge to km3/yr
+    riv_cst = (riv_cor_Q * 0.031536, -JS_cst, IS_riv_id, riv_pfaf,
+               riv_uncor_Q * 0.031536)
+
+    if len(riv_top) < IS_top:
+        heapq.heappush(riv_top, riv_cst)
+    elif riv_cst > riv_top[0]:
+        heapq.heapreplace(riv_top, riv_cst)
 
-# Sort dataframe by Qout
-Q_df = Q_df.sort_values(by='Qout_cor', ascending=False)
-Q_df = Q_df.reset_index()
 
-# Retrieve top 10 largest coastal outlets
-Q_df_top10 = Q_df.copy().iloc[0:10, :]
+# ------------------------------------------------------------------------------
+# Rank largest coastal rivers
+# ------------------------------------------------------------------------------
+# Sort by Qout, coastal rivers with equal Qout being ranked in reading order
+riv_top.sort(reverse=True)
+
+Q_df_top10 = pd.DataFrame({'index': [-x[1] for x in riv_top],
+                           'COMID': [x[2] for x in riv_top],
+                           'pfaf': [x[3] for x in riv_top],
+                           'Qout_uncor': [x[4] for x in riv_top],
+                           'Qout_cor': [x[0] for x in riv_top]})
 
 # Add ranking column
-Q_df_top10['ranking'] = list(range(1, 11))
+Q_df_top10['ranking'] = list(range(1, len(riv_top)+1))
 
 # Write dataframe to CSV
 Q_df_top10.to_csv(ranking_out, index=False)
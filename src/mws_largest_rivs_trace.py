@@ -8,6 +8,11 @@
 # corrected and uncorrected MeanDRS river reaches, a shapefile of catchments
 # from MERIT-Basins corresponding to each reach, and a desired basin rank,
 # identify contributing reaches and catchments from largest basin of interest.
+# Several ranks can be given as a comma-separated list (e.g. 1,2,10), in which
+# case all basins are traced in one run and only the files of the regions that
+# contain the selected outlets are opened. Upstream reaches are retrieved from
+# an index of the drainage forest of each region (see mws_net.py) and
+# catchments are dissolved bottom-up along the traced network (see mws_dis.py).
 
 # Author:
 # Jeffrey Wade, Cedric H. David, 2025
@@ -16,14 +21,14 @@
 # Import packages
 # ******************************************************************************
 import pandas as pd
-import csv
 import fiona
 import glob
 import shapely.geometry
-import shapely.ops
 from collections import OrderedDict
 import sys
 import os
+import mws_dis
+import mws_net
 
 
 # ******************************************************************************
@@ -34,7 +39,7 @@ import os
 # 3 - riv_cor_shp
 # 4 - riv_uncor_shp
 # 5 - cat_shp
-# 6 - rank
+# 6 - rank (single rank or comma-separated list of ranks)
 # 7 - riv_out
 # 8 - cat_out
 # 9 - cat_dis_out
@@ -98,13 +103,30 @@ except IOError:
     raise SystemExit(22)
 
 try:
-    if (int(rank) >= 1) & (int(rank) <= 10):
-        pass
-except IOError:
-    print('ERROR - '+rank+' not within range 1-10')
+    IV_rank = [int(x) for x in rank.split(',')]
+except ValueError:
+    print('ERROR - '+rank+' not a list of ranks')
     raise SystemExit(22)
 
 
+# ******************************************************************************
+# Set number of processes used to dissolve catchments
+# ******************************************************************************
+IS_cpu = os.cpu_count()
+
+
+# ******************************************************************************
+# Define function for naming output files of each rank
+# ******************************************************************************
+# A single rank writes to the given file names; several ranks append the rank
+# to each given file name (e.g. riv_top10.shp -> riv_top10_n1.shp)
+def rank_fp(fp, IS_rank):
+    if len(IV_rank) == 1:
+        return fp
+    fp_root, fp_ext = os.path.splitext(fp)
+    return fp_root+'_n'+str(IS_rank)+fp_ext
+
+
 # ******************************************************************************
 # Read files
 # ******************************************************************************
@@ -114,8 +136,14 @@ print('- Reading files')
 # ------------------------------------------------------------------------------
 Q_df_top10 = pd.read_csv(ranking_csv)
 
+# Check that ranks are within ranking file
+IS_top = len(Q_df_top10)
+if not all((x >= 1) & (x <= IS_top) for x in IV_rank):
+    print('ERROR - '+rank+' not within range 1-'+str(IS_top))
+    raise SystemExit(22)
+
 # ------------------------------------------------------------------------------
-# Load MeanDRS RAPID river connectivity files
+# List MeanDRS RAPID river connectivity files
 # ------------------------------------------------------------------------------
 # Columns of connectivity files
 # 0: COMID
@@ -123,206 +151,169 @@ Q_df_top10 = pd.read_csv(ranking_csv)
 # 2: Upstream number of reaches
 # 3-7: Upstream reaches 1-5
 
-# Read connectivity files
+# Files are only read for the regions of the selected outlets
 con_files = list(glob.iglob(con_csv+'*'))
 con_files.sort()
-con = [pd.read_csv(j, header=None) for j in con_files]
 
 # ------------------------------------------------------------------------------
-# Load all river files
+# List all river files
 # ------------------------------------------------------------------------------
 riv_cor_files = list(glob.iglob(riv_cor_shp+'*.shp'))
 riv_cor_files.sort()
-riv_cor = [fiona.open(j, 'r') for j in riv_cor_files]
 
 riv_uncor_files = list(glob.iglob(riv_uncor_shp+'*.shp'))
 riv_uncor_files.sort()
-riv_uncor = [fiona.open(j, 'r') for j in riv_uncor_files]
 
 # Retrieve numbers of pfafs
 pfaf_list = pd.Series([x.partition("pfaf_")[-1][0:2] for x in
                        riv_cor_files]).sort_values(ignore_index=True)
 
 # ------------------------------------------------------------------------------
-# Load catchment files
+# List catchment files
 # ------------------------------------------------------------------------------
 cat_files = list(glob.iglob(cat_shp+'*.shp'))
 cat_files.sort()
-cat = [fiona.open(j, 'r') for j in cat_files]
-
-
-# ******************************************************************************
-# Trace upstream network of each largest river
-# ******************************************************************************
-print('- Tracing largest rivers upstream')
-# See https://github.com/c-h-david/rrr/blob/master/src/rrr_riv_tot_net_nav.py
-
-# Get index of desired ranking
-rank_ind = Q_df_top10[Q_df_top10.ranking == int(rank)].index[0]
-
-# Retrieve COMID and pfaf of given reach
-IS_riv_id = Q_df_top10.COMID[rank_ind]
-pfaf_sel = Q_df_top10.pfaf[rank_ind]
-
-# ------------------------------------------------------------------------------
-# For given reach, format river connectivity file of region
-# ------------------------------------------------------------------------------
-
-# Retrieve pfaf index for given reach
-ind = pfaf_list[pfaf_list == str(pfaf_sel)].index[0]
-
-# Read and format connectivity file for given region
-IV_riv_tot_id = []  # COMID
-IV_riv_dwn_id = []  # Next Downstream ID
-IV_riv_ups_nb = []  # Number of upstream IDs
-IM_riv_ups_id = []  # Upstream IDs 1-5
-
-with open(con_files[ind], 'r') as csvfile:
-    csvreader = csv.reader(csvfile)
-    for row in csvreader:
-        IV_riv_tot_id.append(int(row[0]))
-        IV_riv_dwn_id.append(int(row[1]))
-        IV_riv_ups_nb.append(int(row[2]))
-        IM_riv_ups_id.append([int(rivid) for rivid in row[3:]])
-
-# Number of reaches in connectivity file
-IS_riv_tot = len(IV_riv_tot_id)
-
-# Create hash table for connectivity
-IM_hsh = {}
-
-for JS_riv_tot in range(IS_riv_tot):
-    IM_hsh[IV_riv_tot_id[JS_riv_tot]] = JS_riv_tot
-
-# ------------------------------------------------------------------------------
-# Find upstream reaches of coastal outlets
-# ------------------------------------------------------------------------------
-# Select hash of given river to trace
-JS_riv_tot = IM_hsh[IS_riv_id]
-
-# Create list of all indexes upstream of current index
-# Start with hash of coastal outlet
-riv_ups_hsh = [JS_riv_tot]
-
-# Retrieve IDs of river that are directly upstream of current index
-IV_riv_ups_id = IM_riv_ups_id[JS_riv_tot][0:IV_riv_ups_nb[JS_riv_tot]]
-
-# Initialize counter
-JS_riv_ups = 0
-
-# Effectively infinite loop continues until no reaches returned
-while JS_riv_ups < 1e7:
-
-    # Increment counter
-    JS_riv_ups = JS_riv_ups+1
-
-    # Initialize list for storing next upstream id
-    IV_riv_nxt_id = []
-
-    # Loop through ids in next upstream ID for given reach
-    for JS_riv_ups_id in IV_riv_ups_id:
-
-        # Retrieve hash value for next ID
-        JS_riv_ups_ix = IM_hsh[JS_riv_ups_id]
-
-        # Append hash value to list
-        riv_ups_hsh.append(JS_riv_ups_ix)
-
-        # Get values of existing upstream IDs of IV_riv_ups_id reaches
-        IV_riv_nxt_id = IV_riv_nxt_id +                                        \
-            IM_riv_ups_id[JS_riv_ups_ix][0:IV_riv_ups_nb[JS_riv_ups_ix]]
-
-    # If reaches exist, add to list
-    if len(IV_riv_nxt_id) != 0:
-        IV_riv_ups_id = IV_riv_nxt_id
-    else:
-        # This break statement exits the for loop if no more upstream
-        # reaches exist
-        break
 
 
 # ******************************************************************************
-# Write traced reaches to shapefile
+# Define function to write dissolved catchments of a given basin
 # ******************************************************************************
-print('- Writing traced reaches to shapefile')
-# Translate hashes into reach IDs
-riv_ups_comid = [IV_riv_tot_id[x] for x in riv_ups_hsh]
+def dis_cat(cat_merge, IS_riv_id, cat_crs, cat_dis_fp):
 
-# Load full network MERIT-Hydro reaches: Uncorrected to calculate width
-riv_sel = riv_uncor[ind]
+    # Dissolve catchments
+    cat_dis = mws_dis.dis_fil(cat_merge)
 
-# Copy schema and crs
-meandrs_schema = riv_uncor[0].schema.copy()
-meandrs_crs = riv_uncor[0].crs
+    # Create new schema schema
+    cat_sch = {'properties': OrderedDict([('outlet_id', 'str:18')]),
+               'geometry': 'Polygon'}
 
-# Write to file
-with fiona.open(riv_out, 'w', schema=meandrs_schema,
-                driver='ESRI Shapefile',
-                crs=meandrs_crs) as output:
-    for riv_fea in riv_sel:
-        if riv_fea['properties']['COMID'] in riv_ups_comid:
-            output.write(riv_fea)
+    # Set properties
+    cat_prp = OrderedDict([('outlet_id', str(IS_riv_id))])
 
+    # Copy geometries
+    cat_dis_geom = shapely.geometry.mapping(cat_dis)
 
-# ******************************************************************************
-# Write corresponding catchments to file
-# ******************************************************************************
-print('- Writing traced catchments to file')
-# Load MERIT-Hydro catchments
-cat_sel = cat[ind]
-
-# Copy schema and crs
-cat_schema = cat[0].schema.copy()
-cat_crs = cat[0].crs
-
-# If crs is empty, set crs to WGS 84
-if len(cat_crs) == 0:
-    cat_crs = 'epsg:4326'
+    # Write shapefiles
+    cat_dis_lay = fiona.open(cat_dis_fp, 'w', crs=cat_crs,
+                             driver='ESRI Shapefile', schema=cat_sch)
 
-# Write to file
-with fiona.open(cat_out, 'w', schema=cat_schema,
-                driver='ESRI Shapefile',
-                crs=cat_crs) as output:
-    for cat_fea in cat_sel:
-        if cat_fea['properties']['COMID'] in riv_ups_comid:
-            output.write(cat_fea)
+    cat_dis_lay.write({'properties': cat_prp, 'geometry': cat_dis_geom})
+    cat_dis_lay.close()
 
 
 # ******************************************************************************
-# Dissolve catchment files
+# Trace upstream network of each largest river, one region at a time
 # ******************************************************************************
-print('- Dissolved traced catchments')
-# Read undissolved catchment files
-cat_raw = fiona.open(cat_out, 'r')
-
-# Transform to geometry object
-cat_geom = [shapely.geometry.shape(cat_raw[j]['geometry']) for j in
-            range(len(cat_raw))]
-
-# Merge catchments
-cat_merge = shapely.ops.unary_union(cat_geom)
-
-# Dissolve catchments
-if cat_merge.geom_type == 'Polygon':
-    cat_dis = shapely.geometry.Polygon(cat_merge.exterior)
-
-if cat_merge.geom_type == 'MultiPolygon':
-    cat_dis = shapely.geometry.MultiPolygon(shapely.geometry.Polygon(p.exterior)
-                                            for p in cat_merge.geoms)
-
-# Create new schema schema
-cat_sch = {'properties': OrderedDict([('outlet_id', 'str:18')]),
-           'geometry': 'Polygon'}
-
-# Set properties
-cat_prp = OrderedDict([('outlet_id', str(IS_riv_id))])
-
-# Copy geometries
-cat_dis_geom = shapely.geometry.mapping(cat_dis)
-
-# Write shapefiles
-cat_dis_lay = fiona.open(cat_dis_out, 'w', crs=cat_crs, driver='ESRI Shapefile',
-                         schema=cat_sch)
-
-cat_dis_lay.write({'properties': cat_prp, 'geometry': cat_dis_geom})
-cat_dis_lay.close()
+# Retrieve selected rankings, preserving the order in which they were given
+Q_df_sel = Q_df_top10.set_index('ranking', drop=False).loc[IV_rank]
+
+# Group selected rankings by region so that each region is only read once
+for pfaf_sel, Q_df_reg in Q_df_sel.groupby('pfaf', sort=False):
+
+    # Retrieve pfaf index for given region
+    ind = pfaf_list[pfaf_list == str(pfaf_sel)].index[0]
+
+    # --------------------------------------------------------------------------
+    # Format river connectivity file of region
+    # --------------------------------------------------------------------------
+    print('- Reading connectivity of region '+str(pfaf_sel))
+    IV_riv_tot_id, IV_riv_dwn_id, IV_riv_ups_nb, IM_riv_ups_id = \
+        mws_net.con_read(con_files[ind])
+
+    # Create hash table for connectivity
+    IM_hsh = mws_net.con_hsh(IV_riv_tot_id)
+
+    # Index drainage forest of region
+    IM_idx = mws_net.net_idx(IV_riv_ups_nb, IM_riv_ups_id, IM_hsh)
+
+    # --------------------------------------------------------------------------
+    # Find upstream reaches of each selected coastal outlet
+    # --------------------------------------------------------------------------
+    print('- Tracing largest rivers upstream')
+    # Store COMID of outlet and set of traced COMIDs for each rank
+    IM_riv_out = {}
+    IM_riv_hsh = {}
+    IM_riv_ups = {}
+
+    for IS_rank, IS_riv_id in zip(Q_df_reg.ranking, Q_df_reg.COMID):
+
+        # Retrieve hashes of all reaches upstream of outlet
+        riv_ups_hsh = mws_net.idx_ups(IM_idx, IM_hsh[IS_riv_id])
+
+        # Translate hashes into reach IDs
+        IM_riv_out[IS_rank] = IS_riv_id
+        IM_riv_hsh[IS_rank] = riv_ups_hsh
+        IM_riv_ups[IS_rank] = set([IV_riv_tot_id[x] for x in riv_ups_hsh])
+
+    # --------------------------------------------------------------------------
+    # Write traced reaches to shapefile
+    # --------------------------------------------------------------------------
+    print('- Writing traced reaches to shapefile')
+    # Load full network MERIT-Hydro reaches: Uncorrected to calculate width
+    with fiona.open(riv_uncor_files[ind], 'r') as riv_sel:
+
+        # Copy schema and crs
+        meandrs_schema = riv_sel.schema.copy()
+        meandrs_crs = riv_sel.crs
+
+        # Open one output per rank and write all of them in a single pass
+        riv_lay = {IS_rank: fiona.open(rank_fp(riv_out, IS_rank), 'w',
+                                       schema=meandrs_schema,
+                                       driver='ESRI Shapefile',
+                                       crs=meandrs_crs)
+                   for IS_rank in IM_riv_ups}
+
+        for riv_fea in riv_sel:
+            for IS_rank in IM_riv_ups:
+                if riv_fea['properties']['COMID'] in IM_riv_ups[IS_rank]:
+                    riv_lay[IS_rank].write(riv_fea)
+
+        for IS_rank in riv_lay:
+            riv_lay[IS_rank].close()
+
+    # --------------------------------------------------------------------------
+    # Write corresponding catchments to file
+    # --------------------------------------------------------------------------
+    print('- Writing traced catchments to file')
+    # Load MERIT-Hydro catchments
+    with fiona.open(cat_files[ind], 'r') as cat_sel:
+
+        # Copy schema and crs
+        cat_schema = cat_sel.schema.copy()
+        cat_crs = cat_sel.crs
+
+        # If crs is empty, set crs to WGS 84
+        if len(cat_crs) == 0:
+            cat_crs = 'epsg:4326'
+
+        # Open one output per rank and write all of them in a single pass
+        cat_lay = {IS_rank: fiona.open(rank_fp(cat_out, IS_rank), 'w',
+                                       schema=cat_schema,
+                                       driver='ESRI Shapefile',
+                                       crs=cat_crs)
+                   for IS_rank in IM_riv_ups}
+
+        # Keep geometries of traced catchments for dissolving
+        IM_cat_geom = {IS_rank: {} for IS_rank in IM_riv_ups}
+
+        for cat_fea in cat_sel:
+            for IS_rank in IM_riv_ups:
+                if cat_fea['properties']['COMID'] in IM_riv_ups[IS_rank]:
+                    cat_lay[IS_rank].write(cat_fea)
+                    IM_cat_geom[IS_rank][cat_fea['properties']['COMID']] = \
+                        shapely.geometry.shape(cat_fea['geometry'])
+
+        for IS_rank in cat_lay:
+            cat_lay[IS_rank].close()
+
+    # --------------------------------------------------------------------------
+    # Dissolve catchments bottom-up along the traced network
+    # --------------------------------------------------------------------------
+    print('- Dissolved traced catchments')
+    for IS_rank in IM_riv_ups:
+        IV_riv_bas = IM_riv_hsh[IS_rank]
+        IM_net = mws_dis.dis_net([IV_riv_tot_id[x] for x in IV_riv_bas],
+                                 [IV_riv_dwn_id[x] for x in IV_riv_bas],
+                                 IM_cat_geom[IS_rank], IS_cpu=IS_cpu)
+        dis_cat(IM_net['cch'][IM_riv_out[IS_rank]], IM_riv_out[IS_rank],
+                cat_crs, rank_fp(cat_dis_out, IS_rank))
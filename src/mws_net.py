@@ -0,0 +1,187 @@
+# ******************************************************************************
+# mws_net.py
+# ******************************************************************************
+
+# Purpose:
+# Functions shared by the mws_*.py scripts to navigate the river network of a
+# region given its RAPID routing connectivity csv. The drainage forest of each
+# region is indexed once by the entry and exit times of a depth-first traversal
+# from its outlets, so that retrieving all reaches upstream of a reach is a
+# contiguous slice of the traversal order.
+
+# Author:
+# Jeffrey Wade, Cedric H. David, 2025
+
+# ******************************************************************************
+# Import packages
+# ******************************************************************************
+import csv
+import numpy as np
+
+
+# ******************************************************************************
+# Define function to read RAPID connectivity file
+# ******************************************************************************
+# Columns of connectivity files
+# 0: COMID
+# 1: Next Downstream
+# 2: Upstream number of reaches
+# 3-7: Upstream reaches 1-5
+def con_read(con_csv):
+
+    IV_riv_tot_id = []  # COMID
+    IV_riv_dwn_id = []  # Next Downstream ID
+    IV_riv_ups_nb = []  # Number of upstream IDs
+    IM_riv_ups_id = []  # Upstream IDs 1-5
+
+    with open(con_csv, 'r') as csvfile:
+        csvreader = csv.reader(csvfile)
+        for row in csvreader:
+            IV_riv_tot_id.append(int(row[0]))
+            IV_riv_dwn_id.append(int(row[1]))
+            IV_riv_ups_nb.append(int(row[2]))
+            IM_riv_ups_id.append([int(rivid) for rivid in row[3:]])
+
+    return IV_riv_tot_id, IV_riv_dwn_id, IV_riv_ups_nb, IM_riv_ups_id
+
+
+# ******************************************************************************
+# Define function to create hash table for connectivity
+# ******************************************************************************
+def con_hsh(IV_riv_tot_id):
+
+    IM_hsh = {}
+
+    for JS_riv_tot in range(len(IV_riv_tot_id)):
+        IM_hsh[IV_riv_tot_id[JS_riv_tot]] = JS_riv_tot
+
+    return IM_hsh
+
+
+# ******************************************************************************
+# Define function to index the drainage forest of a region
+# ******************************************************************************
+# See https://github.com/c-h-david/rrr/blob/master/src/rrr_riv_tot_net_nav.py
+# Returns a dictionary with:
+# 'pre':  hashes of all reaches in depth-first (preorder) traversal order
+# 'tin':  entry time of each hash, i.e. its position in 'pre'
+# 'tout': exit time of each hash, i.e. 'tin' plus number of reaches upstream
+#         of it (itself included)
+def net_idx(IV_riv_ups_nb, IM_riv_ups_id, IM_hsh):
+
+    IS_riv_tot = len(IV_riv_ups_nb)
+
+    # --------------------------------------------------------------------------
+    # Retrieve hashes of upstream reaches and of network outlets
+    # --------------------------------------------------------------------------
+    IM_ups = [[IM_hsh[x] for x in
+               IM_riv_ups_id[JS_riv_tot][0:IV_riv_ups_nb[JS_riv_tot]]]
+              for JS_riv_tot in range(IS_riv_tot)]
+
+    IV_hed = np.ones(IS_riv_tot, dtype=bool)
+    for IV_ups in IM_ups:
+        IV_hed[IV_ups] = False
+    IV_out = np.flatnonzero(IV_hed)
+
+    # --------------------------------------------------------------------------
+    # Depth-first traversal from each outlet
+    # --------------------------------------------------------------------------
+    IV_pre = np.empty(IS_riv_tot, dtype=np.int64)
+    IV_par = np.full(IS_riv_tot, -1, dtype=np.int64)
+    JS_pre = 0
+
+    IV_stk = list(IV_out[::-1])
+    while len(IV_stk) != 0:
+        JS_riv_tot = IV_stk.pop()
+        IV_pre[JS_pre] = JS_riv_tot
+        JS_pre = JS_pre+1
+        for JS_riv_ups in reversed(IM_ups[JS_riv_tot]):
+            IV_par[JS_riv_ups] = JS_riv_tot
+            IV_stk.append(JS_riv_ups)
+
+    IV_pre = IV_pre[0:JS_pre]
+
+    # --------------------------------------------------------------------------
+    # Entry and exit times
+    # --------------------------------------------------------------------------
+    IV_tin = np.full(IS_riv_tot, -1, dtype=np.int64)
+    IV_tin[IV_pre] = np.arange(JS_pre)
+
+    # Number of reaches upstream of each reach, accumulated from sources
+    IV_siz = np.ones(IS_riv_tot, dtype=np.int64)
+    for JS_riv_tot in IV_pre[::-1]:
+        if IV_par[JS_riv_tot] != -1:
+            IV_siz[IV_par[JS_riv_tot]] += IV_siz[JS_riv_tot]
+
+    IV_tout = IV_tin + IV_siz
+
+    return {'pre': IV_pre, 'tin': IV_tin, 'tout': IV_tout, 'out': IV_out}
+
+
+# ******************************************************************************
+# Define function to retrieve hashes of all reaches upstream of a reach
+# ******************************************************************************
+# The reach itself is included and comes first
+def idx_ups(IM_idx, JS_riv_tot):
+
+    return IM_idx['pre'][IM_idx['tin'][JS_riv_tot]:
+                         IM_idx['tout'][JS_riv_tot]]
+
+
+# ******************************************************************************
+# Define function to retrieve hash of next downstream reach of all reaches
+# ******************************************************************************
+# Reaches whose next downstream reach is not in the region (or 0) get -1
+def net_dwn(IV_riv_dwn_id, IM_hsh):
+
+    return np.array([IM_hsh.get(x, -1) for x in IV_riv_dwn_id],
+                    dtype=np.int64)
+
+
+# ******************************************************************************
+# Define function to accumulate values along the downstream path of all reaches
+# ******************************************************************************
+# IV_dwn: hash of next downstream reach of each reach (-1 for outlets)
+# ZV_val: value of each reach to accumulate, number of reaches if not given;
+#         several values can be accumulated at once as columns of a 2-D array
+#         with one row per reach
+# Returns the hash of the outlet of each reach and the sum of the values of all
+# reaches from each reach to its outlet (both included). All reaches are
+# processed at once by pointer jumping: at each step every reach adds the value
+# accumulated by the reach it points to and then points to where that reach
+# pointed, so that paths of any length are covered in a logarithmic number of
+# steps.
+def dwn_acc(IV_dwn, ZV_val=None):
+
+    IS_riv_tot = len(IV_dwn)
+    IV_dwn = np.asarray(IV_dwn, dtype=np.int64)
+
+    if ZV_val is None:
+        ZV_val = np.ones(IS_riv_tot, dtype=np.int64)
+
+    # --------------------------------------------------------------------------
+    # Point outlets to an extra sink reach holding a value of zero
+    # --------------------------------------------------------------------------
+    IV_nxt = np.append(np.where(IV_dwn == -1, IS_riv_tot, IV_dwn), IS_riv_tot)
+    ZV_val = np.asarray(ZV_val)
+    ZV_acc = np.concatenate((ZV_val, np.zeros((1,)+ZV_val.shape[1:],
+                                              dtype=ZV_val.dtype)))
+
+    # Outlets point to themselves when retrieving the outlet of each reach
+    IV_out = np.where(IV_dwn == -1, np.arange(IS_riv_tot), IV_dwn)
+
+    # --------------------------------------------------------------------------
+    # Jump pointers until all reaches point to the sink
+    # --------------------------------------------------------------------------
+    IS_jmp_max = int(np.ceil(np.log2(IS_riv_tot+1)))+1
+    JS_jmp = 0
+    while (IV_nxt[0:IS_riv_tot] != IS_riv_tot).any():
+        if JS_jmp == IS_jmp_max:
+            print('ERROR - Connectivity contains a loop')
+            raise SystemExit(22)
+        ZV_acc = ZV_acc+ZV_acc[IV_nxt]
+        IV_nxt = IV_nxt[IV_nxt]
+        IV_out = IV_out[IV_out]
+        JS_jmp = JS_jmp+1
+
+    return IV_out, ZV_acc[0:IS_riv_tot]
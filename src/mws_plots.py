@@ -4,7 +4,12 @@
 # ******************************************************************************
 
 # Purpose:
-# Given all output files from previous scripts, generate visualizations.
+# Given all output files from previous scripts, generate visualizations. The
+# global table of reach attributes built by mws_riv_tbl.py (.nc) can be given
+# instead of the uncorrected rivers, in which case no shapefile is read. River
+# widths of Figure 1 are binned region by region (see mws_hst.py). Bars of
+# Figure 1 and time series of Figure 2 can be rasterized, and the data plotted
+# in Figures 1, 2, and 4 can be stored for restyling (see mws_fig.py).
 
 # Author:
 # Jeffrey Wade, Cedric H. David, 2025
@@ -17,17 +22,17 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
-import glob
-import fiona
-from datetime import datetime
 import sys
 import os
+import mws_fig
+import mws_hst
+import mws_sum
 
 
 # ******************************************************************************
 # Declaration of variables (given as command line arguments)
 # ******************************************************************************
-# 1 - riv_uncor_shp
+# 1 - riv_uncor_shp (or riv_tbl_nc)
 # 2 - Qout_prop_csv
 # 3 - Qout_range_prop_csv
 # 4 - Qout_rivwid_csv
@@ -47,14 +52,18 @@ import os
 # 18 - fig2b_out
 # 19 - fig3_out
 # 20 - fig4_out
+# 21 - hst_npz (optional, regional width histograms cached and updated for
+#      changed regions, or 'no_hst_npz')
+# 22 - fig_npz (optional, plotted data of figures stored and updated for
+#      figures with changed inputs)
 
 
 # ******************************************************************************
 # Get command line arguments
 # ******************************************************************************
 IS_arg = len(sys.argv)
-if IS_arg != 21:
-    print('ERROR - 20 arguments must be used')
+if (IS_arg < 21) or (IS_arg > 23):
+    print('ERROR - 20 to 22 arguments must be used')
     raise SystemExit(22)
 
 riv_uncor_shp = sys.argv[1]
@@ -78,6 +87,16 @@ fig2b_out = sys.argv[18]
 fig3_out = sys.argv[19]
 fig4_out = sys.argv[20]
 
+# Allow option of caching regional width histograms
+hst_npz = None
+if IS_arg >= 22 and sys.argv[21] != 'no_hst_npz':
+    hst_npz = sys.argv[21]
+
+# Allow option of storing plotted data of figures
+fig_npz = None
+if IS_arg == 23:
+    fig_npz = sys.argv[22]
+
 
 # ******************************************************************************
 # Check if files/folders exist
@@ -192,14 +211,6 @@ except IOError:
 # Read files
 # ******************************************************************************
 print('- Reading files')
-# ------------------------------------------------------------------------------
-# MeanDRS Uncorrected Rivers
-# ------------------------------------------------------------------------------
-# Read to shapefile
-riv_uncor_files = list(glob.iglob(riv_uncor_shp+'*.shp'))
-riv_uncor_files.sort()
-riv_uncor = [fiona.open(j, 'r') for j in riv_uncor_files]
-
 # ------------------------------------------------------------------------------
 # Qout_rivwidth Files
 # ------------------------------------------------------------------------------
@@ -207,10 +218,6 @@ riv_uncor = [fiona.open(j, 'r') for j in riv_uncor_files]
 Qout_prop = pd.read_csv(Qout_prop_csv)
 Qout_range_prop = pd.read_csv(Qout_range_prop_csv)
 
-Qout_rivwid_files = list(glob.iglob(Qout_rivwid_csv+'*'))
-Qout_rivwid_files.sort()
-Qout_rivwid = [pd.read_csv(j) for j in Qout_rivwid_files]
-
 # ------------------------------------------------------------------------------
 # V_rivwidth Files
 # ------------------------------------------------------------------------------
@@ -223,27 +230,13 @@ V_prop_low_range = pd.read_csv(V_prop_low_range_csv)
 V_prop_nrm_range = pd.read_csv(V_prop_nrm_range_csv)
 V_prop_hig_range = pd.read_csv(V_prop_hig_range_csv)
 
-V_rivwid_low_files = list(glob.iglob(V_rivwid_low_csv+'*'))
-V_rivwid_low_files.sort()
-V_rivwid_low = [pd.read_csv(j) for j in V_rivwid_low_files]
-
-V_rivwid_nrm_files = list(glob.iglob(V_rivwid_nrm_csv+'*'))
-V_rivwid_nrm_files.sort()
-V_rivwid_nrm = [pd.read_csv(j) for j in V_rivwid_nrm_files]
-
-V_rivwid_hig_files = list(glob.iglob(V_rivwid_hig_csv+'*'))
-V_rivwid_hig_files.sort()
-V_rivwid_hig = [pd.read_csv(j) for j in V_rivwid_hig_files]
-
-# ------------------------------------------------------------------------------
-# Narrow Coastal Rivers Files
-# ------------------------------------------------------------------------------
-Qout_small = pd.read_csv(Qout_small_csv)
-
 # ------------------------------------------------------------------------------
-# Largest Coastal Rivers Files
+# Stored Figure Data
 # ------------------------------------------------------------------------------
-Qout_large = pd.read_csv(Qout_large_csv)
+# Regional files are only read for figures whose inputs changed since their
+# plotted data were stored
+IM_fig_dat = mws_fig.fig_dat_load(fig_npz)
+BS_fig_chg = False
 
 
 # ******************************************************************************
@@ -251,31 +244,19 @@ Qout_large = pd.read_csv(Qout_large_csv)
 # ******************************************************************************
 print('- Generating Figure 1')
 # ------------------------------------------------------------------------------
-# Retrieve discharge values for all rivers in each region
-# ------------------------------------------------------------------------------
-# Initialize list to store discharge
-Q_list = []
-
-# Loop through regions
-for j in range(len(riv_uncor)):
-
-    # Retrieve MeanDRS reaches for each pfaf
-    riv_lay = riv_uncor[j]
-
-    # Loop through river reaches
-    for riv_fea in riv_lay:
-
-        # Store values
-        Q_list.append(riv_fea['properties']['meanQ'])
-
-# ------------------------------------------------------------------------------
-# Calculate river width from mean discharge
+# Bin river width of all rivers, region by region, unless stored
 # ------------------------------------------------------------------------------
-# Convert list to array
-Q_arr = np.array(Q_list)
-
-# Estimate mean river width by Moody & Troutman, 2002
-wid_arr = 7.2*(Q_arr**0.5)
+# Set bins of histogram
+hst_bin = np.logspace(np.log10(1), np.log10(5000), 50)
+
+fig1_hsh = mws_fig.fig_hsh([riv_uncor_shp, hst_bin])
+IM_fig1 = mws_fig.fig_dat_get(IM_fig_dat, 'fig1', fig1_hsh)
+if IM_fig1 is None:
+    # Mean river width is estimated by Moody & Troutman, 2002
+    IM_hst = mws_hst.hst_riv(riv_uncor_shp, {'fig1': hst_bin}, hst_npz)
+    IM_fig1 = {'hst': IM_hst['hst_fig1']}
+    IM_fig_dat['fig1'] = (fig1_hsh, IM_fig1)
+    BS_fig_chg = True
 
 # Calculate discharge equivalent of major width thresholds
 wid_thr = np.array([10, 25, 50, 100, 250, 500, 1000])
@@ -289,8 +270,8 @@ wid_cut = [3.16, 10, 31.6, 100, 316, 1000]
 # ------------------------------------------------------------------------------
 bottom = 10
 fig = plt.figure(figsize=(4.5, 5))
-plt.hist(wid_arr, bins=np.logspace(np.log10(1), np.log10(5000), 50),
-         color='gray', bottom=bottom)
+hst_pch = plt.hist(hst_bin[:-1], bins=hst_bin, weights=IM_fig1['hst'],
+                   color='gray', bottom=bottom)[2]
 [plt.axvline(ln, linewidth=1, color='red') for ln in wid_cut]
 plt.yscale("log")
 plt.xscale("log")
@@ -298,7 +279,7 @@ plt.xlabel('River Width')
 plt.ylabel('Number of Rivers')
 plt.xlim(1, 5000)
 plt.ylim(10, 500000)
-plt.savefig(fig1_out, format='svg')
+mws_fig.fig_save(fig1_out, [hst_pch])
 
 
 # ******************************************************************************
@@ -306,48 +287,38 @@ plt.savefig(fig1_out, format='svg')
 # ******************************************************************************
 print('- Generating Figure 2')
 # ------------------------------------------------------------------------------
-# Process river width files for 0m,50m, and 100m scenarios
+# Process river width files for 0m,50m, and 100m scenarios, unless stored
 # ------------------------------------------------------------------------------
-# Initialize dataframe for storing Qout and V values for each width scenario
-width0_df = pd.DataFrame(0, index=range(Qout_rivwid[0].shape[0]),
-                         columns=['Qout', 'V_low', 'V_nrm', 'V_hig'])
+# Set river width scenarios of global time series
+IV_fig2_scen = ['wid_0', 'wid_50', 'wid_100']
+
+fig2_hsh = mws_fig.fig_hsh([Qout_rivwid_csv, V_rivwid_low_csv,
+                            V_rivwid_nrm_csv, V_rivwid_hig_csv])
+IM_fig2 = mws_fig.fig_dat_get(IM_fig_dat, 'fig2', fig2_hsh)
+if IM_fig2 is None:
+    # Only the columns of plotted scenarios are read, and regions of all
+    # variables are added at once
+    IM_agg = mws_sum.sum_agg({'Qout': Qout_rivwid_csv,
+                              'V_low': V_rivwid_low_csv,
+                              'V_nrm': V_rivwid_nrm_csv,
+                              'V_hig': V_rivwid_hig_csv}, IV_fig2_scen)
+
+    # Store (time x variable) series for each width scenario
+    IM_fig2 = {'time': IM_agg['time'].to_numpy(dtype='datetime64[s]')}
+    for j in range(len(IV_fig2_scen)):
+        IM_fig2[IV_fig2_scen[j]] = IM_agg['val'][:, :, j].T
+    IM_fig_dat['fig2'] = (fig2_hsh, IM_fig2)
+    BS_fig_chg = True
 
-width50_df = pd.DataFrame(0, index=range(Qout_rivwid[0].shape[0]),
+# Set index to timesteps
+time_ind = pd.DatetimeIndex(IM_fig2['time'])
+width0_df = pd.DataFrame(IM_fig2['wid_0'], index=time_ind,
+                         columns=['Qout', 'V_low', 'V_nrm', 'V_hig'])
+width50_df = pd.DataFrame(IM_fig2['wid_50'], index=time_ind,
                           columns=['Qout', 'V_low', 'V_nrm', 'V_hig'])
-
-width100_df = pd.DataFrame(0, index=range(Qout_rivwid[0].shape[0]),
+width100_df = pd.DataFrame(IM_fig2['wid_100'], index=time_ind,
                            columns=['Qout', 'V_low', 'V_nrm', 'V_hig'])
 
-# Loop through region-specific files
-for i in range(len(Qout_rivwid)):
-
-    # Add Qout values from pfaf to summary df
-    width0_df.Qout = width0_df.Qout + Qout_rivwid[i].wid_0
-    width50_df.Qout = width50_df.Qout + Qout_rivwid[i].wid_50
-    width100_df.Qout = width100_df.Qout + Qout_rivwid[i].wid_100
-
-    # Add V values from pfaf to summary df
-    width0_df.V_low = width0_df.V_low + V_rivwid_low[i].wid_0
-    width0_df.V_nrm = width0_df.V_nrm + V_rivwid_nrm[i].wid_0
-    width0_df.V_hig = width0_df.V_hig + V_rivwid_hig[i].wid_0
-
-    width50_df.V_low = width50_df.V_low + V_rivwid_low[i].wid_50
-    width50_df.V_nrm = width50_df.V_nrm + V_rivwid_nrm[i].wid_50
-    width50_df.V_hig = width50_df.V_hig + V_rivwid_hig[i].wid_50
-
-    width100_df.V_low = width100_df.V_low + V_rivwid_low[i].wid_100
-    width100_df.V_nrm = width100_df.V_nrm + V_rivwid_nrm[i].wid_100
-    width100_df.V_hig = width100_df.V_hig + V_rivwid_hig[i].wid_100
-
-# Convert index to datetime format
-time_ind = [datetime.strptime(j, '%Y-%m-%d %H:%M:%S') for j in
-            Qout_rivwid[0].time]
-
-# Set index to timesteps
-width0_df.index = time_ind
-width50_df.index = time_ind
-width100_df.index = time_ind
-
 # ------------------------------------------------------------------------------
 # Plot global monthly discharge to ocean (Figure 2a)
 # ------------------------------------------------------------------------------
@@ -359,9 +330,13 @@ plt.axhline(y=np.mean(width50_df.Qout), c='#4c8376', linestyle='dotted',
             alpha=0.5, lw=2)
 plt.axhline(y=np.mean(width100_df.Qout), c='#96e0cc', linestyle='dotted',
             alpha=0.5, lw=2)
-plt.plot(width0_df.Qout, lw=1.5, c='#00221e', alpha=0.9, label="All Reaches")
-plt.plot(width50_df.Qout, lw=1.5, c='#4c8376', alpha=0.9, label="Width>50m")
-plt.plot(width100_df.Qout, lw=1.5, c='#96e0cc', alpha=0.9, label="Width>100m")
+tsr_ln = []
+tsr_ln += plt.plot(width0_df.Qout, lw=1.5, c='#00221e', alpha=0.9,
+                   label="All Reaches")
+tsr_ln += plt.plot(width50_df.Qout, lw=1.5, c='#4c8376', alpha=0.9,
+                   label="Width>50m")
+tsr_ln += plt.plot(width100_df.Qout, lw=1.5, c='#96e0cc', alpha=0.9,
+                   label="Width>100m")
 ax.xaxis.set_major_locator(mdates.YearLocator(5))
 ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y'))
 plt.gcf().autofmt_xdate()
@@ -370,7 +345,7 @@ plt.ylim(15000, 60000)
 plt.xticks(rotation=0, ha='center')
 plt.xlabel('Time')
 plt.ylabel('Discharge to Ocean (km3/year)')
-plt.savefig(fig2a_out, format='svg')
+mws_fig.fig_save(fig2a_out, [tsr_ln])
 
 # ------------------------------------------------------------------------------
 # Plot global monthly river storage (Figure 2b)
@@ -395,18 +370,19 @@ plt.axhline(y=np.mean(width50_df.V_hig), c='#528eb3',
             linestyle='dotted', alpha=0.5, lw=2)
 plt.axhline(y=np.mean(width100_df.V_hig), c='#bde0f6',
             linestyle='dotted', alpha=0.5, lw=2)
-plt.plot(width0_df.V_low, lw=1.5, c='#a7324b', alpha=0.9)
-plt.plot(width50_df.V_low, lw=1.5, c='#d68590', alpha=0.9)
-plt.plot(width100_df.V_low, lw=1.5, c='#ffd5da', alpha=0.9,
-         label="Short Residence Time")
-plt.plot(width0_df.V_nrm, lw=1.5, c='#468608', alpha=0.9)
-plt.plot(width50_df.V_nrm, lw=1.5, c='#91b66c', alpha=0.9)
-plt.plot(width100_df.V_nrm, lw=1.5, c='#d7e8c4', alpha=0.9,
-         label="Medium Residence Time")
-plt.plot(width0_df.V_hig, lw=1.5, c='#004c6d', alpha=0.9)
-plt.plot(width50_df.V_hig, lw=1.5, c='#528eb3', alpha=0.9)
-plt.plot(width100_df.V_hig, lw=1.5, c='#bde0f6', alpha=0.9,
-         label="Long Residence Time")
+tsr_ln = []
+tsr_ln += plt.plot(width0_df.V_low, lw=1.5, c='#a7324b', alpha=0.9)
+tsr_ln += plt.plot(width50_df.V_low, lw=1.5, c='#d68590', alpha=0.9)
+tsr_ln += plt.plot(width100_df.V_low, lw=1.5, c='#ffd5da', alpha=0.9,
+                   label="Short Residence Time")
+tsr_ln += plt.plot(width0_df.V_nrm, lw=1.5, c='#468608', alpha=0.9)
+tsr_ln += plt.plot(width50_df.V_nrm, lw=1.5, c='#91b66c', alpha=0.9)
+tsr_ln += plt.plot(width100_df.V_nrm, lw=1.5, c='#d7e8c4', alpha=0.9,
+                   label="Medium Residence Time")
+tsr_ln += plt.plot(width0_df.V_hig, lw=1.5, c='#004c6d', alpha=0.9)
+tsr_ln += plt.plot(width50_df.V_hig, lw=1.5, c='#528eb3', alpha=0.9)
+tsr_ln += plt.plot(width100_df.V_hig, lw=1.5, c='#bde0f6', alpha=0.9,
+                   label="Long Residence Time")
 ax.xaxis.set_major_locator(mdates.YearLocator(5))
 ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y'))
 plt.gcf().autofmt_xdate()
@@ -415,7 +391,7 @@ plt.xlabel('Time')
 plt.ylabel('River Storage (km3)')
 plt.ylim(0, 6000)
 plt.xticks(rotation=0, ha='center')
-plt.savefig(fig2b_out, format='svg')
+mws_fig.fig_save(fig2b_out, [tsr_ln])
 
 
 # *******************************************************************************
@@ -468,7 +444,7 @@ plt.xticks(rotation=0, ha='center')
 
 fig.tight_layout()
 plt.gca().invert_xaxis()
-plt.savefig(fig3_out, format='svg')
+mws_fig.fig_save(fig3_out)
 
 
 # ******************************************************************************
@@ -476,16 +452,31 @@ plt.savefig(fig3_out, format='svg')
 # ******************************************************************************
 print('- Generating Figure 4')
 # ------------------------------------------------------------------------------
-# Prepare data for plotting
+# Prepare data for plotting, unless stored
 # ------------------------------------------------------------------------------
-# Set total Q to ocean from all rivers (km3/yr)
-Q_oc = np.mean(width0_df.Qout)
+fig4_hsh = mws_fig.fig_hsh([Qout_rivwid_csv, Qout_small_csv, Qout_large_csv])
+IM_fig4 = mws_fig.fig_dat_get(IM_fig_dat, 'fig4', fig4_hsh)
+if IM_fig4 is None:
+    # Read narrow and largest coastal rivers files
+    Qout_small = pd.read_csv(Qout_small_csv)
+    Qout_large = pd.read_csv(Qout_large_csv)
+
+    # Set total Q to ocean from all rivers (km3/yr)
+    Q_oc = np.mean(width0_df.Qout)
+
+    # Calculate proportion of discharge to the ocean from rivers smaller than
+    # 100m
+    Q_sm_prp = 100*(np.sum(Qout_small.Qout_cor)/Q_oc)
+
+    # Arrange Q_lg values for bar plot
+    Q_lg_prp = 100*(Qout_large.Qout_cor/Q_oc)
 
-# Calculate proportion of discharge to the ocean from rivers smaller than 100m
-Q_sm_prp = 100*(np.sum(Qout_small.Qout_cor)/Q_oc)
+    IM_fig4 = {'sm_prp': np.array(Q_sm_prp), 'lg_prp': Q_lg_prp.to_numpy()}
+    IM_fig_dat['fig4'] = (fig4_hsh, IM_fig4)
+    BS_fig_chg = True
 
-# Arrange Q_lg values for bar plot
-Q_lg_prp = 100*(Qout_large.Qout_cor/Q_oc)
+Q_sm_prp = float(IM_fig4['sm_prp'])
+Q_lg_prp = IM_fig4['lg_prp']
 
 # ------------------------------------------------------------------------------
 # Create bar plot
@@ -496,7 +487,7 @@ blues = ['#112f47', '#143753', '#173e5e', '#1a466a', '#1d4e76', '#346084',
 fig, ax = plt.subplots(figsize=(6, 4))
 
 # Stacked bar chart with loop
-for i in range(Qout_large.shape[0]):
+for i in range(len(Q_lg_prp)):
     ax.barh('lg', Q_lg_prp[i], height=0.7, left=np.sum(Q_lg_prp[:i]),
             color=blues[i], edgecolor='white', alpha=0.9, linewidth=2)
 
@@ -505,4 +496,12 @@ ax.barh('sm', Q_sm_prp, height=0.7, color='#800e10', edgecolor='white',
 
 plt.xlabel('Proportion of Total Discharge to Ocean (%)')
 plt.xlim([0, 40])
-plt.savefig(fig4_out, format='svg')
+mws_fig.fig_save(fig4_out)
+
+
+# ******************************************************************************
+# Write stored figure data
+# ******************************************************************************
+if fig_npz is not None and BS_fig_chg:
+    print('- Writing stored figure data')
+    mws_fig.fig_dat_save(IM_fig_dat, fig_npz)
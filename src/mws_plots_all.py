@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# ******************************************************************************
+# mws_plots_all.py
+# ******************************************************************************
+
+# Purpose:
+# Given a text file listing invocations of the mws_plots*.py scripts (one per
+# line, as in the test scripts), render all figures in parallel on the
+# non-interactive Agg backend, and skip invocations whose script and inputs
+# are unchanged since their last successful run. Inputs are the arguments that
+# are existing files or folders, other than figures and npz caches, and are
+# compared through the size and modification time of all their files, which
+# are stored in a manifest. Shared inputs are best given in their consolidated
+# forms (reach attribute table, consolidated summary, validation statistics,
+# and histogram caches) so that each invocation reads little data. The output
+# mode and resolution of figures can be selected for all invocations (see
+# mws_fig.py).
+
+# Author:
+# Jeffrey Wade, Cedric H. David, 2025
+
+# ******************************************************************************
+# Import packages
+# ******************************************************************************
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import shlex
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+
+# ******************************************************************************
+# Declaration of variables (given as command line arguments)
+# ******************************************************************************
+# 1 - plt_txt
+# 2 - plt_man
+# 3 - IS_cpu (optional, number of processes, 1 by default)
+# 4 - fig_mode (optional, 'vector' by default, or 'hybrid')
+# 5 - fig_dpi (optional, resolution of png files and rasterized layers)
+
+
+# ******************************************************************************
+# Get command line arguments
+# ******************************************************************************
+IS_arg = len(sys.argv)
+if (IS_arg < 3) or (IS_arg > 6):
+    print('ERROR - 2 to 5 arguments must be used')
+    raise SystemExit(22)
+
+plt_txt = sys.argv[1]
+plt_man = sys.argv[2]
+
+# Allow option of rendering in parallel
+IS_cpu = 1
+if IS_arg >= 4:
+    IS_cpu = int(sys.argv[3])
+
+# Allow option of selecting output mode and resolution of figures
+IM_fig_env = {}
+if IS_arg >= 5:
+    IM_fig_env['MWS_FIG_MODE'] = sys.argv[4]
+if IS_arg == 6:
+    IM_fig_env['MWS_FIG_DPI'] = sys.argv[5]
+
+
+# ******************************************************************************
+# Check if files exist
+# ******************************************************************************
+try:
+    with open(plt_txt) as file:
+        pass
+except IOError:
+    print('ERROR - Unable to open '+plt_txt)
+    raise SystemExit(22)
+
+
+# ******************************************************************************
+# Declaration of variables
+# ******************************************************************************
+# Extensions of figures, which are outputs rather than inputs
+IV_plt_fig = ['.svg', '.png', '.pdf', '.jpg', '.jpeg', '.tif', '.tiff']
+
+# Extensions of caches, which are written by the scripts themselves
+IV_plt_chd = ['.npz']
+
+
+# ******************************************************************************
+# Define function to sign inputs of an invocation
+# ******************************************************************************
+# The script and the mws_*.py modules next to it are signed by their content,
+# other inputs by the size and modification time of all their files, and the
+# output mode of figures is signed as well
+def plt_sig(plt_cmd):
+
+    IM_sig = hashlib.sha256()
+    plt_src_all = [plt_cmd[0]] + sorted(glob.iglob(os.path.join(
+        os.path.dirname(plt_cmd[0]), 'mws_*.py')))
+    for plt_src_fp in plt_src_all:
+        with open(plt_src_fp, 'rb') as plt_src:
+            IM_sig.update(plt_src.read())
+    IM_sig.update(json.dumps(IM_fig_env, sort_keys=True).encode())
+
+    for plt_arg in plt_cmd[1:]:
+        IM_sig.update(plt_arg.encode())
+        if os.path.splitext(plt_arg)[1].lower() in IV_plt_fig + IV_plt_chd:
+            continue
+
+        if os.path.isfile(plt_arg):
+            plt_fps = [plt_arg]
+        elif os.path.isdir(plt_arg):
+            plt_fps = sorted(os.path.join(x, y) for x, _, z in
+                             os.walk(plt_arg) for y in z)
+        else:
+            continue
+
+        for plt_fp in plt_fps:
+            plt_st = os.stat(plt_fp)
+            IM_sig.update((plt_fp+' '+str(plt_st.st_size)+' ' +
+                           str(plt_st.st_mtime_ns)+'\n').encode())
+
+    return IM_sig.hexdigest()
+
+
+# ******************************************************************************
+# Define function to render figures of an invocation
+# ******************************************************************************
+# Figures are rendered headless in a separate Python process
+def plt_run(plt_cmd):
+
+    plt_env = dict(os.environ, MPLBACKEND='Agg', **IM_fig_env)
+    plt_res = subprocess.run([sys.executable] + plt_cmd, env=plt_env,
+                             stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                             universal_newlines=True)
+
+    return plt_res.returncode, plt_res.stdout
+
+
+# ******************************************************************************
+# Read files
+# ******************************************************************************
+print('- Reading files')
+# ------------------------------------------------------------------------------
+# Invocations, ignoring blank lines and comments
+# ------------------------------------------------------------------------------
+plt_cmd_all = []
+with open(plt_txt) as plt_fl:
+    for plt_ln in plt_fl:
+        plt_cmd = shlex.split(plt_ln, comments=True)
+        if len(plt_cmd) > 0:
+            plt_cmd_all.append(plt_cmd)
+
+for plt_cmd in plt_cmd_all:
+    if not os.path.isfile(plt_cmd[0]):
+        print('ERROR - Unable to open '+plt_cmd[0])
+        raise SystemExit(22)
+
+# ------------------------------------------------------------------------------
+# Manifest of previous runs
+# ------------------------------------------------------------------------------
+IM_man = {}
+if os.path.isfile(plt_man):
+    with open(plt_man) as man:
+        IM_man = json.load(man)
+
+
+# ******************************************************************************
+# Select invocations to run
+# ******************************************************************************
+print('- Selecting invocations with changed inputs')
+plt_key_all = [shlex.join(x) for x in plt_cmd_all]
+plt_sig_all = [plt_sig(x) for x in plt_cmd_all]
+
+IV_run = []
+for j in range(len(plt_cmd_all)):
+    plt_out = [x for x in plt_cmd_all[j][1:] if
+               os.path.splitext(x)[1].lower() in IV_plt_fig]
+    if IM_man.get(plt_key_all[j]) == plt_sig_all[j] and                       \
+            all(os.path.isfile(x) for x in plt_out):
+        print('  . Skipping '+plt_cmd_all[j][0])
+    else:
+        IV_run.append(j)
+
+
+# ******************************************************************************
+# Render figures
+# ******************************************************************************
+print('- Rendering figures of '+str(len(IV_run))+' invocation(s)')
+if len(IV_run) > 0:
+    with ProcessPoolExecutor(max_workers=max(min(IS_cpu, len(IV_run)), 1),
+                             mp_context=multiprocessing.get_context('fork')
+                             ) as executor:
+        plt_res_all = list(executor.map(plt_run,
+                                        [plt_cmd_all[j] for j in IV_run]))
+else:
+    plt_res_all = []
+
+# ------------------------------------------------------------------------------
+# Report failures, and record successful invocations only
+# ------------------------------------------------------------------------------
+BS_err = False
+for j, (IS_ret, plt_log) in zip(IV_run, plt_res_all):
+    if IS_ret == 0:
+        IM_man[plt_key_all[j]] = plt_sig_all[j]
+    else:
+        print('ERROR - Failed run: '+plt_key_all[j])
+        print(plt_log)
+        IM_man.pop(plt_key_all[j], None)
+        BS_err = True
+
+
+# ******************************************************************************
+# Write manifest
+# ******************************************************************************
+print('- Writing manifest')
+with open(plt_man, 'w') as man:
+    json.dump(IM_man, man, indent=1, sort_keys=True)
+
+if BS_err:
+    raise SystemExit(22)
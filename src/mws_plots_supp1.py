@@ -6,7 +6,9 @@
 # Purpose:
 # Given all output files from previous scripts, generate visualizations for
 # supplemental figures related to sensitivity of using simulations from several
-# land surface models to estimate river width.
+# land surface models to estimate river width. The format of each figure
+# follows its extension, and all figures are rendered from compact
+# specifications, reading each proportion file once (see mws_fig.py).
 
 # Author:
 # Jeffrey Wade, Cedric H. David, 2025
@@ -16,9 +18,10 @@
 # Import packages
 # ******************************************************************************
 import pandas as pd
-import matplotlib.pyplot as plt
 import sys
 import os
+import mws_fig
+import mws_sum
 
 
 # ******************************************************************************
@@ -44,152 +47,189 @@ import os
 # 17 - fig_s2_out
 # 18 - fig_s3_out
 # 19 - fig_s4_out
+# or
+# 1 - sum_all_csv (consolidated summary, see mws_summary_all.py)
+# 2 to 5 - figure outputs, as above
 
 
 # ******************************************************************************
 # Get command line arguments
 # ******************************************************************************
 IS_arg = len(sys.argv)
-if IS_arg != 21:
-    print('ERROR - 20 arguments must be used')
+if IS_arg != 21 and IS_arg != 6:
+    print('ERROR - 20 or 5 arguments must be used')
     raise SystemExit(22)
 
-Qout_prop_ENS_csv = sys.argv[1]
-Qout_range_prop_ENS_csv = sys.argv[2]
-Qout_prop_VIC_csv = sys.argv[3]
-Qout_range_prop_VIC_csv = sys.argv[4]
-Qout_prop_CLSM_csv = sys.argv[5]
-Qout_range_prop_CLSM_csv = sys.argv[6]
-Qout_prop_NOAH_csv = sys.argv[7]
-Qout_range_prop_NOAH_csv = sys.argv[8]
-V_prop_ENS_csv = sys.argv[9]
-V_range_prop_ENS_csv = sys.argv[10]
-V_prop_VIC_csv = sys.argv[11]
-V_range_prop_VIC_csv = sys.argv[12]
-V_prop_CLSM_csv = sys.argv[13]
-V_range_prop_CLSM_csv = sys.argv[14]
-V_prop_NOAH_csv = sys.argv[15]
-V_range_prop_NOAH_csv = sys.argv[16]
-fig_s1_out = sys.argv[17]
-fig_s2_out = sys.argv[18]
-fig_s3_out = sys.argv[19]
-fig_s4_out = sys.argv[20]
+# Allow option of reading all datasets from a consolidated summary written
+# by mws_summary_all.py, in which case inputs are (dataset, statistic)
+BS_sum = IS_arg == 6
+
+if not BS_sum:
+    Qout_prop_ENS_csv = sys.argv[1]
+    Qout_range_prop_ENS_csv = sys.argv[2]
+    Qout_prop_VIC_csv = sys.argv[3]
+    Qout_range_prop_VIC_csv = sys.argv[4]
+    Qout_prop_CLSM_csv = sys.argv[5]
+    Qout_range_prop_CLSM_csv = sys.argv[6]
+    Qout_prop_NOAH_csv = sys.argv[7]
+    Qout_range_prop_NOAH_csv = sys.argv[8]
+    V_prop_ENS_csv = sys.argv[9]
+    V_range_prop_ENS_csv = sys.argv[10]
+    V_prop_VIC_csv = sys.argv[11]
+    V_range_prop_VIC_csv = sys.argv[12]
+    V_prop_CLSM_csv = sys.argv[13]
+    V_range_prop_CLSM_csv = sys.argv[14]
+    V_prop_NOAH_csv = sys.argv[15]
+    V_range_prop_NOAH_csv = sys.argv[16]
+else:
+    sum_all_csv = sys.argv[1]
+
+    # Main (corrected ENS) simulations are shown as ENS, with normal volumes
+    Qout_prop_ENS_csv = ('Qout_COR', 'prop')
+    Qout_range_prop_ENS_csv = ('Qout_COR', 'range_prop')
+    Qout_prop_VIC_csv = ('Qout_VIC', 'prop')
+    Qout_range_prop_VIC_csv = ('Qout_VIC', 'range_prop')
+    Qout_prop_CLSM_csv = ('Qout_CLSM', 'prop')
+    Qout_range_prop_CLSM_csv = ('Qout_CLSM', 'range_prop')
+    Qout_prop_NOAH_csv = ('Qout_NOAH', 'prop')
+    Qout_range_prop_NOAH_csv = ('Qout_NOAH', 'range_prop')
+    V_prop_ENS_csv = ('V_nrm_COR', 'prop')
+    V_range_prop_ENS_csv = ('V_nrm_COR', 'range_prop')
+    V_prop_VIC_csv = ('V_nrm_VIC', 'prop')
+    V_range_prop_VIC_csv = ('V_nrm_VIC', 'range_prop')
+    V_prop_CLSM_csv = ('V_nrm_CLSM', 'prop')
+    V_range_prop_CLSM_csv = ('V_nrm_CLSM', 'range_prop')
+    V_prop_NOAH_csv = ('V_nrm_NOAH', 'prop')
+    V_range_prop_NOAH_csv = ('V_nrm_NOAH', 'range_prop')
+
+fig_s1_out = sys.argv[IS_arg-4]
+fig_s2_out = sys.argv[IS_arg-3]
+fig_s3_out = sys.argv[IS_arg-2]
+fig_s4_out = sys.argv[IS_arg-1]
 
 
 # ******************************************************************************
 # Check if files/folders exist
 # ******************************************************************************
-try:
-    if os.path.isdir(Qout_prop_ENS_csv):
-        pass
-except IOError:
-    print('ERROR - '+Qout_prop_ENS_csv+' invalid folder path')
-    raise SystemExit(22)
-
-try:
-    with open(Qout_range_prop_ENS_csv) as file:
-        pass
-except IOError:
-    print('ERROR - Unable to open '+Qout_range_prop_ENS_csv)
-    raise SystemExit(22)
-
-try:
-    with open(Qout_prop_VIC_csv) as file:
-        pass
-except IOError:
-    print('ERROR - Unable to open '+Qout_prop_VIC_csv)
-    raise SystemExit(22)
-
-try:
-    if os.path.isdir(Qout_range_prop_VIC_csv):
-        pass
-except IOError:
-    print('ERROR - '+Qout_range_prop_VIC_csv+' invalid folder path')
-    raise SystemExit(22)
-
-try:
-    with open(Qout_prop_CLSM_csv) as file:
-        pass
-except IOError:
-    print('ERROR - Unable to open '+Qout_prop_CLSM_csv)
-    raise SystemExit(22)
-
-try:
-    with open(Qout_range_prop_CLSM_csv) as file:
-        pass
-except IOError:
-    print('ERROR - Unable to open '+Qout_range_prop_CLSM_csv)
-    raise SystemExit(22)
-
-try:
-    with open(Qout_prop_NOAH_csv) as file:
-        pass
-except IOError:
-    print('ERROR - Unable to open '+Qout_prop_NOAH_csv)
-    raise SystemExit(22)
-
-try:
-    with open(Qout_range_prop_NOAH_csv) as file:
-        pass
-except IOError:
-    print('ERROR - Unable to open '+Qout_range_prop_NOAH_csv)
-    raise SystemExit(22)
-
-try:
-    with open(V_prop_ENS_csv) as file:
-        pass
-except IOError:
-    print('ERROR - Unable to open '+V_prop_ENS_csv)
-    raise SystemExit(22)
-
-try:
-    with open(V_range_prop_ENS_csv) as file:
-        pass
-except IOError:
-    print('ERROR - Unable to open '+V_range_prop_ENS_csv)
-    raise SystemExit(22)
-
-try:
-    if os.path.isdir(V_prop_VIC_csv):
-        pass
-except IOError:
-    print('ERROR - '+V_prop_VIC_csv+' invalid folder path')
-    raise SystemExit(22)
-
-try:
-    if os.path.isdir(V_range_prop_VIC_csv):
-        pass
-except IOError:
-    print('ERROR - '+V_range_prop_VIC_csv+' invalid folder path')
-    raise SystemExit(22)
-
-try:
-    if os.path.isdir(V_prop_CLSM_csv):
-        pass
-except IOError:
-    print('ERROR - '+V_prop_CLSM_csv+' invalid folder path')
-    raise SystemExit(22)
-
-try:
-    with open(V_range_prop_CLSM_csv) as file:
-        pass
-except IOError:
-    print('ERROR - Unable to open '+V_range_prop_CLSM_csv)
-    raise SystemExit(22)
-
-try:
-    with open(V_prop_NOAH_csv) as file:
-        pass
-except IOError:
-    print('ERROR - Unable to open '+V_prop_NOAH_csv)
-    raise SystemExit(22)
-
-try:
-    with open(V_range_prop_NOAH_csv) as file:
-        pass
-except IOError:
-    print('ERROR - Unable to open '+V_range_prop_NOAH_csv)
-    raise SystemExit(22)
+if not BS_sum:
+    try:
+        if os.path.isdir(Qout_prop_ENS_csv):
+            pass
+    except IOError:
+        print('ERROR - '+Qout_prop_ENS_csv+' invalid folder path')
+        raise SystemExit(22)
+
+    try:
+        with open(Qout_range_prop_ENS_csv) as file:
+            pass
+    except IOError:
+        print('ERROR - Unable to open '+Qout_range_prop_ENS_csv)
+        raise SystemExit(22)
+
+    try:
+        with open(Qout_prop_VIC_csv) as file:
+            pass
+    except IOError:
+        print('ERROR - Unable to open '+Qout_prop_VIC_csv)
+        raise SystemExit(22)
+
+    try:
+        if os.path.isdir(Qout_range_prop_VIC_csv):
+            pass
+    except IOError:
+        print('ERROR - '+Qout_range_prop_VIC_csv+' invalid folder path')
+        raise SystemExit(22)
+
+    try:
+        with open(Qout_prop_CLSM_csv) as file:
+            pass
+    except IOError:
+        print('ERROR - Unable to open '+Qout_prop_CLSM_csv)
+        raise SystemExit(22)
+
+    try:
+        with open(Qout_range_prop_CLSM_csv) as file:
+            pass
+    except IOError:
+        print('ERROR - Unable to open '+Qout_range_prop_CLSM_csv)
+        raise SystemExit(22)
+
+    try:
+        with open(Qout_prop_NOAH_csv) as file:
+            pass
+    except IOError:
+        print('ERROR - Unable to open '+Qout_prop_NOAH_csv)
+        raise SystemExit(22)
+
+    try:
+        with open(Qout_range_prop_NOAH_csv) as file:
+            pass
+    except IOError:
+        print('ERROR - Unable to open '+Qout_range_prop_NOAH_csv)
+        raise SystemExit(22)
+
+    try:
+        with open(V_prop_ENS_csv) as file:
+            pass
+    except IOError:
+        print('ERROR - Unable to open '+V_prop_ENS_csv)
+        raise SystemExit(22)
+
+    try:
+        with open(V_range_prop_ENS_csv) as file:
+            pass
+    except IOError:
+        print('ERROR - Unable to open '+V_range_prop_ENS_csv)
+        raise SystemExit(22)
+
+    try:
+        if os.path.isdir(V_prop_VIC_csv):
+            pass
+    except IOError:
+        print('ERROR - '+V_prop_VIC_csv+' invalid folder path')
+        raise SystemExit(22)
+
+    try:
+        if os.path.isdir(V_range_prop_VIC_csv):
+            pass
+    except IOError:
+        print('ERROR - '+V_range_prop_VIC_csv+' invalid folder path')
+        raise SystemExit(22)
+
+    try:
+        if os.path.isdir(V_prop_CLSM_csv):
+            pass
+    except IOError:
+        print('ERROR - '+V_prop_CLSM_csv+' invalid folder path')
+        raise SystemExit(22)
+
+    try:
+        with open(V_range_prop_CLSM_csv) as file:
+            pass
+    except IOError:
+        print('ERROR - Unable to open '+V_range_prop_CLSM_csv)
+        raise SystemExit(22)
+
+    try:
+        with open(V_prop_NOAH_csv) as file:
+            pass
+    except IOError:
+        print('ERROR - Unable to open '+V_prop_NOAH_csv)
+        raise SystemExit(22)
+
+    try:
+        with open(V_range_prop_NOAH_csv) as file:
+            pass
+    except IOError:
+        print('ERROR - Unable to open '+V_range_prop_NOAH_csv)
+        raise SystemExit(22)
+else:
+    try:
+        with open(sum_all_csv) as file:
+            pass
+    except IOError:
+        print('ERROR - Unable to open '+sum_all_csv)
+        raise SystemExit(22)
 
 
 # ******************************************************************************
@@ -197,275 +237,76 @@ except IOError:
 # ******************************************************************************
 print('- Reading files')
 # ------------------------------------------------------------------------------
-# Qout_rivwidth Files
-# ------------------------------------------------------------------------------
-# Read files: ENS
-Qout_prop_ENS = pd.read_csv(Qout_prop_ENS_csv)
-Qout_range_prop_ENS = pd.read_csv(Qout_range_prop_ENS_csv)
-
-# Read files: VIC
-Qout_prop_VIC = pd.read_csv(Qout_prop_VIC_csv)
-Qout_range_prop_VIC = pd.read_csv(Qout_range_prop_VIC_csv)
-
-# Read files: CLSM
-Qout_prop_CLSM = pd.read_csv(Qout_prop_CLSM_csv)
-Qout_range_prop_CLSM = pd.read_csv(Qout_range_prop_CLSM_csv)
-
-# Read files: NOAH
-Qout_prop_NOAH = pd.read_csv(Qout_prop_NOAH_csv)
-Qout_range_prop_NOAH = pd.read_csv(Qout_range_prop_NOAH_csv)
-
-
-# ------------------------------------------------------------------------------
-# V_rivwidth Files
-# ------------------------------------------------------------------------------
-# Read files: ENS
-V_prop_ENS = pd.read_csv(V_prop_ENS_csv)
-V_range_prop_ENS = pd.read_csv(V_range_prop_ENS_csv)
-
-# Read files: VIC
-V_prop_VIC = pd.read_csv(V_prop_VIC_csv)
-V_range_prop_VIC = pd.read_csv(V_range_prop_VIC_csv)
-
-# Read files: CLSM
-V_prop_CLSM = pd.read_csv(V_prop_CLSM_csv)
-V_range_prop_CLSM = pd.read_csv(V_range_prop_CLSM_csv)
-
-# Read files: NOAH
-V_prop_NOAH = pd.read_csv(V_prop_NOAH_csv)
-V_range_prop_NOAH = pd.read_csv(V_range_prop_NOAH_csv)
-
-
-# *******************************************************************************
-# Supplemental Figure 1
-# *******************************************************************************
-print('- Generating Supplemental Figure 1')
-# ------------------------------------------------------------------------------
-# Plot River Width Scenarios for Datasets: Qout Mean;
-# ------------------------------------------------------------------------------
-# Set max river width scenario
-n_s = 500
-
-# Set river width step size
-step = 5
-
-# Set river width scenario values
-wid_scen = pd.DataFrame(list(range(n_s, -1, -step)))
-
-# Retrieve select points for scatter plot
-rivwid_scen_pt = wid_scen.iloc[range(0, len(wid_scen)+1, 5)]
-Qout_pt_ENS = Qout_prop_ENS.iloc[range(0, len(wid_scen)+1, 5)]
-Qout_pt_VIC = Qout_prop_VIC.iloc[range(0, len(wid_scen)+1, 5)]
-Qout_pt_CLSM = Qout_prop_CLSM.iloc[range(0, len(wid_scen)+1, 5)]
-Qout_pt_NOAH = Qout_prop_NOAH.iloc[range(0, len(wid_scen)+1, 5)]
-
-# Create plot
-fig, ax = plt.subplots()
-
-col1 = 'black'
-col2 = '#124375'
-col3 = '#a559aa'
-col4 = '#e02b35'
-
-ax.plot(rivwid_scen_pt, Qout_pt_VIC.iloc[:, 1], color=col2,
-        alpha=0.8, label='VIC', zorder=1)
-ax.scatter(rivwid_scen_pt, Qout_pt_VIC.iloc[:, 1],
-           color=col2, label='VIC', zorder=1)
-
-ax.plot(rivwid_scen_pt, Qout_pt_CLSM.iloc[:, 1], color=col3,
-        alpha=0.8, label='CLSM', zorder=2)
-ax.scatter(rivwid_scen_pt, Qout_pt_CLSM.iloc[:, 1],
-           color=col3, label='CLSM', zorder=3)
-
-ax.plot(rivwid_scen_pt, Qout_pt_NOAH.iloc[:, 1], color=col4,
-        alpha=0.8, label='NOAH', zorder=3)
-ax.scatter(rivwid_scen_pt, Qout_pt_NOAH.iloc[:, 1],
-           color=col4, label='NOAH', zorder=3)
-
-ax.plot(rivwid_scen_pt, Qout_pt_ENS.iloc[:, 1], color=col1,
-        linewidth=2, label='ENS', zorder=4)
-ax.scatter(rivwid_scen_pt, Qout_pt_ENS.iloc[:, 1],
-           color=col1, s=60, label='ENS', zorder=4)
-
-
-ax.set_xlabel('Aggregation for All Rivers Wider Than Given Width (m)')
-ax.set_ylabel('Proportion of Mean Global Discharge to the Ocean Observed (%)')
-
-ax.set_ylim([40, 101])
-plt.xticks(rotation=0, ha='center')
-plt.legend()
-
-fig.tight_layout()
-plt.gca().invert_xaxis()
-
-plt.savefig(fig_s1_out, format='svg')
-
-
-# *******************************************************************************
-# Supplemental Figure 2
-# *******************************************************************************
-print('- Generating Supplemental Figure 2')
-# ------------------------------------------------------------------------------
-# Plot River Width Scenarios for Datasets: Qout Range;
+# Consolidated summary
 # ------------------------------------------------------------------------------
-# Retrieve select points for scatter plot
-rivwid_scen_pt = wid_scen.iloc[range(0, len(wid_scen)+1, 5)]
-Qout_range_pt_ENS = Qout_range_prop_ENS.iloc[range(0, len(wid_scen)+1, 5)]
-Qout_range_pt_VIC = Qout_range_prop_VIC.iloc[range(0, len(wid_scen)+1, 5)]
-Qout_range_pt_CLSM = Qout_range_prop_CLSM.iloc[range(0, len(wid_scen)+1, 5)]
-Qout_range_pt_NOAH = Qout_range_prop_NOAH.iloc[range(0, len(wid_scen)+1, 5)]
-
-# Create plot
-fig, ax = plt.subplots()
-
-col1 = 'black'
-col2 = '#124375'
-col3 = '#a559aa'
-col4 = '#e02b35'
+if BS_sum:
+    sum_all = mws_sum.sum_tbl_read(sum_all_csv)
 
-ax.plot(rivwid_scen_pt, Qout_range_pt_VIC.iloc[:, 1], color=col2,
-        linestyle='dashed', alpha=0.8, label='VIC', zorder=1)
-ax.scatter(rivwid_scen_pt, Qout_range_pt_VIC.iloc[:, 1],
-           color=col2, label='VIC', zorder=1)
 
-ax.plot(rivwid_scen_pt, Qout_range_pt_CLSM.iloc[:, 1], color=col3,
-        linestyle='dashed', alpha=0.8, label='CLSM', zorder=2)
-ax.scatter(rivwid_scen_pt, Qout_range_pt_CLSM.iloc[:, 1],
-           color=col3, label='CLSM', zorder=2)
+# Read proportion file, or its statistic of consolidated summary
+def prop_read(prop_in):
 
-ax.plot(rivwid_scen_pt, Qout_range_pt_NOAH.iloc[:, 1], color=col4,
-        linestyle='dashed', alpha=0.8, label='NOAH', zorder=3)
-ax.scatter(rivwid_scen_pt, Qout_range_pt_NOAH.iloc[:, 1],
-           color=col4, label='NOAH', zorder=3)
+    if BS_sum:
+        return mws_sum.sum_tbl_sel(sum_all, *prop_in)
 
-ax.plot(rivwid_scen_pt, Qout_range_pt_ENS.iloc[:, 1], color=col1,
-        linestyle='dashed', linewidth=2, label='ENS', zorder=4)
-ax.scatter(rivwid_scen_pt, Qout_range_pt_ENS.iloc[:, 1],
-           color=col1, s=60, label='ENS', zorder=4)
+    return pd.read_csv(prop_in)
 
 
-ax.set_xlabel('Aggregation for All Rivers Wider Than Given Width (m)')
-ax.set_ylabel('Proportion of Mean Annual Range of Global Discharge to the Ocean'
-              'Observed (%)')
-
-ax.set_ylim([40, 101])
-plt.xticks(rotation=0, ha='center')
-plt.legend()
-
-fig.tight_layout()
-plt.gca().invert_xaxis()
-
-plt.savefig(fig_s2_out, format='svg')
-
+# ******************************************************************************
+# Declaration of figures
+# ******************************************************************************
+# Styles of datasets, in the order they are drawn
+IV_sty = [{'label': 'VIC', 'color': '#124375',
+           'plot': {'alpha': 0.8, 'zorder': 1}, 'scatter': {'zorder': 1}},
+          {'label': 'CLSM', 'color': '#a559aa',
+           'plot': {'alpha': 0.8, 'zorder': 2}, 'scatter': {'zorder': 3}},
+          {'label': 'NOAH', 'color': '#e02b35',
+           'plot': {'alpha': 0.8, 'zorder': 3}, 'scatter': {'zorder': 3}},
+          {'label': 'ENS', 'color': 'black',
+           'plot': {'linewidth': 2, 'zorder': 4},
+           'scatter': {'s': 60, 'zorder': 4}}]
+
+# Scatter of CLSM is drawn below axes spines in Supplemental Figure 2
+IV_sty_s2 = IV_sty[:1] + [dict(IV_sty[1], scatter={'zorder': 2})] + IV_sty[2:]
+
+IV_fig = [{'name': 'Supplemental Figure 1', 'out': fig_s1_out,
+           'in': [Qout_prop_VIC_csv, Qout_prop_CLSM_csv, Qout_prop_NOAH_csv,
+                  Qout_prop_ENS_csv], 'sty': IV_sty,
+           'ylabel': 'Proportion of Mean Global Discharge to the Ocean '
+                     'Observed (%)',
+           'ylim': [40, 101]},
+          {'name': 'Supplemental Figure 2', 'out': fig_s2_out,
+           'in': [Qout_range_prop_VIC_csv, Qout_range_prop_CLSM_csv,
+                  Qout_range_prop_NOAH_csv, Qout_range_prop_ENS_csv],
+           'sty': IV_sty_s2,
+           'ylabel': 'Proportion of Mean Annual Range of Global Discharge to '
+                     'the OceanObserved (%)',
+           'ylim': [40, 101], 'plot': {'linestyle': 'dashed'}},
+          {'name': 'Supplemental Figure 3', 'out': fig_s3_out,
+           'in': [V_prop_VIC_csv, V_prop_CLSM_csv, V_prop_NOAH_csv,
+                  V_prop_ENS_csv], 'sty': IV_sty,
+           'ylabel': 'Proportion of Mean Global River Storage Observed (%)',
+           'ylim': [40, 101], 'scatter': {'marker': 'D'}},
+          {'name': 'Supplemental Figure 4', 'out': fig_s4_out,
+           'in': [V_range_prop_VIC_csv, V_range_prop_CLSM_csv,
+                  V_range_prop_NOAH_csv, V_range_prop_ENS_csv],
+           'sty': IV_sty,
+           'ylabel': 'Proportion of Mean Annual Range of Global River Storage'
+                     ' Observed (%)',
+           'ylim': [40, 101], 'plot': {'linestyle': 'dashed'},
+           'scatter': {'marker': 'D'}}]
 
-# *******************************************************************************
-# Supplemental Figure 3
-# *******************************************************************************
-print('- Generating Supplemental Figure 3')
 # ------------------------------------------------------------------------------
-# Plot River Width Scenarios for Datasets: Volume Mean;
+# Proportion files of all figures, read once
 # ------------------------------------------------------------------------------
-# Retrieve select points for scatter plot
-rivwid_scen_pt = wid_scen.iloc[range(0, len(wid_scen)+1, 5)]
-V_pt_ENS = V_prop_ENS.iloc[range(0, len(wid_scen)+1, 5)]
-V_pt_VIC = V_prop_VIC.iloc[range(0, len(wid_scen)+1, 5)]
-V_pt_CLSM = V_prop_CLSM.iloc[range(0, len(wid_scen)+1, 5)]
-V_pt_NOAH = V_prop_NOAH.iloc[range(0, len(wid_scen)+1, 5)]
-
-# Create plot
-fig, ax = plt.subplots()
-
-col1 = 'black'
-col2 = '#124375'
-col3 = '#a559aa'
-col4 = '#e02b35'
-
-ax.plot(rivwid_scen_pt, V_pt_VIC.iloc[:, 1], color=col2,
-        alpha=0.8, label='VIC', zorder=1)
-ax.scatter(rivwid_scen_pt, V_pt_VIC.iloc[:, 1],
-           color=col2, marker='D', label='VIC', zorder=1)
-
-ax.plot(rivwid_scen_pt, V_pt_CLSM.iloc[:, 1], color=col3,
-        alpha=0.8, label='CLSM', zorder=2)
-ax.scatter(rivwid_scen_pt, V_pt_CLSM.iloc[:, 1],
-           color=col3, marker='D', label='CLSM', zorder=3)
-
-ax.plot(rivwid_scen_pt, V_pt_NOAH.iloc[:, 1], color=col4,
-        alpha=0.8, label='NOAH', zorder=3)
-ax.scatter(rivwid_scen_pt, V_pt_NOAH.iloc[:, 1],
-           color=col4, marker='D', label='NOAH', zorder=3)
+IM_pt = mws_fig.fig_cmp_read(IV_fig, prop_read)
 
-ax.plot(rivwid_scen_pt, V_pt_ENS.iloc[:, 1], color=col1,
-        linewidth=2, label='ENS', zorder=4)
-ax.scatter(rivwid_scen_pt, V_pt_ENS.iloc[:, 1],
-           color=col1, marker='D', s=60, label='ENS', zorder=4)
 
-
-ax.set_xlabel('Aggregation for All Rivers Wider Than Given Width (m)')
-ax.set_ylabel('Proportion of Mean Global River Storage Observed (%)')
-
-ax.set_ylim([40, 101])
-plt.xticks(rotation=0, ha='center')
-plt.legend()
-
-fig.tight_layout()
-plt.gca().invert_xaxis()
-
-plt.savefig(fig_s3_out, format='svg')
-
-
-# *******************************************************************************
-# Supplemental Figure 4
-# *******************************************************************************
-print('- Generating Supplemental Figure 4')
-# ------------------------------------------------------------------------------
-# Plot River Width Scenarios for Datasets: Volume Range;
-# ------------------------------------------------------------------------------
-# Retrieve select points for scatter plot
-rivwid_scen_pt = wid_scen.iloc[range(0, len(wid_scen)+1, 5)]
-V_range_pt_ENS = V_range_prop_ENS.iloc[range(0, len(wid_scen)+1, 5)]
-V_range_pt_VIC = V_range_prop_VIC.iloc[range(0, len(wid_scen)+1, 5)]
-V_range_pt_CLSM = V_range_prop_CLSM.iloc[range(0, len(wid_scen)+1, 5)]
-V_range_pt_NOAH = V_range_prop_NOAH.iloc[range(0, len(wid_scen)+1, 5)]
-
-# Create plot
-fig, ax = plt.subplots()
-
-col1 = 'black'
-col2 = '#124375'
-col3 = '#a559aa'
-col4 = '#e02b35'
-
-ax.plot(rivwid_scen_pt, V_range_pt_VIC.iloc[:, 1], color=col2,
-        linestyle='dashed', alpha=0.8, label='VIC', zorder=1)
-ax.scatter(rivwid_scen_pt, V_range_pt_VIC.iloc[:, 1],
-           color=col2, marker='D', label='VIC', zorder=1)
-
-ax.plot(rivwid_scen_pt, V_range_pt_CLSM.iloc[:, 1], color=col3,
-        linestyle='dashed', alpha=0.8, label='CLSM', zorder=2)
-ax.scatter(rivwid_scen_pt, V_range_pt_CLSM.iloc[:, 1],
-           color=col3, marker='D', label='CLSM', zorder=3)
-
-ax.plot(rivwid_scen_pt, V_range_pt_NOAH.iloc[:, 1], color=col4,
-        linestyle='dashed', alpha=0.8, label='NOAH', zorder=3)
-ax.scatter(rivwid_scen_pt, V_range_pt_NOAH.iloc[:, 1],
-           color=col4, marker='D', label='NOAH', zorder=3)
-
-ax.plot(rivwid_scen_pt, V_range_pt_ENS.iloc[:, 1], color=col1,
-        linestyle='dashed', linewidth=2, label='ENS', zorder=4)
-ax.scatter(rivwid_scen_pt, V_range_pt_ENS.iloc[:, 1],
-           color=col1, marker='D', s=60, label='ENS', zorder=4)
-
-
-ax.set_xlabel('Aggregation for All Rivers Wider Than Given Width (m)')
-ax.set_ylabel('Proportion of Mean Annual Range of Global River Storage'
-              ' Observed (%)')
-
-ax.set_ylim([40, 101])
-plt.xticks(rotation=0, ha='center')
-plt.legend()
-
-fig.tight_layout()
-plt.gca().invert_xaxis()
-
-plt.savefig(fig_s4_out, format='svg')
+# ******************************************************************************
+# Supplemental Figures 1 to 4
+# ******************************************************************************
+# Plot river width scenarios for datasets: Qout mean and range, volume mean and
+# range
+for IM_fig in IV_fig:
+    print('- Generating '+IM_fig['name'])
+    mws_fig.fig_cmp(IM_fig, IM_pt)
@@ -6,7 +6,9 @@
 # Purpose:
 # Given all output files from previous scripts, generate visualizations for
 # supplemental figures relating to sensitivity of using uncorrected versus
-# corrected discharge and volume simulations.
+# corrected discharge and volume simulations. The format of each figure
+# follows its extension, and all figures are rendered from compact
+# specifications, reading each proportion file once (see mws_fig.py).
 
 # Author:
 # Jeffrey Wade, Cedric H. David, 2025
@@ -16,9 +18,10 @@
 # Import packages
 # ******************************************************************************
 import pandas as pd
-import matplotlib.pyplot as plt
 import sys
 import os
+import mws_fig
+import mws_sum
 
 
 # ******************************************************************************
@@ -36,88 +39,118 @@ import os
 # 10 - fig_s6_out
 # 11 - fig_s7_out
 # 12 - fig_s8_out
+# or
+# 1 - sum_all_csv (consolidated summary, see mws_summary_all.py)
+# 2 to 5 - figure outputs, as above
 
 
 # ******************************************************************************
 # Get command line arguments
 # ******************************************************************************
 IS_arg = len(sys.argv)
-if IS_arg != 13:
-    print('ERROR - 12 arguments must be used')
+if IS_arg != 13 and IS_arg != 6:
+    print('ERROR - 12 or 5 arguments must be used')
     raise SystemExit(22)
 
-Qout_prop_ENS_csv = sys.argv[1]
-Qout_range_prop_ENS_csv = sys.argv[2]
-V_prop_ENS_csv = sys.argv[3]
-V_range_prop_ENS_csv = sys.argv[4]
-Qout_prop_COR_csv = sys.argv[5]
-Qout_range_prop_COR_csv = sys.argv[6]
-V_prop_COR_csv = sys.argv[7]
-V_range_prop_COR_csv = sys.argv[8]
-fig_s5_out = sys.argv[9]
-fig_s6_out = sys.argv[10]
-fig_s7_out = sys.argv[11]
-fig_s8_out = sys.argv[12]
+# Allow option of reading all datasets from a consolidated summary written
+# by mws_summary_all.py, in which case inputs are (dataset, statistic)
+BS_sum = IS_arg == 6
+
+if not BS_sum:
+    Qout_prop_ENS_csv = sys.argv[1]
+    Qout_range_prop_ENS_csv = sys.argv[2]
+    V_prop_ENS_csv = sys.argv[3]
+    V_range_prop_ENS_csv = sys.argv[4]
+    Qout_prop_COR_csv = sys.argv[5]
+    Qout_range_prop_COR_csv = sys.argv[6]
+    V_prop_COR_csv = sys.argv[7]
+    V_range_prop_COR_csv = sys.argv[8]
+else:
+    sum_all_csv = sys.argv[1]
+
+    # Uncorrected (ENS) and main corrected (COR) simulations, with normal
+    # volumes
+    Qout_prop_ENS_csv = ('Qout_ENS', 'prop')
+    Qout_range_prop_ENS_csv = ('Qout_ENS', 'range_prop')
+    V_prop_ENS_csv = ('V_nrm_ENS', 'prop')
+    V_range_prop_ENS_csv = ('V_nrm_ENS', 'range_prop')
+    Qout_prop_COR_csv = ('Qout_COR', 'prop')
+    Qout_range_prop_COR_csv = ('Qout_COR', 'range_prop')
+    V_prop_COR_csv = ('V_nrm_COR', 'prop')
+    V_range_prop_COR_csv = ('V_nrm_COR', 'range_prop')
+
+fig_s5_out = sys.argv[IS_arg-4]
+fig_s6_out = sys.argv[IS_arg-3]
+fig_s7_out = sys.argv[IS_arg-2]
+fig_s8_out = sys.argv[IS_arg-1]
 
 
 # ******************************************************************************
 # Check if files/folders exist
 # ******************************************************************************
-try:
-    if os.path.isdir(Qout_prop_ENS_csv):
-        pass
-except IOError:
-    print('ERROR - '+Qout_prop_ENS_csv+' invalid folder path')
-    raise SystemExit(22)
-
-try:
-    with open(Qout_range_prop_ENS_csv) as file:
-        pass
-except IOError:
-    print('ERROR - Unable to open '+Qout_range_prop_ENS_csv)
-    raise SystemExit(22)
-
-try:
-    with open(V_prop_ENS_csv) as file:
-        pass
-except IOError:
-    print('ERROR - Unable to open '+V_prop_ENS_csv)
-    raise SystemExit(22)
-
-try:
-    if os.path.isdir(V_range_prop_ENS_csv):
-        pass
-except IOError:
-    print('ERROR - '+V_range_prop_ENS_csv+' invalid folder path')
-    raise SystemExit(22)
-
-try:
-    with open(Qout_prop_COR_csv) as file:
-        pass
-except IOError:
-    print('ERROR - Unable to open '+Qout_prop_COR_csv)
-    raise SystemExit(22)
-
-try:
-    with open(Qout_range_prop_COR_csv) as file:
-        pass
-except IOError:
-    print('ERROR - Unable to open '+Qout_range_prop_COR_csv)
-    raise SystemExit(22)
-
-try:
-    with open(V_range_prop_COR_csv) as file:
-        pass
-except IOError:
-    print('ERROR - Unable to open '+V_range_prop_COR_csv)
-    raise SystemExit(22)
-
-try:
-    with open(V_prop_COR_csv) as file:
-        pass
-except IOError:
-    print('ERROR - Unable to open '+V_prop_COR_csv)
-    raise SystemExit(22)
+if not BS_sum:
+    try:
+        if os.path.isdir(Qout_prop_ENS_csv):
+            pass
+    except IOError:
+        print('ERROR - '+Qout_prop_ENS_csv+' invalid folder path')
+        raise SystemExit(22)
+
+    try:
+        with open(Qout_range_prop_ENS_csv) as file:
+            pass
+    except IOError:
+        print('ERROR - Unable to open '+Qout_range_prop_ENS_csv)
+        raise SystemExit(22)
+
+    try:
+        with open(V_prop_ENS_csv) as file:
+            pass
+    except IOError:
+        print('ERROR - Unable to open '+V_prop_ENS_csv)
+        raise SystemExit(22)
+
+    try:
+        if os.path.isdir(V_range_prop_ENS_csv):
+            pass
+    except IOError:
+        print('ERROR - '+V_range_prop_ENS_csv+' invalid folder path')
+        raise SystemExit(22)
+
+    try:
+        with open(Qout_prop_COR_csv) as file:
+            pass
+    except IOError:
+        print('ERROR - Unable to open '+Qout_prop_COR_csv)
+        raise SystemExit(22)
+
+    try:
+        with open(Qout_range_prop_COR_csv) as file:
+            pass
+    except IOError:
+        print('ERROR - Unable to open '+Qout_range_prop_COR_csv)
+        raise SystemExit(22)
+
+    try:
+        with open(V_range_prop_COR_csv) as file:
+            pass
+    except IOError:
+        print('ERROR - Unable to open '+V_range_prop_COR_csv)
+        raise SystemExit(22)
+
+    try:
+        with open(V_prop_COR_csv) as file:
+            pass
+    except IOError:
+        print('ERROR - Unable to open '+V_prop_COR_csv)
+        raise SystemExit(22)
+else:
+    try:
+        with open(sum_all_csv) as file:
+            pass
+    except IOError:
+        print('ERROR - Unable to open '+sum_all_csv)
+        raise SystemExit(22)
 
 
 # ******************************************************************************
@@ -125,202 +158,65 @@ except IOError:
 # ******************************************************************************
 print('- Reading files')
 # ------------------------------------------------------------------------------
-# Qout_rivwidth Files
-# ------------------------------------------------------------------------------
-# Read files: ENS
-Qout_prop_ENS = pd.read_csv(Qout_prop_ENS_csv)
-Qout_range_prop_ENS = pd.read_csv(Qout_range_prop_ENS_csv)
-
-# Read files: COR
-Qout_prop_COR = pd.read_csv(Qout_prop_COR_csv)
-Qout_range_prop_COR = pd.read_csv(Qout_range_prop_COR_csv)
-
-# ------------------------------------------------------------------------------
-# V_rivwidth Files
-# ------------------------------------------------------------------------------
-# Read files: ENS
-V_prop_ENS = pd.read_csv(V_prop_ENS_csv)
-V_range_prop_ENS = pd.read_csv(V_range_prop_ENS_csv)
-
-# Read files: COR
-V_prop_COR = pd.read_csv(V_prop_COR_csv)
-V_range_prop_COR = pd.read_csv(V_range_prop_COR_csv)
-
-
-# *******************************************************************************
-# Supplemental Figure 5
-# *******************************************************************************
-print('- Generating Supplemental Figure 5')
-# ------------------------------------------------------------------------------
-# Plot River Width Scenarios for Datasets: Qout Mean, ENS vs COR
-# ------------------------------------------------------------------------------
-# Set max river width scenario
-n_s = 500
-
-# Set river width step size
-step = 5
-
-# Set river width scenario values
-wid_scen = pd.DataFrame(list(range(n_s, -1, -step)))
-
-# Retrieve select points for scatter plot
-rivwid_scen_pt = wid_scen.iloc[range(0, len(wid_scen)+1, 5)]
-Qout_pt_ENS = Qout_prop_ENS.iloc[range(0, len(wid_scen)+1, 5)]
-Qout_pt_COR = Qout_prop_COR.iloc[range(0, len(wid_scen)+1, 5)]
-
-# Create plot
-fig, ax = plt.subplots()
-
-col1 = 'black'
-col2 = '#c1272d'
-
-ax.plot(rivwid_scen_pt, Qout_pt_COR.iloc[:, 1], color=col1,
-        label='COR', zorder=2)
-ax.scatter(rivwid_scen_pt, Qout_pt_COR.iloc[:, 1],
-           color=col1, s=60, label='COR', zorder=2)
-
-ax.plot(rivwid_scen_pt, Qout_pt_ENS.iloc[:, 1], color=col2,
-        linewidth=2, alpha=0.8, label='ENS', zorder=1)
-ax.scatter(rivwid_scen_pt, Qout_pt_ENS.iloc[:, 1],
-           color=col2, label='ENS', zorder=1)
-
-
-ax.set_xlabel('Aggregation for All Rivers Wider Than Given Width (m)')
-ax.set_ylabel('Proportion of Mean Global Discharge to the Ocean Observed (%)')
-
-ax.set_ylim([50, 101])
-plt.xticks(rotation=0, ha='center')
-plt.legend()
-
-fig.tight_layout()
-plt.gca().invert_xaxis()
-
-plt.savefig(fig_s5_out, format='svg')
-
-
-# *******************************************************************************
-# Supplemental Figure 6
-# *******************************************************************************
-print('- Generating Supplemental Figure 6')
-# ------------------------------------------------------------------------------
-# Plot River Width Scenarios for Datasets: Qout range, ENS vs COR
-# ------------------------------------------------------------------------------
-# Retrieve select points for scatter plot
-rivwid_scen_pt = wid_scen.iloc[range(0, len(wid_scen)+1, 5)]
-Qout_range_pt_ENS = Qout_range_prop_ENS.iloc[range(0, len(wid_scen)+1, 5)]
-Qout_range_pt_COR = Qout_range_prop_COR.iloc[range(0, len(wid_scen)+1, 5)]
-
-# Create plot
-fig, ax = plt.subplots()
-
-col1 = 'black'
-col2 = '#c1272d'
-
-ax.plot(rivwid_scen_pt, Qout_range_pt_COR.iloc[:, 1], color=col1,
-        linestyle='dashed', label='COR', zorder=2)
-ax.scatter(rivwid_scen_pt, Qout_range_pt_COR.iloc[:, 1],
-           color=col1, s=60, label='COR', zorder=2)
-
-ax.plot(rivwid_scen_pt, Qout_range_pt_ENS.iloc[:, 1], color=col2,
-        linestyle='dashed', alpha=0.8, linewidth=2, label='ENS', zorder=1)
-ax.scatter(rivwid_scen_pt, Qout_range_pt_ENS.iloc[:, 1],
-           color=col2, label='ENS', zorder=1)
-
-
-ax.set_xlabel('Aggregation for All Rivers Wider Than Given Width (m)')
-ax.set_ylabel('Proportion of Mean Annual Range of Global Discharge to the Ocean'
-              'Observed (%)')
-
-ax.set_ylim([50, 101])
-plt.xticks(rotation=0, ha='center')
-plt.legend()
-
-fig.tight_layout()
-plt.gca().invert_xaxis()
-
-plt.savefig(fig_s6_out, format='svg')
-
-
-# *******************************************************************************
-# Supplemental Figure 7
-# *******************************************************************************
-print('- Generating Supplemental Figure 7')
-# ------------------------------------------------------------------------------
-# Plot River Width Scenarios for Datasets: Volume Mean; ENS vs COR
+# Consolidated summary
 # ------------------------------------------------------------------------------
-# Retrieve select points for scatter plot
-rivwid_scen_pt = wid_scen.iloc[range(0, len(wid_scen)+1, 5)]
-V_pt_ENS = V_prop_ENS.iloc[range(0, len(wid_scen)+1, 5)]
-V_pt_COR = V_prop_COR.iloc[range(0, len(wid_scen)+1, 5)]
-
-# Create plot
-fig, ax = plt.subplots()
-
-col1 = 'black'
-col2 = '#c1272d'
-
-ax.plot(rivwid_scen_pt, V_pt_COR.iloc[:, 1], color=col1,
-        label='COR', zorder=2)
-ax.scatter(rivwid_scen_pt, V_pt_COR.iloc[:, 1],
-           color=col1, marker='D', s=60, label='COR', zorder=2)
+if BS_sum:
+    sum_all = mws_sum.sum_tbl_read(sum_all_csv)
 
-ax.plot(rivwid_scen_pt, V_pt_ENS.iloc[:, 1], color=col2,
-        alpha=0.8, linewidth=2, label='ENS', zorder=1)
-ax.scatter(rivwid_scen_pt, V_pt_ENS.iloc[:, 1],
-           color=col2, marker='D', label='ENS', zorder=1)
 
+# Read proportion file, or its statistic of consolidated summary
+def prop_read(prop_in):
 
-ax.set_xlabel('Aggregation for All Rivers Wider Than Given Width (m)')
-ax.set_ylabel('Proportion of Mean Global River Storage Observed (%)')
+    if BS_sum:
+        return mws_sum.sum_tbl_sel(sum_all, *prop_in)
 
-ax.set_ylim([50, 101])
-plt.xticks(rotation=0, ha='center')
-plt.legend()
+    return pd.read_csv(prop_in)
 
-fig.tight_layout()
-plt.gca().invert_xaxis()
-
-plt.savefig(fig_s7_out, format='svg')
 
+# ******************************************************************************
+# Declaration of figures
+# ******************************************************************************
+# Styles of datasets, in the order they are drawn
+IV_sty = [{'label': 'COR', 'color': 'black',
+           'plot': {'zorder': 2}, 'scatter': {'s': 60, 'zorder': 2}},
+          {'label': 'ENS', 'color': '#c1272d',
+           'plot': {'linewidth': 2, 'alpha': 0.8, 'zorder': 1},
+           'scatter': {'zorder': 1}}]
+
+IV_fig = [{'name': 'Supplemental Figure 5', 'out': fig_s5_out,
+           'in': [Qout_prop_COR_csv, Qout_prop_ENS_csv], 'sty': IV_sty,
+           'ylabel': 'Proportion of Mean Global Discharge to the Ocean '
+                     'Observed (%)',
+           'ylim': [50, 101]},
+          {'name': 'Supplemental Figure 6', 'out': fig_s6_out,
+           'in': [Qout_range_prop_COR_csv, Qout_range_prop_ENS_csv],
+           'sty': IV_sty,
+           'ylabel': 'Proportion of Mean Annual Range of Global Discharge to '
+                     'the OceanObserved (%)',
+           'ylim': [50, 101], 'plot': {'linestyle': 'dashed'}},
+          {'name': 'Supplemental Figure 7', 'out': fig_s7_out,
+           'in': [V_prop_COR_csv, V_prop_ENS_csv], 'sty': IV_sty,
+           'ylabel': 'Proportion of Mean Global River Storage Observed (%)',
+           'ylim': [50, 101], 'scatter': {'marker': 'D'}},
+          {'name': 'Supplemental Figure 8', 'out': fig_s8_out,
+           'in': [V_range_prop_COR_csv, V_range_prop_ENS_csv],
+           'sty': IV_sty,
+           'ylabel': 'Proportion of Mean Annual Range of Global River Storage'
+                     ' Observed (%)',
+           'ylim': [50, 101], 'plot': {'linestyle': 'dashed'},
+           'scatter': {'marker': 'D'}}]
 
-# *******************************************************************************
-# Supplemental Figure 8
-# *******************************************************************************
-print('- Generating Supplemental Figure 8')
 # ------------------------------------------------------------------------------
-# Plot River Width Scenarios for Datasets: Volume Range; ENS vs COR
+# Proportion files of all figures, read once
 # ------------------------------------------------------------------------------
-# Retrieve select points for scatter plot
-rivwid_scen_pt = wid_scen.iloc[range(0, len(wid_scen)+1, 5)]
-V_range_pt_ENS = V_range_prop_ENS.iloc[range(0, len(wid_scen)+1, 5)]
-V_range_pt_COR = V_range_prop_COR.iloc[range(0, len(wid_scen)+1, 5)]
-
-# Create plot
-fig, ax = plt.subplots()
+IM_pt = mws_fig.fig_cmp_read(IV_fig, prop_read)
 
-col1 = 'black'
-col2 = '#c1272d'
 
-ax.plot(rivwid_scen_pt, V_range_pt_COR.iloc[:, 1], color=col1,
-        linestyle='dashed', label='COR', zorder=2)
-ax.scatter(rivwid_scen_pt, V_range_pt_COR.iloc[:, 1],
-           color=col1, marker='D', s=60, label='COR', zorder=2)
-
-ax.plot(rivwid_scen_pt, V_range_pt_ENS.iloc[:, 1], color=col2,
-        alpha=0.8, linestyle='dashed', linewidth=2, label='ENS', zorder=1)
-ax.scatter(rivwid_scen_pt, V_range_pt_ENS.iloc[:, 1],
-           color=col2, marker='D', label='ENS', zorder=1)
-
-
-ax.set_xlabel('Aggregation for All Rivers Wider Than Given Width (m)')
-ax.set_ylabel('Proportion of Mean Annual Range of Global River Storage'
-              ' Observed (%)')
-
-ax.set_ylim([50, 101])
-plt.xticks(rotation=0, ha='center')
-plt.legend()
-
-fig.tight_layout()
-plt.gca().invert_xaxis()
-
-plt.savefig(fig_s8_out, format='svg')
+# ******************************************************************************
+# Supplemental Figures 5 to 8
+# ******************************************************************************
+# Plot river width scenarios for datasets: Qout mean and range, volume mean and
+# range, ENS vs COR
+for IM_fig in IV_fig:
+    print('- Generating '+IM_fig['name'])
+    mws_fig.fig_cmp(IM_fig, IM_pt)
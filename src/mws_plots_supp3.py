@@ -5,7 +5,15 @@
 
 # Purpose:
 # Given all output files from previous scripts, generate visualizations for
-# supplemental figures relating to the validation of width estimates.
+# supplemental figures relating to the validation of width estimates. The
+# global table of reach attributes built by mws_riv_tbl.py (.nc) can be given
+# instead of the uncorrected rivers, in which case no shapefile is read.
+# Optionally, a folder of validation statistics written by mws_width_val.py can
+# be given, in which case Supplemental Figure 9 is rendered from these
+# statistics merged across regions instead, on their fixed bins. River widths
+# of Supplemental Figure 10 are binned region by region, in a second pass once
+# the smallest and largest widths are known (see mws_hst.py), and its bars can
+# be rasterized (see mws_fig.py).
 
 # Author:
 # Jeffrey Wade, Cedric H. David, 2025
@@ -18,29 +26,34 @@ import sys
 import os
 import pandas as pd
 import numpy as np
-import fiona
 import glob
 from scipy.stats import linregress, pareto
 import matplotlib.pyplot as plt
 from matplotlib.colors import LogNorm
 from scipy.stats import spearmanr
+import mws_fig
+import mws_hst
+import mws_stats
 
 
 # ******************************************************************************
 # Declaration of variables (given as command line arguments)
 # ******************************************************************************
 # 1 - width_val_in
-# 2 - riv_uncor_in
+# 2 - riv_uncor_in (or riv_tbl_nc)
 # 3 - fig_s9_out
 # 4 - fig_s10_out
+# 5 - hst_npz (optional, regional width histograms cached and updated for
+#     changed regions, or 'no_hst_npz')
+# 6 - width_sts_in (optional, folder of validation statistics)
 
 
 # ******************************************************************************
 # Get command line arguments
 # ******************************************************************************
 IS_arg = len(sys.argv)
-if IS_arg != 5:
-    print('ERROR - 4 arguments must be used')
+if (IS_arg < 5) or (IS_arg > 7):
+    print('ERROR - 4 to 6 arguments must be used')
     raise SystemExit(22)
 
 width_val_in = sys.argv[1]
@@ -48,6 +61,16 @@ riv_uncor_in = sys.argv[2]
 fig_s9_out = sys.argv[3]
 fig_s10_out = sys.argv[4]
 
+# Allow option of caching regional width histograms
+hst_npz = None
+if IS_arg >= 6 and sys.argv[5] != 'no_hst_npz':
+    hst_npz = sys.argv[5]
+
+# Allow option of rendering figures from validation statistics
+width_sts_in = None
+if IS_arg == 7:
+    width_sts_in = sys.argv[6]
+
 
 # ******************************************************************************
 # Check if files/folders exist
@@ -66,28 +89,59 @@ except IOError:
     print('ERROR - '+riv_uncor_in+' invalid folder path')
     raise SystemExit(22)
 
+if width_sts_in is not None and not os.path.isdir(width_sts_in):
+    print('ERROR - '+width_sts_in+' invalid folder path')
+    raise SystemExit(22)
+
+
+# ******************************************************************************
+# Define function to create bins of river widths
+# ******************************************************************************
+# 500 logarithmic bin edges spanning all positive widths, as in Supplemental
+# Figure 10
+def wid_bin(ZS_min, ZS_max):
+
+    return np.logspace(np.log10(ZS_min), np.log10(ZS_max), 500)
+
+
 # ******************************************************************************
 # Read files
 # ******************************************************************************
 print('- Reading files')
+# ------------------------------------------------------------------------------
+# Width Validation Statistics
+# ------------------------------------------------------------------------------
+# Merge statistics of all regions, if given
+BS_sts = width_sts_in is not None
+if BS_sts:
+    width_sts_files = list(glob.iglob(width_sts_in + '*.npz'))
+    width_sts_files.sort()
+
+    if len(width_sts_files) == 0:
+        print('ERROR - No validation statistics found in '+width_sts_in)
+        raise SystemExit(22)
+
+    IM_sts = mws_stats.sts_load(width_sts_files[0])
+    for x in width_sts_files[1:]:
+        IM_sts = mws_stats.sts_add(IM_sts, mws_stats.sts_load(x))
+
 # ------------------------------------------------------------------------------
 # Width Validation Files
 # ------------------------------------------------------------------------------
 # Read files
-width_val_files = list(glob.iglob(width_val_in + '*.csv'))
-width_val_all = [pd.read_csv(x) for x in width_val_files]
+if not BS_sts:
+    width_val_files = list(glob.iglob(width_val_in + '*.csv'))
+    width_val_all = [pd.read_csv(x) for x in width_val_files]
 
-# Combine dataframes
-width_val_all = [df for df in width_val_all if not df.empty]
-wid_df = pd.concat(width_val_all, axis=0, ignore_index=True)
+    # Combine dataframes
+    width_val_all = [df for df in width_val_all if not df.empty]
+    wid_df = pd.concat(width_val_all, axis=0, ignore_index=True)
 
 # ------------------------------------------------------------------------------
 # MeanDRS Uncorrected Rivers
 # ------------------------------------------------------------------------------
-# Read to shapefile
-riv_uncor_files = list(glob.iglob(riv_uncor_in+'*.shp'))
-riv_uncor_files.sort()
-riv_uncor = [fiona.open(j, 'r') for j in riv_uncor_files]
+# Widths of all rivers are binned region by region (see wid_bin)
+IM_wid_hst = mws_hst.hst_riv(riv_uncor_in, {'wid': wid_bin}, hst_npz)
 
 
 # ******************************************************************************
@@ -97,38 +151,63 @@ print('- Generating Supplemental Figure 9')
 # ------------------------------------------------------------------------------
 # Plot width validation between MeanDRS and GRWL SWORD
 # ------------------------------------------------------------------------------
-# Regress MeanDRS and GRWL widths
-slope, intercept, r_value, p_value, std_err = linregress(wid_df["m_wid"],
-                                                         wid_df["sw_wid"]
-                                                         )
-
-# Regress MeanDRS and GRWL widths through origin
-slope_0 = np.sum(wid_df["m_wid"] * wid_df["sw_wid"]) /                         \
-    np.sum(wid_df["m_wid"]**2)
-
-sw_pred = slope_0 * wid_df["m_wid"]
-ss_total = np.sum((wid_df["sw_wid"] - np.mean(wid_df["sw_wid"]))**2)
-ss_residual = np.sum((wid_df["sw_wid"] - sw_pred)**2)
-r_squared_0 = 1 - (ss_residual / ss_total)
-
-# Calculate Mean Absolute Bias
-mab = np.mean(np.abs(wid_df["sw_wid"] - wid_df["m_wid"]))
-
-# Calculate Mean Bias
-mb = np.mean(wid_df["sw_wid"] - wid_df["m_wid"])
-
-# Calculate Spearman correlation
-corr, p_value = spearmanr(wid_df['m_wid'], wid_df['sw_wid'])
-
-# Width Heatmap for Type 1 reaches (log)
-wid_df_0 = wid_df[(wid_df.m_wid > 0) & (wid_df.sw_wid > 0)]
-x_bins = np.logspace(np.log10(3), np.log10(np.max(wid_df.m_wid)), 86)
-y_bins = np.logspace(np.log10(3), np.log10(np.max(wid_df.sw_wid)), 86)
-
-fig, ax = plt.subplots()
-hist = ax.hist2d(wid_df_0.m_wid, wid_df_0.sw_wid, bins=[x_bins, y_bins],
-                 cmap='cividis', norm=LogNorm(vmin=1, vmax=1000),
-                 rasterized=True)
+if BS_sts:
+    # Compute statistics from merged sums and histograms
+    IM_fin = mws_stats.sts_fin(IM_sts)
+    slope, intercept = IM_fin['slope'], IM_fin['intercept']
+    r_value, p_value = IM_fin['r_value'], IM_fin['p_value']
+    std_err = IM_fin['std_err']
+    slope_0, r_squared_0 = IM_fin['slope_0'], IM_fin['r_squared_0']
+    mab, mb = IM_fin['mab'], IM_fin['mb']
+    corr, p_value = IM_fin['corr'], IM_fin['corr_p_value']
+
+    # Width Heatmap for Type 1 reaches (log), on bins of statistics
+    IS_x_0, IS_x_1 = mws_stats.sts_idx([3, IM_sts['max_m']])
+    IS_y_0, IS_y_1 = mws_stats.sts_idx([3, IM_sts['max_sw']])
+    x_bins = mws_stats.ZV_sts_bin[IS_x_0:IS_x_1+2]
+    y_bins = mws_stats.ZV_sts_bin[IS_y_0:IS_y_1+2]
+    IM_hst = IM_sts['hst_val'][IS_x_0:IS_x_1+1, IS_y_0:IS_y_1+1]
+
+    fig, ax = plt.subplots()
+    hist_map = ax.pcolormesh(x_bins, y_bins, np.ma.masked_equal(IM_hst, 0).T,
+                             cmap='cividis', norm=LogNorm(vmin=1, vmax=1000),
+                             rasterized=True)
+
+else:
+    # Regress MeanDRS and GRWL widths
+    slope, intercept, r_value, p_value, std_err = linregress(wid_df["m_wid"],
+                                                             wid_df["sw_wid"]
+                                                             )
+
+    # Regress MeanDRS and GRWL widths through origin
+    slope_0 = np.sum(wid_df["m_wid"] * wid_df["sw_wid"]) /                    \
+        np.sum(wid_df["m_wid"]**2)
+
+    sw_pred = slope_0 * wid_df["m_wid"]
+    ss_total = np.sum((wid_df["sw_wid"] - np.mean(wid_df["sw_wid"]))**2)
+    ss_residual = np.sum((wid_df["sw_wid"] - sw_pred)**2)
+    r_squared_0 = 1 - (ss_residual / ss_total)
+
+    # Calculate Mean Absolute Bias
+    mab = np.mean(np.abs(wid_df["sw_wid"] - wid_df["m_wid"]))
+
+    # Calculate Mean Bias
+    mb = np.mean(wid_df["sw_wid"] - wid_df["m_wid"])
+
+    # Calculate Spearman correlation
+    corr, p_value = spearmanr(wid_df['m_wid'], wid_df['sw_wid'])
+
+    # Width Heatmap for Type 1 reaches (log)
+    wid_df_0 = wid_df[(wid_df.m_wid > 0) & (wid_df.sw_wid > 0)]
+    x_bins = np.logspace(np.log10(3), np.log10(np.max(wid_df.m_wid)), 86)
+    y_bins = np.logspace(np.log10(3), np.log10(np.max(wid_df.sw_wid)), 86)
+
+    fig, ax = plt.subplots()
+    hist = ax.hist2d(wid_df_0.m_wid, wid_df_0.sw_wid, bins=[x_bins, y_bins],
+                     cmap='cividis', norm=LogNorm(vmin=1, vmax=1000),
+                     rasterized=True)
+    hist_map = hist[3]
+
 ax.plot([2, 20000], [2, 20000], c='black', linestyle='--', alpha=0.75)
 ax.set_xlabel('MeanDRS Width, m')
 ax.set_ylabel('GRWL Width, m')
@@ -136,46 +215,16 @@ ax.set_xlim([2.5, 20000])
 ax.set_ylim([2.5, 20000])
 ax.set_xscale('log')
 ax.set_yscale('log')
-cb = fig.colorbar(hist[3], ax=ax)
+cb = fig.colorbar(hist_map, ax=ax)
 cb.set_label('log10(Frequency)')
 plt.tight_layout()
-plt.savefig(fig_s9_out, format='svg')
+mws_fig.fig_save(fig_s9_out)
 
 
 # ******************************************************************************
 # Supplemental Figure 10
 # ******************************************************************************
 print('- Generating Supplemental Figure 10')
-# ------------------------------------------------------------------------------
-# Retrieve discharge values for all rivers in each region
-# ------------------------------------------------------------------------------
-# Initialize list to store discharge
-Q_list = []
-
-# Loop through regions
-for j in range(len(riv_uncor)):
-
-    # Retrieve MeanDRS reaches for each pfaf
-    riv_lay = riv_uncor[j]
-
-    # Loop through river reaches
-    for riv_fea in riv_lay:
-
-        # Store values
-        Q_list.append(riv_fea['properties']['meanQ'])
-
-# ------------------------------------------------------------------------------
-# Calculate river width from mean discharge
-# ------------------------------------------------------------------------------
-# Convert list to array
-Q_arr = np.array(Q_list)
-
-# Estimate mean river width by Moody & Troutman, 2002
-wid_arr = 7.2*(Q_arr**0.5)
-
-wid_arr_10 = wid_arr[wid_arr > 11]
-wid_arr_0 = wid_arr[wid_arr > 0]
-
 # ------------------------------------------------------------------------------
 # Plot width validation Pareto Fit
 # ------------------------------------------------------------------------------
@@ -184,17 +233,17 @@ fixed_shape = 0.9
 fixed_scale = 2.8
 
 # Create bins for the histogram and pareto distribution
-bins = np.logspace(np.log10(wid_arr_0.min()), np.log10(wid_arr_0.max()), 500)
+bins = wid_bin(IM_wid_hst['min_wid'], IM_wid_hst['max_wid'])
+counts = IM_wid_hst['hst_wid']
 
 fig, ax = plt.subplots(figsize=(8, 6))
-counts, bins = np.histogram(wid_arr_0, bins=bins, density=False)
 bin_widths = np.diff(bins)
-ax.bar(bins[:-1], counts, width=bin_widths, align='edge', alpha=0.6,
-       color='gray', edgecolor='none', bottom=1)
+hst_bar = ax.bar(bins[:-1], counts, width=bin_widths, align='edge',
+                 alpha=0.6, color='gray', edgecolor='none', bottom=1)
 
 # Fit pareto model
 pdf_fitted = pareto.pdf(bins, fixed_shape, scale=fixed_scale)
-counts_fitted = pdf_fitted[:-1] * bin_widths * len(wid_arr_0)
+counts_fitted = pdf_fitted[:-1] * bin_widths * IM_wid_hst['n_wid']
 ax.plot(bins[:-1], counts_fitted, c='black', lw=1)
 
 # Extend the pareto fit linearly until x = 0.32
@@ -215,4 +264,4 @@ ax.set_ylim([1, 10e5])
 ax.set_xlabel('Width, m')
 ax.set_ylabel('Number of Occurrences')
 fig.tight_layout()
-plt.savefig(fig_s10_out, format='svg')
+mws_fig.fig_save(fig_s10_out, [hst_bar])
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# ******************************************************************************
+# mws_riv_dwn.py
+# ******************************************************************************
+
+# Purpose:
+# Given a RAPID routing connectivity csv and MeanDRS river reaches of the same
+# region, relate each reach to the outlet it drains to, and compute the number
+# of reaches and the river length (km) along its downstream path to the outlet.
+# All reaches are processed at once (see mws_net.py).
+
+# Author:
+# Jeffrey Wade, Cedric H. David, 2025
+
+# ******************************************************************************
+# Import packages
+# ******************************************************************************
+import fiona
+import numpy as np
+import pandas as pd
+import sys
+import mws_net
+
+
+# ******************************************************************************
+# Declaration of variables (given as command line arguments)
+# ******************************************************************************
+# 1 - con_csv
+# 2 - riv_shp
+# 3 - dwn_out
+
+
+# ******************************************************************************
+# Get command line arguments
+# ******************************************************************************
+IS_arg = len(sys.argv)
+if IS_arg != 4:
+    print('ERROR - 3 arguments must be used')
+    raise SystemExit(22)
+
+con_csv = sys.argv[1]
+riv_shp = sys.argv[2]
+dwn_out = sys.argv[3]
+
+
+# ******************************************************************************
+# Check if files exist
+# ******************************************************************************
+try:
+    with open(con_csv) as file:
+        pass
+except IOError:
+    print('ERROR - Unable to open '+con_csv)
+    raise SystemExit(22)
+
+try:
+    with open(riv_shp) as file:
+        pass
+except IOError:
+    print('ERROR - Unable to open '+riv_shp)
+    raise SystemExit(22)
+
+
+# ******************************************************************************
+# Read files
+# ******************************************************************************
+print('- Reading files')
+# ------------------------------------------------------------------------------
+# Format river connectivity file of region
+# ------------------------------------------------------------------------------
+IV_riv_tot_id, IV_riv_dwn_id, IV_riv_ups_nb, IM_riv_ups_id = \
+    mws_net.con_read(con_csv)
+
+# Create hash table for connectivity
+IM_hsh = mws_net.con_hsh(IV_riv_tot_id)
+
+# ------------------------------------------------------------------------------
+# Retrieve length of reaches, in the order of the connectivity file
+# ------------------------------------------------------------------------------
+ZV_riv_len = np.zeros(len(IV_riv_tot_id))
+
+with fiona.open(riv_shp, 'r') as riv:
+    for riv_fea in riv:
+        JS_riv_tot = IM_hsh.get(riv_fea['properties']['COMID'])
+        if JS_riv_tot is not None:
+            ZV_riv_len[JS_riv_tot] = riv_fea['properties']['lengthkm']
+
+
+# ******************************************************************************
+# Accumulate along downstream paths to outlets
+# ******************************************************************************
+print('- Accumulating along downstream paths')
+IV_dwn = mws_net.net_dwn(IV_riv_dwn_id, IM_hsh)
+
+# Number of reaches and length from each reach to its outlet, in one pass
+ZM_acc = np.column_stack((np.ones(len(IV_dwn)), ZV_riv_len))
+IV_out, ZM_acc = mws_net.dwn_acc(IV_dwn, ZM_acc)
+IV_riv_nb = np.rint(ZM_acc[:, 0]).astype(np.int64)
+ZV_riv_len = ZM_acc[:, 1]
+
+
+# ******************************************************************************
+# Write to file
+# ******************************************************************************
+print('- Writing to file')
+dwn_df = pd.DataFrame({'COMID': IV_riv_tot_id,
+                       'outlet_id': np.array(IV_riv_tot_id)[IV_out],
+                       'riv_nb': IV_riv_nb,
+                       'lengthkm': np.round(ZV_riv_len, 5)})
+
+dwn_df.to_csv(dwn_out, index=False)
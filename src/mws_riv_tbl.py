@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# ******************************************************************************
+# mws_riv_tbl.py
+# ******************************************************************************
+
+# Purpose:
+# Given corrected and uncorrected MeanDRS river reaches and uncorrected MeanDRS
+# coastal rivers of all regions, build a global table of reach attributes
+# (COMID, region, corrected and uncorrected mean discharge, estimated width,
+# next downstream reach, and coastal flag) once, so that later stages can read
+# it instead of all river shapefiles (see mws_tbl.py).
+
+# Author:
+# Jeffrey Wade, Cedric H. David, 2025
+
+# ******************************************************************************
+# Import packages
+# ******************************************************************************
+import fiona
+import glob
+import numpy as np
+import pandas as pd
+import sys
+import os
+import mws_tbl
+
+
+# ******************************************************************************
+# Declaration of variables (given as command line arguments)
+# ******************************************************************************
+# 1 - riv_cor_shp
+# 2 - riv_uncor_shp
+# 3 - riv_cst_uncor_shp
+# 4 - riv_tbl_out
+
+
+# ******************************************************************************
+# Get command line arguments
+# ******************************************************************************
+IS_arg = len(sys.argv)
+if IS_arg != 5:
+    print('ERROR - 4 arguments must be used')
+    raise SystemExit(22)
+
+riv_cor_shp = sys.argv[1]
+riv_uncor_shp = sys.argv[2]
+riv_cst_uncor_shp = sys.argv[3]
+riv_tbl_out = sys.argv[4]
+
+
+# ******************************************************************************
+# Check if files/folders exist
+# ******************************************************************************
+for riv_dir in [riv_cor_shp, riv_uncor_shp, riv_cst_uncor_shp]:
+    if not os.path.isdir(riv_dir):
+        print('ERROR - '+riv_dir+' invalid folder path')
+        raise SystemExit(22)
+
+if not mws_tbl.tbl_chk(riv_tbl_out):
+    print('ERROR - '+riv_tbl_out+' must be a netCDF (.nc) file')
+    raise SystemExit(22)
+
+
+# ******************************************************************************
+# List files
+# ******************************************************************************
+print('- Listing files')
+riv_cor_files = list(glob.iglob(riv_cor_shp+'*.shp'))
+riv_cor_files.sort()
+
+riv_uncor_files = list(glob.iglob(riv_uncor_shp+'*.shp'))
+riv_uncor_files.sort()
+
+riv_cst_uncor_files = list(glob.iglob(riv_cst_uncor_shp+'*.shp'))
+riv_cst_uncor_files.sort()
+
+# Retrieve numbers of pfafs
+pfaf_list = pd.Series([x.partition("pfaf_")[-1][0:2] for x in
+                       riv_cor_files]).sort_values(ignore_index=True)
+
+if not (len(riv_cor_files) == len(riv_uncor_files) ==
+        len(riv_cst_uncor_files)):
+    print('ERROR - Input folders contain different numbers of regions')
+    raise SystemExit(22)
+
+
+# ******************************************************************************
+# Define function to read attributes of a river file
+# ******************************************************************************
+# Geometries and unused attributes are not read
+def riv_read(riv_fp, IV_riv_var):
+
+    with fiona.open(riv_fp, 'r') as riv:
+        riv_ign = [x for x in riv.schema['properties'] if x not in IV_riv_var]
+
+    with fiona.open(riv_fp, 'r', ignore_fields=riv_ign,
+                    ignore_geometry=True) as riv:
+        riv_df = pd.DataFrame([riv_fea['properties'] for riv_fea in riv],
+                              columns=IV_riv_var)
+
+    return riv_df
+
+
+# ******************************************************************************
+# Build table one region at a time
+# ******************************************************************************
+print('- Building reach attribute table')
+tbl_reg = []
+
+for j in range(len(riv_uncor_files)):
+
+    print('  . Region '+pfaf_list[j])
+
+    # Reaches are stored in the order of the uncorrected river file
+    riv_df = riv_read(riv_uncor_files[j], ['COMID', 'NextDownID', 'meanQ'])
+    riv_df = riv_df.rename(columns={'meanQ': 'meanQ_uncor'})
+
+    riv_cor_df = riv_read(riv_cor_files[j], ['COMID', 'meanQ'])
+    riv_cst_df = riv_read(riv_cst_uncor_files[j], ['COMID', 'meanQ'])
+
+    riv_df['pfaf'] = int(pfaf_list[j])
+    riv_df['meanQ_cor'] = riv_df.COMID.map(
+        riv_cor_df.set_index('COMID').meanQ)
+    riv_df['meanQ_cst'] = riv_df.COMID.map(
+        riv_cst_df.set_index('COMID').meanQ)
+
+    # Estimate river width by Moody & Troutman, 2002
+    riv_df['wid'] = 7.2*(riv_df.meanQ_uncor ** 0.5)
+
+    riv_df['coast'] = riv_df.COMID.isin(riv_cst_df.COMID).astype(np.int8)
+
+    tbl_reg.append(riv_df)
+
+tbl_df = pd.concat(tbl_reg, ignore_index=True)
+
+
+# ******************************************************************************
+# Write table
+# ******************************************************************************
+print('- Writing reach attribute table')
+mws_tbl.tbl_write(tbl_df, riv_tbl_out)
@@ -8,6 +8,11 @@
 # river reaches drainging to the coast, corrected and uncorrected MeanDRS river
 # reaches, a shapefile of catchments from MERIT-Basins corresponding to each
 # reach, identify rivers narrower than 100m draining to the coast.
+# Optionally, a comma-separated list of width thresholds (m, e.g. 50,100,200)
+# can be given, in which case the reaches and catchments upstream of coastal
+# rivers narrower than each threshold are written to one file per threshold.
+# Since outlets narrower than a threshold are also narrower than any larger
+# threshold, outlets are sorted by width and each one is traced only once.
 
 # Author:
 # Jeffrey Wade, Cedric H. David, 2025
@@ -15,9 +20,11 @@
 # ******************************************************************************
 # Import packages
 # ******************************************************************************
-import csv
 import fiona
+import numpy as np
+import os
 import sys
+import mws_net
 
 
 # ******************************************************************************
@@ -31,15 +38,15 @@ import sys
 # 6 - cat_shp
 # 7 - riv_out
 # 8 - cat_out
-# 9 - cat_dis_out
+# 9 - wid_thr (optional, comma-separated list of width thresholds in m)
 
 
 # ******************************************************************************
 # Get command line arguments
 # ******************************************************************************
 IS_arg = len(sys.argv)
-if IS_arg != 9:
-    print('ERROR - 8 arguments must be used')
+if (IS_arg < 9) or (IS_arg > 10):
+    print('ERROR - 8 or 9 arguments must be used')
     raise SystemExit(22)
 
 con_csv = sys.argv[1]
@@ -51,6 +58,10 @@ cat_shp = sys.argv[6]
 riv_out = sys.argv[7]
 cat_out = sys.argv[8]
 
+# Allow option of tracing rivers for several width thresholds
+if IS_arg == 10:
+    wid_thr = sys.argv[9]
+
 
 # ******************************************************************************
 # Check if files/folders exist
@@ -97,6 +108,42 @@ except IOError:
     print('ERROR - Unable to open '+cat_shp)
     raise SystemExit(22)
 
+if IS_arg == 10:
+    try:
+        ZV_wid_thr = [float(x) for x in wid_thr.split(',')]
+    except ValueError:
+        print('ERROR - '+wid_thr+' not a list of positive widths')
+        raise SystemExit(22)
+
+    if not all(x > 0 for x in ZV_wid_thr):
+        print('ERROR - '+wid_thr+' not a list of positive widths')
+        raise SystemExit(22)
+
+    if len(set(ZV_wid_thr)) != len(ZV_wid_thr):
+        print('ERROR - '+wid_thr+' contains duplicate widths')
+        raise SystemExit(22)
+
+
+# ******************************************************************************
+# Set output files of each width threshold
+# ******************************************************************************
+# Without thresholds, all coastal rivers are traced into the given files.
+# With thresholds, sorted in increasing order, the threshold is appended to
+# each given file name (e.g. riv_small.shp -> riv_small_100m.shp, also for a
+# threshold given as 100.0)
+if IS_arg == 9:
+    ZV_wid_thr = [np.inf]
+    riv_out_fp = [riv_out]
+    cat_out_fp = [cat_out]
+
+elif IS_arg == 10:
+    ZV_wid_thr = sorted(ZV_wid_thr)
+    IV_wid_thr = [np.format_float_positional(x, trim='-') for x in ZV_wid_thr]
+    riv_out_root, riv_out_ext = os.path.splitext(riv_out)
+    cat_out_root, cat_out_ext = os.path.splitext(cat_out)
+    riv_out_fp = [riv_out_root+'_'+x+'m'+riv_out_ext for x in IV_wid_thr]
+    cat_out_fp = [cat_out_root+'_'+x+'m'+cat_out_ext for x in IV_wid_thr]
+
 
 # ******************************************************************************
 # Read files
@@ -148,113 +195,76 @@ for riv_fea in riv_cst_cor:
 
 
 # ******************************************************************************
-# Trace upstream network of rivers narrow than 100m
+# Trace upstream network of rivers narrower than width thresholds
 # ******************************************************************************
 print('- Tracing rivers upstream')
-# See https://github.com/c-h-david/rrr/blob/master/src/rrr_riv_tot_net_nav.py
-
 # ------------------------------------------------------------------------------
 # Format river connectivity file of region
 # ------------------------------------------------------------------------------
 # Read and format connectivity file
-IV_riv_tot_id = []  # COMID
-IV_riv_dwn_id = []  # Next Downstream ID
-IV_riv_ups_nb = []  # Number of upstream IDs
-IM_riv_ups_id = []  # Upstream IDs 1-5
-
-with open(con_csv, 'r') as csvfile:
-    csvreader = csv.reader(csvfile)
-    for row in csvreader:
-        IV_riv_tot_id.append(int(row[0]))
-        IV_riv_dwn_id.append(int(row[1]))
-        IV_riv_ups_nb.append(int(row[2]))
-        IM_riv_ups_id.append([int(rivid) for rivid in row[3:]])
-
-# Number of reaches in connectivity file
-IS_riv_tot = len(IV_riv_tot_id)
+IV_riv_tot_id, IV_riv_dwn_id, IV_riv_ups_nb, IM_riv_ups_id = \
+    mws_net.con_read(con_csv)
 
 # Create hash table for connectivity
-IM_hsh = {}
+IM_hsh = mws_net.con_hsh(IV_riv_tot_id)
 
-for JS_riv_tot in range(IS_riv_tot):
-    IM_hsh[IV_riv_tot_id[JS_riv_tot]] = JS_riv_tot
+# Index drainage forest of region
+IM_idx = mws_net.net_idx(IV_riv_ups_nb, IM_riv_ups_id, IM_hsh)
 
 # ------------------------------------------------------------------------------
-# Find upstream reaches of coastal outlets
+# Find upstream reaches of coastal outlets, from narrowest to widest
 # ------------------------------------------------------------------------------
-# Initalize list to store reach hashes upstream of current index
-riv_ups_hsh = []
-
-# Loop through river reaches
-for i in range(len(riv_id)):
+# Sort coastal outlets by width
+IV_cst_ord = np.argsort(riv_wid, kind='stable')
+ZV_cst_wid = np.array(riv_wid)[IV_cst_ord]
 
-    # Retrieve COMID of given reach
-    IS_riv_id = riv_id[i]
+# Index of first threshold that each sorted outlet is narrower than, all
+# outlets being traced when no threshold is given
+if IS_arg == 9:
+    IV_cst_lvl = np.zeros(len(riv_id), dtype=int)
 
-    # Select hash of given river to trace
-    JS_riv_tot = IM_hsh[IS_riv_id]
+elif IS_arg == 10:
+    IV_cst_lvl = np.searchsorted(ZV_wid_thr, ZV_cst_wid, side='right')
 
-    # Add hash of starting coastal outlet
-    riv_ups_hsh.append(JS_riv_tot)
+# Trace each outlet narrower than the largest threshold only once, storing the
+# first threshold at which its upstream reaches are included
+IM_riv_lvl = {}
 
-    # Retrieve IDs of river that are directly upstream of current index
-    IV_riv_ups_id = IM_riv_ups_id[JS_riv_tot][0:IV_riv_ups_nb[JS_riv_tot]]
+for JS_cst, IS_lvl in zip(IV_cst_ord, IV_cst_lvl):
 
-    # Initialize counter
-    JS_riv_ups = 0
+    if IS_lvl == len(ZV_wid_thr):
+        break
 
-    # Effectively infinite loop continues until no reaches returned
-    while JS_riv_ups < 1e7:
+    # Retrieve hashes of all reaches upstream of coastal outlet
+    riv_ups_hsh = mws_net.idx_ups(IM_idx, IM_hsh[riv_id[JS_cst]])
 
-        # Increment counter
-        JS_riv_ups = JS_riv_ups+1
-
-        # Initialize list for storing next upstream id
-        IV_riv_nxt_id = []
-
-        # Loop through ids in next upstream ID for given reach
-        for JS_riv_ups_id in IV_riv_ups_id:
-
-            # Retrieve hash value for next ID
-            JS_riv_ups_ix = IM_hsh[JS_riv_ups_id]
-
-            # Append hash value to list
-            riv_ups_hsh.append(JS_riv_ups_ix)
-
-            # Get values of existing upstream IDs of IV_riv_ups_id reaches
-            IV_riv_nxt_id = IV_riv_nxt_id +                                    \
-                IM_riv_ups_id[JS_riv_ups_ix][0:IV_riv_ups_nb[JS_riv_ups_ix]]
-
-        # If reaches exist, add to list
-        if len(IV_riv_nxt_id) != 0:
-            IV_riv_ups_id = IV_riv_nxt_id
-        else:
-            # This break statement exits the for loop if no more upstream
-            # reaches exist
-            break
+    # Translate hashes into reach IDs
+    for JS_riv_tot in riv_ups_hsh:
+        IM_riv_lvl.setdefault(IV_riv_tot_id[JS_riv_tot], IS_lvl)
 
 
 # ******************************************************************************
 # Write uncorrected traced reaches to shapefile
 # ******************************************************************************
 print('- Writing traced rivers to shapefile')
-# Translate hashes into reach IDs
-riv_ups_comid = [IV_riv_tot_id[x] for x in riv_ups_hsh]
-
-# Remove duplicates (None should exist)
-riv_ups_comid = list(set(riv_ups_comid))
-
 # Copy schema and crs
 meandrs_schema = riv_uncor.schema.copy()
 meandrs_crs = riv_uncor.crs
 
-# Write to file
-with fiona.open(riv_out, 'w', schema=meandrs_schema,
-                driver='ESRI Shapefile',
-                crs=meandrs_crs) as output:
-    for riv_fea in riv_uncor:
-        if riv_fea['properties']['COMID'] in riv_ups_comid:
-            output.write(riv_fea)
+# Open one output per threshold, reaches are written to all thresholds larger
+# than the width of their outlet in a single pass
+riv_lay = [fiona.open(fp, 'w', schema=meandrs_schema,
+                      driver='ESRI Shapefile',
+                      crs=meandrs_crs) for fp in riv_out_fp]
+
+for riv_fea in riv_uncor:
+    IS_lvl = IM_riv_lvl.get(riv_fea['properties']['COMID'])
+    if IS_lvl is not None:
+        for JS_lvl in range(IS_lvl, len(riv_lay)):
+            riv_lay[JS_lvl].write(riv_fea)
+
+for output in riv_lay:
+    output.close()
 
 
 # ******************************************************************************
@@ -269,12 +279,16 @@ cat_crs = cat.crs
 if len(cat_crs) == 0:
     cat_crs = 'epsg:4326'
 
-# Write to file
-with fiona.open(cat_out, 'w', schema=cat_schema,
-                driver='ESRI Shapefile',
-                crs=cat_crs) as output:
-    for cat_fea in cat:
-        if cat_fea['properties']['COMID'] in riv_ups_comid:
-            output.write(cat_fea)
+# Open one output per threshold and write all of them in a single pass
+cat_lay = [fiona.open(fp, 'w', schema=cat_schema,
+                      driver='ESRI Shapefile',
+                      crs=cat_crs) for fp in cat_out_fp]
 
+for cat_fea in cat:
+    IS_lvl = IM_riv_lvl.get(cat_fea['properties']['COMID'])
+    if IS_lvl is not None:
+        for JS_lvl in range(IS_lvl, len(cat_lay)):
+            cat_lay[JS_lvl].write(cat_fea)
 
+for output in cat_lay:
+    output.close()
@@ -6,7 +6,9 @@
 # Purpose:
 # Given shapefiles of corrected and uncorrected MeanDRS coastal rivers and the
 # the catchments of eaches contributing to coastal rivers narrower than 100m,
-# calculate global summary terms for rivers smaller than 100m.
+# calculate global summary terms for rivers smaller than 100m. The global table
+# of reach attributes built by mws_riv_tbl.py (.nc) can be given instead of the
+# corrected coastal rivers, in which case no river shapefile is read.
 
 # Author:
 # Jeffrey Wade, Cedric H. David, 2025
@@ -20,14 +22,15 @@ import glob
 import fiona
 from collections import OrderedDict
 import shapely.geometry
-import shapely.ops
 import os
+import mws_dis
+import mws_tbl
 
 
 # ******************************************************************************
 # Declaration of variables (given as command line arguments)
 # ******************************************************************************
-# 1 - Qout_cst_cor_shp
+# 1 - Qout_cst_cor_shp (or riv_tbl_nc)
 # 2 - Qout_cst_uncor_shp
 # 3 - cat_small_shp
 # 4 - Qout_small_out
@@ -89,9 +92,11 @@ print('- Reading files')
 # ------------------------------------------------------------------------------
 # MeanDRS Coastal Rivers
 # ------------------------------------------------------------------------------
+# Not needed if the reach attribute table is given
 Qout_cst_cor_files = list(glob.iglob(Qout_cst_cor_shp+'*.shp'))
 Qout_cst_cor_files.sort()
-Qout_cst_cor = [fiona.open(j, 'r', crs="EPSG:4326") for j in Qout_cst_cor_files]
+Qout_cst_cor = [fiona.open(j, 'r', crs="EPSG:4326") for j in
+                Qout_cst_cor_files]
 
 Qout_cst_uncor_files = list(glob.iglob(Qout_cst_uncor_shp+'*.shp'))
 Qout_cst_uncor_files.sort()
@@ -114,6 +119,18 @@ riv_cor_Q = []
 riv_pfaf = []
 riv_wid = []
 
+# Retrieve coastal rivers from reach attribute table
+if mws_tbl.tbl_chk(Qout_cst_cor_shp):
+    tbl_df = mws_tbl.tbl_read(Qout_cst_cor_shp, ['COMID', 'pfaf', 'meanQ_cor'],
+                              BS_cst=True)
+    riv_id = tbl_df.COMID.tolist()
+    riv_pfaf = tbl_df.pfaf.tolist()
+    # Convert discharge to km3/yr
+    riv_uncor_Q = (tbl_df.meanQ_cor * 0.031536).tolist()
+    riv_cor_Q = (tbl_df.meanQ_cor * 0.031536).tolist()
+    # Estimate river width my Moody & Troutman, 2002
+    riv_wid = (7.2*(tbl_df.meanQ_cor ** 0.5)).tolist()
+
 # Loop through catchments
 for j in range(len(Qout_cst_cor)):
 
@@ -159,26 +176,11 @@ if cat_str == 'gl_dis':
     cat_gl_files = list(glob.iglob(cat_small_shp+'*.shp'))
     cat_gl_files.sort()
 
-    # Read catchment files from each pfaf
-    cat_gl_raw = [fiona.open(fp, 'r') for fp in cat_gl_files]
-
-    # Transform to geometry object
-    cat_gl_geom = []
-    for j in range(len(cat_gl_raw)):
-        cat_gl_geom.extend([shapely.geometry.shape(cat_gl_raw[j][i]['geometry'])
-                            for i in range(len(cat_gl_raw[j]))])
-
-    # Merge catchments
-    cat_gl_merge = shapely.ops.unary_union(cat_gl_geom)
+    # Merge catchments of each pfaf in parallel, then merge pfafs pairwise
+    cat_gl_merge = mws_dis.dis_glb(cat_gl_files, IS_cpu=os.cpu_count())
 
     # Dissolve catchments
-    if cat_gl_merge.geom_type == 'Polygon':
-        cat_gl_dis = shapely.geometry.Polygon(cat_gl_merge.exterior)
-
-    if cat_gl_merge.geom_type == 'MultiPolygon':
-        cat_gl_dis = shapely.geometry.MultiPolygon(
-              shapely.geometry.Polygon(p.exterior)
-              for p in cat_gl_merge.geoms)
+    cat_gl_dis = mws_dis.dis_fil(cat_gl_merge)
 
     # Create new schema schema
     cat_gl_sch = {'properties': OrderedDict([('pfaf', 'str:18')]),
@@ -186,7 +188,8 @@ if cat_str == 'gl_dis':
 
     # Set properties
     cat_gl_prp = OrderedDict([('pfaf', 'global')])
-    cat_crs = cat_gl_raw[0].crs
+    with fiona.open(cat_gl_files[0], 'r') as cat_gl_raw:
+        cat_crs = cat_gl_raw.crs
 
     # Copy geometries
     cat_dis_gl_geom = shapely.geometry.mapping(cat_gl_dis)
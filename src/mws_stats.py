@@ -0,0 +1,165 @@
+# ******************************************************************************
+# mws_stats.py
+# ******************************************************************************
+
+# Purpose:
+# Functions shared by the mws_*.py scripts to accumulate width validation
+# statistics region by region. Each region is summarized by sums of the
+# MeanDRS and GRWL widths and of their products, and by a 2-D histogram of
+# both widths on fixed logarithmic bins, so that the statistics of several
+# regions can be merged by adding them.
+# Regression and bias statistics are exact, while the Spearman correlation is
+# computed from the 2-D histogram and is thus exact to within bin resolution.
+
+# Author:
+# Jeffrey Wade, Cedric H. David, 2025
+
+# ******************************************************************************
+# Import packages
+# ******************************************************************************
+import numpy as np
+import scipy.stats
+
+
+# ******************************************************************************
+# Declaration of variables
+# ******************************************************************************
+# Edges of width bins (m), 100 per decade from 0.1 m to 100 km. Widths outside
+# of this range are counted in the first or last bin.
+ZV_sts_bin = np.logspace(-1, 5, 601)
+
+# Sums accumulated for regression and bias statistics
+IV_sts_sum = ['n', 'sx', 'sy', 'sxx', 'syy', 'sxy', 'sabs', 'sdif']
+
+
+# ******************************************************************************
+# Define function to retrieve width bin of widths
+# ******************************************************************************
+def sts_idx(ZV_wid):
+
+    return np.clip(np.searchsorted(ZV_sts_bin, ZV_wid, side='right')-1, 0,
+                   len(ZV_sts_bin)-2)
+
+
+# ******************************************************************************
+# Define function to summarize width validation of a region
+# ******************************************************************************
+# ZV_m_wid:  MeanDRS widths of validated SWORD reaches
+# ZV_sw_wid: GRWL widths of validated SWORD reaches
+def sts_val(ZV_m_wid, ZV_sw_wid):
+
+    x = np.asarray(ZV_m_wid, dtype=np.float64)
+    y = np.asarray(ZV_sw_wid, dtype=np.float64)
+    IS_bin = len(ZV_sts_bin)-1
+
+    IM_sts = {'n': len(x), 'sx': np.sum(x), 'sy': np.sum(y),
+              'sxx': np.sum(x*x), 'syy': np.sum(y*y), 'sxy': np.sum(x*y),
+              'sabs': np.sum(np.abs(y-x)), 'sdif': np.sum(y-x)}
+
+    # 2-D histogram of MeanDRS (rows) and GRWL (columns) widths
+    IM_hst = np.zeros((IS_bin, IS_bin), dtype=np.int64)
+    np.add.at(IM_hst, (sts_idx(x), sts_idx(y)), 1)
+    IM_sts['hst_val'] = IM_hst
+
+    # Largest widths of reaches that have both widths
+    BV_pos = (x > 0) & (y > 0)
+    IM_sts['max_m'] = np.max(x[BV_pos], initial=0.)
+    IM_sts['max_sw'] = np.max(y[BV_pos], initial=0.)
+
+    return IM_sts
+
+
+# ******************************************************************************
+# Define function to merge statistics of two regions
+# ******************************************************************************
+def sts_add(IM_sts_1, IM_sts_2):
+
+    IM_sts = {x: IM_sts_1[x]+IM_sts_2[x] for x in IV_sts_sum}
+    IM_sts['hst_val'] = IM_sts_1['hst_val']+IM_sts_2['hst_val']
+    for x in ['max_m', 'max_sw']:
+        IM_sts[x] = max(IM_sts_1[x], IM_sts_2[x])
+
+    return IM_sts
+
+
+# ******************************************************************************
+# Define functions to save and load statistics
+# ******************************************************************************
+def sts_save(IM_sts, sts_fp):
+
+    with open(sts_fp, 'wb') as sts:
+        np.savez_compressed(sts, **IM_sts)
+
+
+def sts_load(sts_fp):
+
+    with np.load(sts_fp) as sts:
+        IM_sts = {x: sts[x] for x in sts.files}
+
+    for x in IM_sts:
+        if IM_sts[x].ndim == 0:
+            IM_sts[x] = IM_sts[x].item()
+
+    return IM_sts
+
+
+# ******************************************************************************
+# Define function to compute Spearman correlation from 2-D histogram
+# ******************************************************************************
+# Widths in the same bin share the same (mid) rank
+def sts_spr(IM_hst):
+
+    IM_hst = IM_hst.astype(np.float64)
+    IS_n = np.sum(IM_hst)
+
+    ZV_rnk = []
+    for ZV_cnt in [np.sum(IM_hst, axis=1), np.sum(IM_hst, axis=0)]:
+        ZV_rnk.append(np.cumsum(ZV_cnt)-(ZV_cnt-1)/2-(IS_n+1)/2)
+
+    ZS_cov = ZV_rnk[0] @ IM_hst @ ZV_rnk[1]
+    ZS_var_x = np.sum(np.sum(IM_hst, axis=1)*ZV_rnk[0]**2)
+    ZS_var_y = np.sum(np.sum(IM_hst, axis=0)*ZV_rnk[1]**2)
+    corr = ZS_cov/np.sqrt(ZS_var_x*ZS_var_y)
+
+    # Two-sided p-value of t-test with n-2 degrees of freedom
+    ZS_t = corr*np.sqrt((IS_n-2)/((1-corr)*(1+corr)))
+    p_value = 2*scipy.stats.t.sf(np.abs(ZS_t), IS_n-2)
+
+    return corr, p_value
+
+
+# ******************************************************************************
+# Define function to compute validation statistics
+# ******************************************************************************
+# Returns a dictionary with regression of GRWL widths on MeanDRS widths (slope,
+# intercept, r_value, p_value, std_err), regression through origin (slope_0,
+# r_squared_0), mean absolute bias (mab), mean bias (mb), and Spearman
+# correlation (corr, corr_p_value)
+def sts_fin(IM_sts):
+
+    n = IM_sts['n']
+    ZS_ssx = IM_sts['sxx']-IM_sts['sx']**2/n
+    ZS_ssy = IM_sts['syy']-IM_sts['sy']**2/n
+    ZS_sxy = IM_sts['sxy']-IM_sts['sx']*IM_sts['sy']/n
+
+    IM_fin = {}
+    IM_fin['slope'] = ZS_sxy/ZS_ssx
+    IM_fin['intercept'] = (IM_sts['sy']-IM_fin['slope']*IM_sts['sx'])/n
+    IM_fin['r_value'] = ZS_sxy/np.sqrt(ZS_ssx*ZS_ssy)
+    r = IM_fin['r_value']
+    ZS_t = r*np.sqrt((n-2)/((1-r)*(1+r)))
+    IM_fin['p_value'] = 2*scipy.stats.t.sf(np.abs(ZS_t), n-2)
+    IM_fin['std_err'] = np.sqrt((1-r**2)*ZS_ssy/ZS_ssx/(n-2))
+
+    slope_0 = IM_sts['sxy']/IM_sts['sxx']
+    ss_residual = IM_sts['syy']-2*slope_0*IM_sts['sxy'] +                     \
+        slope_0**2*IM_sts['sxx']
+    IM_fin['slope_0'] = slope_0
+    IM_fin['r_squared_0'] = 1-ss_residual/ZS_ssy
+
+    IM_fin['mab'] = IM_sts['sabs']/n
+    IM_fin['mb'] = IM_sts['sdif']/n
+
+    IM_fin['corr'], IM_fin['corr_p_value'] = sts_spr(IM_sts['hst_val'])
+
+    return IM_fin
@@ -0,0 +1,473 @@
+# ******************************************************************************
+# mws_sum.py
+# ******************************************************************************
+
+# Purpose:
+# Functions shared by the mws_*_summary.py scripts to compute global summary
+# terms of river width scenarios. The regional time series of a folder are
+# loaded into one (region x time x scenario) array, and all summary terms are
+# computed with vectorized reductions over its axes. Any number of leading axes
+# can be added, e.g. to summarize several volume scenarios at once. Regional
+# time series can be cached with the content hash of their file, so that only
+# regions that changed are read again. Global time series of selected scenarios
+# of several folders can also be aggregated, reading only their columns.
+
+# Author:
+# Jeffrey Wade, Cedric H. David, 2025
+
+# ******************************************************************************
+# Import packages
+# ******************************************************************************
+import glob
+import hashlib
+import numpy as np
+import os
+import pandas as pd
+import re
+
+
+# ******************************************************************************
+# Declaration of variables
+# ******************************************************************************
+# Number of time steps in a year
+IS_sum_yr = 12
+
+# Time zone of time steps in regional files (arbitrary PST to match Zenodo)
+sum_tz = 'America/Los_Angeles'
+
+# First month of calendar and water years
+IM_sum_mon = {'cy': 1, 'wy': 10}
+
+# Variability statistics written by default: mean annual range, mean annual
+# 90th-10th percentile range, mean annual standard deviation, and mean annual
+# coefficient of variation
+IV_sum_var = ['range', 'p90_p10', 'std', 'cv']
+
+
+# ******************************************************************************
+# Define function to hash content of a regional file
+# ******************************************************************************
+def sum_hsh(sum_fp):
+
+    IM_hsh = hashlib.sha256()
+    with open(sum_fp, 'rb') as sum_fl:
+        for sum_chk in iter(lambda: sum_fl.read(1 << 20), b''):
+            IM_hsh.update(sum_chk)
+
+    return IM_hsh.hexdigest()
+
+
+# ******************************************************************************
+# Define functions to save and load cached regional time series
+# ******************************************************************************
+# Each region is stored with the name and content hash of its file
+def sum_save(IM_sum, sum_npz):
+
+    with open(sum_npz, 'wb') as sum_fl:
+        np.savez_compressed(sum_fl, val=IM_sum['val'], fl=IM_sum['file'],
+                            hash=IM_sum['hash'],
+                            time=np.array(IM_sum['time'], dtype=str),
+                            scen=np.array(IM_sum['scen'], dtype=str))
+
+
+def sum_load(sum_npz):
+
+    with np.load(sum_npz) as sum_fl:
+        return {'val': sum_fl['val'], 'file': list(sum_fl['fl']),
+                'hash': list(sum_fl['hash']), 'time': list(sum_fl['time']),
+                'scen': list(sum_fl['scen'])}
+
+
+# ******************************************************************************
+# Define function to read regional time series of a folder
+# ******************************************************************************
+# sum_npz: optional cache of regional time series. Only regions whose file is
+#          new or has a different content hash than in the cache are read
+#          again, and the cache is updated when any region changed.
+# Returns a dictionary with:
+# 'val':  (region x time x scenario) array of values
+# 'pfaf': Pfafstetter codes of regions
+# 'time': time steps
+# 'scen': names of river width scenarios
+# 'file': names of regional files
+# 'hash': content hashes of regional files
+def sum_read(sum_dir, sum_npz=None):
+
+    sum_files = list(glob.iglob(sum_dir+'*'))
+    sum_files.sort()
+
+    if len(sum_files) == 0:
+        print('ERROR - No files found in '+sum_dir)
+        raise SystemExit(22)
+
+    IV_sum_fl = [os.path.basename(x) for x in sum_files]
+    IV_sum_hsh = [sum_hsh(x) for x in sum_files]
+
+    # --------------------------------------------------------------------------
+    # Index cached regions by file name and content hash
+    # --------------------------------------------------------------------------
+    IM_chd = {}
+    BS_sum_chg = True
+    if sum_npz is not None and os.path.isfile(sum_npz):
+        IM_sum_chd = sum_load(sum_npz)
+        IM_chd = {(x, y): j for j, (x, y) in
+                  enumerate(zip(IM_sum_chd['file'], IM_sum_chd['hash']))}
+        BS_sum_chg = IM_sum_chd['file'] != IV_sum_fl or                       \
+            IM_sum_chd['hash'] != IV_sum_hsh
+
+    # --------------------------------------------------------------------------
+    # Read new or changed regions, retrieve others from cache
+    # --------------------------------------------------------------------------
+    ZM_val = [None] * len(sum_files)
+    time_all = [None] * len(sum_files)
+    scen_all = [None] * len(sum_files)
+
+    for j in range(len(sum_files)):
+        JS_chd = IM_chd.get((IV_sum_fl[j], IV_sum_hsh[j]))
+        if JS_chd is not None:
+            ZM_val[j] = IM_sum_chd['val'][JS_chd]
+            time_all[j] = pd.Index(IM_sum_chd['time'], name='time')
+            scen_all[j] = pd.Index(IM_sum_chd['scen'])
+        else:
+            sum_df = pd.read_csv(sum_files[j], index_col='time')
+            ZM_val[j] = sum_df.to_numpy(dtype=np.float64)
+            time_all[j] = sum_df.index
+            scen_all[j] = sum_df.columns
+
+    # All regions must share time steps and scenarios
+    for j in range(1, len(sum_files)):
+        if not (time_all[j].equals(time_all[0]) and
+                scen_all[j].equals(scen_all[0])):
+            print('ERROR - Files in '+sum_dir+' have different time steps or '
+                  'river width scenarios')
+            raise SystemExit(22)
+
+    ZM_val = np.stack(ZM_val)
+
+    # Retrieve numbers of pfafs
+    pfaf_list = pd.Series([x.partition("pfaf_")[-1][0:2] for x in
+                           sum_files]).sort_values(ignore_index=True)
+
+    IM_sum = {'val': ZM_val, 'pfaf': pfaf_list, 'time': time_all[0],
+              'scen': list(scen_all[0]), 'file': IV_sum_fl,
+              'hash': IV_sum_hsh}
+
+    # --------------------------------------------------------------------------
+    # Update cache
+    # --------------------------------------------------------------------------
+    if sum_npz is not None and BS_sum_chg:
+        sum_save(IM_sum, sum_npz)
+
+    return IM_sum
+
+
+# ******************************************************************************
+# Define function to stack regional time series of several folders
+# ******************************************************************************
+# Returns the dictionary of the first folder, with values of all folders
+# stacked along a new leading axis
+def sum_stk(IM_sum_all):
+
+    for IM_sum in IM_sum_all[1:]:
+        if not (IM_sum['val'].shape == IM_sum_all[0]['val'].shape and
+                IM_sum['pfaf'].equals(IM_sum_all[0]['pfaf'])):
+            print('ERROR - Folders contain different regions, time steps or '
+                  'river width scenarios')
+            raise SystemExit(22)
+
+    IM_stk = dict(IM_sum_all[0])
+    IM_stk['val'] = np.stack([x['val'] for x in IM_sum_all])
+
+    return IM_stk
+
+
+# ******************************************************************************
+# Define function to read selected river width scenarios of a folder
+# ******************************************************************************
+# IV_scen: names of river width scenarios (e.g. ['wid_0', 'wid_50']), only
+#          these columns are parsed
+# Returns a dictionary as in sum_read (without names and hashes of files), with
+# scenarios in the order of IV_scen
+def sum_col(sum_dir, IV_scen):
+
+    sum_files = list(glob.iglob(sum_dir+'*'))
+    sum_files.sort()
+
+    if len(sum_files) == 0:
+        print('ERROR - No files found in '+sum_dir)
+        raise SystemExit(22)
+
+    ZM_val = [None] * len(sum_files)
+    for j in range(len(sum_files)):
+        sum_df = pd.read_csv(sum_files[j], usecols=['time']+list(IV_scen),
+                             index_col='time')
+        if j == 0:
+            time = sum_df.index
+        elif not sum_df.index.equals(time):
+            print('ERROR - Files in '+sum_dir+' have different time steps')
+            raise SystemExit(22)
+        ZM_val[j] = sum_df[list(IV_scen)].to_numpy(dtype=np.float64)
+
+    # Retrieve numbers of pfafs
+    pfaf_list = pd.Series([x.partition("pfaf_")[-1][0:2] for x in
+                           sum_files]).sort_values(ignore_index=True)
+
+    return {'val': np.stack(ZM_val), 'pfaf': pfaf_list, 'time': time,
+            'scen': list(IV_scen)}
+
+
+# ******************************************************************************
+# Define function to aggregate global time series of several variables
+# ******************************************************************************
+# IM_dir:  dictionary of folders of regional files for each variable (e.g.
+#          discharge to the ocean and river volume)
+# IV_scen: names of river width scenarios
+# Returns a dictionary with:
+# 'val':  (variable x time x scenario) array of sums over all regions
+# 'var':  names of variables
+# 'time': time steps, as datetimes
+# 'scen': names of river width scenarios
+def sum_agg(IM_dir, IV_scen):
+
+    IM_sum = sum_stk([sum_col(IM_dir[x], IV_scen) for x in IM_dir])
+
+    # Regions are added one after the other, in the order of their files
+    ZM_glb = np.sum(IM_sum['val'], axis=1)
+
+    time = pd.to_datetime(IM_sum['time'], format='%Y-%m-%d %H:%M:%S')
+
+    return {'val': ZM_glb, 'var': list(IM_dir), 'time': time,
+            'scen': list(IV_scen)}
+
+
+# ******************************************************************************
+# Define function to move an axis last and make it contiguous
+# ******************************************************************************
+def sum_ctg(ZM_val, IS_axs):
+
+    return np.ascontiguousarray(np.moveaxis(ZM_val, IS_axs, -1))
+
+
+# ******************************************************************************
+# Define function to group time steps by year
+# ******************************************************************************
+# time:       time steps of regional files
+# IS_mon_beg: first month of years, 1 for calendar years, 10 for water years
+#             (which are named after the calendar year they end in)
+# BS_cpl:     whether time steps of incomplete years are excluded
+# Returns the year of each time step, -1 for excluded time steps
+def sum_yr(time, IS_mon_beg=1, BS_cpl=True):
+
+    # Time steps are converted back from the time zone of regional files
+    ZV_tim = pd.DatetimeIndex(pd.to_datetime(time)).tz_localize(sum_tz)       \
+        .tz_convert('UTC')
+
+    IV_yr = np.asarray(ZV_tim.year, dtype=np.int64)
+    if IS_mon_beg != 1:
+        IV_yr = IV_yr + (np.asarray(ZV_tim.month) >= IS_mon_beg)
+
+    if BS_cpl:
+        IV_uni, IV_inv, IV_cnt = np.unique(IV_yr, return_inverse=True,
+                                           return_counts=True)
+        IV_yr = np.where(IV_cnt[IV_inv] == IS_sum_yr, IV_yr, -1)
+
+    return IV_yr
+
+
+# ******************************************************************************
+# Define function to compute variability statistics over groups of time steps
+# ******************************************************************************
+# ZM_val: (... x time x scenario) array of values
+# IV_grp: group (e.g. year) of each time step, -1 for excluded time steps.
+#         Groups can have different numbers of time steps.
+# IV_sts: statistics computed within each group and averaged over groups,
+#         among 'mean', 'range' (max-min), 'std', 'cv' (std/mean), and
+#         'pXX_pYY' (XXth-YYth percentile range)
+# Returns a dictionary of (... x scenario) arrays, one per statistic
+def sum_var(ZM_val, IV_grp, IV_sts):
+
+    ZM_val = np.asarray(ZM_val, dtype=np.float64)
+    IV_grp = np.asarray(IV_grp)
+
+    # --------------------------------------------------------------------------
+    # Place time steps in a (... x group x step x scenario) array
+    # --------------------------------------------------------------------------
+    # Groups with fewer time steps than the largest one are padded with NaN
+    BV_grp = IV_grp >= 0
+    IV_uni, IV_inv, IV_cnt = np.unique(IV_grp[BV_grp], return_inverse=True,
+                                       return_counts=True)
+
+    if len(IV_uni) == 0:
+        print('ERROR - No time steps left to compute statistics')
+        raise SystemExit(22)
+
+    IV_srt = np.argsort(IV_inv, kind='stable')
+    IV_pos = np.empty(len(IV_inv), dtype=np.int64)
+    IV_pos[IV_srt] = np.arange(len(IV_inv)) -                                 \
+        np.repeat(np.cumsum(IV_cnt)-IV_cnt, IV_cnt)
+
+    ZM_grp = np.full(ZM_val.shape[:-2] + (len(IV_uni), IV_cnt.max(),
+                                          ZM_val.shape[-1]), np.nan)
+    ZM_grp[..., IV_inv, IV_pos, :] = ZM_val[..., BV_grp, :]
+
+    # --------------------------------------------------------------------------
+    # Compute statistics within groups, and average over groups
+    # --------------------------------------------------------------------------
+    IM_var = {}
+    for sts in IV_sts:
+        if sts == 'mean':
+            ZM_sts = np.nanmean(ZM_grp, axis=-2)
+        elif sts == 'range':
+            ZM_sts = np.nanmax(ZM_grp, axis=-2) - np.nanmin(ZM_grp, axis=-2)
+        elif sts == 'std':
+            ZM_sts = np.nanstd(ZM_grp, axis=-2)
+        elif sts == 'cv':
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ZM_sts = np.nanstd(ZM_grp, axis=-2) /                         \
+                    np.nanmean(ZM_grp, axis=-2)
+        elif re.fullmatch(r'p\d+(\.\d+)?_p\d+(\.\d+)?', sts):
+            ZV_pct = [float(x) for x in sts[1:].split('_p')]
+            ZM_pct = np.nanpercentile(ZM_grp, ZV_pct, axis=-2)
+            ZM_sts = ZM_pct[0] - ZM_pct[1]
+        else:
+            print('ERROR - Unknown statistic: '+sts)
+            raise SystemExit(22)
+
+        # Groups are made contiguous, as in sum_glb
+        IM_var[sts] = np.mean(sum_ctg(ZM_sts, -2), axis=-1)
+
+    return IM_var
+
+
+# ******************************************************************************
+# Define function to compute global summary terms
+# ******************************************************************************
+# ZM_val: (... x region x time x scenario) array of values
+# Returns a dictionary with:
+# 'mean':       (... x region x scenario) mean over time of each region
+# 'sum':        (... x scenario) global sum of regional means
+# 'prop':       (... x scenario) proportion (%) of the global mean captured by
+#               each scenario, compared to the last scenario
+# 'glb':        (... x time x scenario) global sum at each time step
+# 'range':      (... x scenario) mean annual range of global sum
+# 'range_prop': (... x scenario) proportion (%) of the mean annual range of
+#               each scenario, compared to the last scenario
+# Years are consecutive chunks of IS_sum_yr time steps unless the year of each
+# time step is given (see sum_yr).
+def sum_glb(ZM_val, IV_yr=None):
+
+    ZM_val = np.asarray(ZM_val, dtype=np.float64)
+
+    if IV_yr is None:
+        IV_yr = np.arange(ZM_val.shape[-2]) // IS_sum_yr
+
+    IM_glb = {}
+
+    # --------------------------------------------------------------------------
+    # Mean over time of each region, and global proportion
+    # --------------------------------------------------------------------------
+    # Time series are made contiguous so that sums over time are done in the
+    # same (pairwise) order as sums of single time series, whatever the memory
+    # layout of inputs
+    IM_glb['mean'] = np.mean(sum_ctg(ZM_val, -2), axis=-1)
+
+    IM_glb['sum'] = np.sum(IM_glb['mean'], axis=-2)
+    IM_glb['prop'] = 100 * IM_glb['sum'] / IM_glb['sum'][..., -1:]
+
+    # --------------------------------------------------------------------------
+    # Global sum at each time step, and mean annual range
+    # --------------------------------------------------------------------------
+    # Regions are summed one after the other along the outer region axis
+    IM_glb['glb'] = np.sum(ZM_val, axis=-3)
+
+    IM_glb['range'] = sum_var(IM_glb['glb'], IV_yr, ['range'])['range']
+    IM_glb['range_prop'] = 100 * (IM_glb['range'] / IM_glb['range'][..., -1:])
+
+    return IM_glb
+
+
+# ******************************************************************************
+# Define function to write global summary terms
+# ******************************************************************************
+# IM_glb:  global summary terms of one scenario (see sum_glb)
+# IM_sum:  regional time series the terms were computed from (see sum_read)
+# sum_out, prop_out, range_out, range_prop_out: output csv files
+def sum_write(IM_glb, IM_sum, sum_out, prop_out, range_out, range_prop_out):
+
+    IV_scen = IM_sum['scen']
+
+    sum_df = pd.DataFrame(IM_glb['mean'].T, index=IV_scen,
+                          columns=('pfaf_' + IM_sum['pfaf']).tolist())
+    sum_df.to_csv(sum_out)
+
+    pd.Series(IM_glb['prop'], index=IV_scen).to_csv(prop_out)
+
+    pd.Series(IM_glb['range']).to_csv(range_out)
+    pd.Series(IM_glb['range_prop']).to_csv(range_prop_out)
+
+
+# ******************************************************************************
+# Define function to compute variability statistics by calendar and water year
+# ******************************************************************************
+# ZM_glb: (... x time x scenario) global sum at each time step (see sum_glb)
+# time:   time steps of regional files
+# Returns a dictionary of (... x scenario) arrays named after the type of year
+# and the statistic, e.g. 'wy_p90_p10'. Only complete years are used.
+def sum_vtb(ZM_glb, time, IV_sts=IV_sum_var):
+
+    IM_vtb = {}
+    for yr in IM_sum_mon:
+        IM_var = sum_var(ZM_glb, sum_yr(time, IM_sum_mon[yr]), IV_sts)
+        for sts in IV_sts:
+            IM_vtb[yr+'_'+sts] = IM_var[sts]
+
+    return IM_vtb
+
+
+# ******************************************************************************
+# Define function to write variability statistics
+# ******************************************************************************
+# One row per river width scenario and one column per statistic
+def sum_vwr(IM_vtb, IM_sum, var_out):
+
+    pd.DataFrame(IM_vtb, index=IM_sum['scen']).to_csv(var_out)
+
+
+# ******************************************************************************
+# Define functions to write and read consolidated summary of several datasets
+# ******************************************************************************
+# Global summary terms (see sum_glb) and variability statistics (see sum_vtb)
+# of each dataset are written with one row per dataset and river width
+# scenario, and one column per statistic
+IV_sum_tbl = ['sum', 'prop', 'range', 'range_prop']
+
+
+def sum_tbl_write(IM_glb, IM_vtb, IV_dst, IV_scen, sum_all_out):
+
+    IM_tbl = {x: IM_glb[x] for x in IV_sum_tbl}
+    IM_tbl.update(IM_vtb)
+
+    sum_idx = pd.MultiIndex.from_product([IV_dst, IV_scen],
+                                         names=['dataset', 'scen'])
+    sum_df = pd.DataFrame({x: np.ravel(IM_tbl[x]) for x in IM_tbl},
+                          index=sum_idx)
+    sum_df.to_csv(sum_all_out)
+
+
+def sum_tbl_read(sum_all_csv):
+
+    return pd.read_csv(sum_all_csv, index_col=['dataset', 'scen'])
+
+
+# ******************************************************************************
+# Define function to select one statistic of one dataset from summary
+# ******************************************************************************
+# Returns a (scenario, statistic) dataframe laid out as the csv files written
+# by sum_write and read back with pandas
+def sum_tbl_sel(sum_df, dst, sts):
+
+    if dst not in sum_df.index.get_level_values('dataset'):
+        print('ERROR - Dataset '+dst+' missing from consolidated summary')
+        raise SystemExit(22)
+
+    return sum_df.loc[dst, [sts]].reset_index()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# ******************************************************************************
+# mws_summary_all.py
+# ******************************************************************************
+
+# Purpose:
+# Given the regional discharge to the ocean and river volume output folders of
+# several datasets (e.g. corrected and uncorrected simulations of several land
+# surface models, and low, normal, and high volume scenarios), calculate global
+# summary terms and variability statistics of all datasets at once, and write
+# them to a single consolidated (dataset x scenario x statistic) csv file that
+# can be read by the plotting scripts (see mws_sum.py).
+
+# Author:
+# Jeffrey Wade, Cedric H. David, 2025
+
+# ******************************************************************************
+# Import packages
+# ******************************************************************************
+import sys
+import os
+import mws_sum
+
+
+# ******************************************************************************
+# Declaration of variables (given as command line arguments)
+# ******************************************************************************
+# 1 - sum_all_out
+# 2 - dataset name (e.g. Qout_COR, Qout_VIC, V_nrm_ENS)
+# 3 - dataset folder
+# 4 - dataset name
+# 5 - dataset folder
+# ... (any number of dataset name and folder pairs)
+
+
+# ******************************************************************************
+# Get command line arguments
+# ******************************************************************************
+IS_arg = len(sys.argv)
+if (IS_arg < 4) or (IS_arg % 2 != 0):
+    print('ERROR - An output file and pairs of dataset name and folder must '
+          'be used')
+    raise SystemExit(22)
+
+sum_all_out = sys.argv[1]
+IV_dst = sys.argv[2::2]
+dst_dir_all = sys.argv[3::2]
+
+if len(set(IV_dst)) != len(IV_dst):
+    print('ERROR - Dataset names must be unique')
+    raise SystemExit(22)
+
+
+# ******************************************************************************
+# Check if files/folders exist
+# ******************************************************************************
+for dst_dir in dst_dir_all:
+    if not os.path.isdir(dst_dir):
+        print('ERROR - '+dst_dir+' invalid folder path')
+        raise SystemExit(22)
+
+
+# ******************************************************************************
+# Read files
+# ******************************************************************************
+print('- Reading files')
+# All regions of all datasets are loaded into one
+# (dataset x region x time x scenario) array
+IM_sum_all = mws_sum.sum_stk([mws_sum.sum_read(x) for x in dst_dir_all])
+
+
+# ******************************************************************************
+# Generate consolidated summary
+# ******************************************************************************
+print('- Computing global summary of all datasets')
+IM_glb = mws_sum.sum_glb(IM_sum_all['val'])
+IM_vtb = mws_sum.sum_vtb(IM_glb['glb'], IM_sum_all['time'])
+
+
+# ******************************************************************************
+# Write file
+# ******************************************************************************
+print('- Writing consolidated summary')
+mws_sum.sum_tbl_write(IM_glb, IM_vtb, IV_dst, IM_sum_all['scen'], sum_all_out)
@@ -0,0 +1,85 @@
+# ******************************************************************************
+# mws_tbl.py
+# ******************************************************************************
+
+# Purpose:
+# Functions shared by the mws_*.py scripts to write and read the global table
+# of MeanDRS reach attributes built by mws_riv_tbl.py. The table is stored as a
+# netCDF file with one variable per attribute along a single 'rivid'
+# dimension, so that each stage only reads the attributes it needs instead of
+# parsing all river shapefiles again.
+
+# Author:
+# Jeffrey Wade, Cedric H. David, 2025
+
+# ******************************************************************************
+# Import packages
+# ******************************************************************************
+import netCDF4 as nc
+import numpy as np
+import pandas as pd
+
+
+# ******************************************************************************
+# Declaration of variables
+# ******************************************************************************
+# Attributes of the table and their netCDF types
+# COMID:       reach ID
+# pfaf:        Pfafstetter code of region
+# NextDownID:  ID of next downstream reach (0 for outlets)
+# meanQ_cor:   mean discharge of corrected MeanDRS (m3/s)
+# meanQ_uncor: mean discharge of uncorrected MeanDRS (m3/s)
+# meanQ_cst:   mean discharge of uncorrected coastal rivers, computed from Qout
+#              by mws_coastal_rivs.py (m3/s, NaN for other reaches)
+# wid:         width estimated from meanQ_uncor (m)
+# coast:       1 for reaches draining to the coast, 0 otherwise
+IM_tbl_typ = {'COMID': 'i4', 'pfaf': 'i2', 'NextDownID': 'i4',
+              'meanQ_cor': 'f8', 'meanQ_uncor': 'f8', 'meanQ_cst': 'f8',
+              'wid': 'f8', 'coast': 'i1'}
+
+
+# ******************************************************************************
+# Define function to check whether a path is a reach attribute table
+# ******************************************************************************
+def tbl_chk(tbl_fp):
+
+    return tbl_fp.endswith('.nc')
+
+
+# ******************************************************************************
+# Define function to write reach attribute table
+# ******************************************************************************
+def tbl_write(tbl_df, tbl_fp):
+
+    with nc.Dataset(tbl_fp, 'w', format='NETCDF4') as tbl:
+
+        tbl.createDimension('rivid', len(tbl_df))
+
+        for tbl_var in IM_tbl_typ:
+            var = tbl.createVariable(tbl_var, IM_tbl_typ[tbl_var], ('rivid',),
+                                     zlib=True)
+            var[:] = tbl_df[tbl_var].to_numpy()
+
+
+# ******************************************************************************
+# Define function to read reach attribute table
+# ******************************************************************************
+# Only the given attributes are read, all of them if none are given. Reaches
+# can be restricted to coastal rivers.
+def tbl_read(tbl_fp, IV_tbl_var=None, BS_cst=False):
+
+    if IV_tbl_var is None:
+        IV_tbl_var = list(IM_tbl_typ)
+
+    with nc.Dataset(tbl_fp, 'r') as tbl:
+
+        tbl.set_auto_mask(False)
+
+        if BS_cst:
+            IV_ind = np.flatnonzero(tbl['coast'][:] == 1)
+        else:
+            IV_ind = slice(None)
+
+        tbl_df = pd.DataFrame({x: tbl[x][:][IV_ind] for x in IV_tbl_var})
+
+    return tbl_df
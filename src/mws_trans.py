@@ -0,0 +1,202 @@
+# ******************************************************************************
+# mws_trans.py
+# ******************************************************************************
+
+# Purpose:
+# Functions shared by the mws_*.py scripts to use MERIT-SWORD translations from
+# SWORD reaches to the most overlapping MERIT-Basins reaches. Translation files
+# are opened lazily and only the MERIT reach IDs (mb_*) and overlapping lengths
+# of the requested SWORD reaches are read, as raw arrays. The overlap-weighted
+# averaging from MERIT reaches to SWORD reaches is built once as a sparse
+# matrix, which can be saved with the content hash of its translation file,
+# loaded, and applied to any per-reach vector or (time x reach) matrix of MERIT
+# values.
+
+# Author:
+# Jeffrey Wade, Cedric H. David, 2025
+
+# ******************************************************************************
+# Import packages
+# ******************************************************************************
+import hashlib
+import netCDF4 as nc
+import numpy as np
+import pandas as pd
+import scipy.sparse
+
+
+# ******************************************************************************
+# Define function to read MERIT-SWORD translations of given SWORD reaches
+# ******************************************************************************
+# ms_nc:    MERIT-SWORD sword_to_mb translation file
+# IV_sw_id: SWORD reach IDs whose translations are retrieved
+# Returns two (SWORD reaches x translations) arrays holding the IDs of the most
+# overlapping MERIT reaches and the corresponding overlapping lengths. Only the
+# hyperslab of the file spanning the requested reaches is read.
+def trans_read(ms_nc, IV_sw_id):
+
+    with nc.Dataset(ms_nc, 'r') as ms:
+
+        ms.set_auto_mask(False)
+
+        # ----------------------------------------------------------------------
+        # Locate requested SWORD reaches along the SWORD dimension
+        # ----------------------------------------------------------------------
+        ms_dim = list(ms.dimensions)[0]
+        IV_ms_ind = pd.Index(ms[ms_dim][:]).get_indexer(IV_sw_id)
+
+        if (IV_ms_ind == -1).any():
+            print('ERROR - SWORD reaches missing from '+ms_nc)
+            raise SystemExit(22)
+
+        # ----------------------------------------------------------------------
+        # Retrieve names of ID and overlapping length variables
+        # ----------------------------------------------------------------------
+        ms_var = [x for x in ms.variables
+                  if x != ms_dim and ms[x].dimensions == (ms_dim,)]
+        ms_id_var = [x for x in ms_var if x.startswith('mb_')]
+        ms_len_var = [x for x in ms_var if not x.startswith('mb_')]
+
+        # ----------------------------------------------------------------------
+        # Read variables over the span of requested reaches only
+        # ----------------------------------------------------------------------
+        if len(IV_ms_ind) == 0:
+            IS_beg, IS_end = 0, 0
+        else:
+            IS_beg, IS_end = IV_ms_ind.min(), IV_ms_ind.max()+1
+        IV_ms_sel = IV_ms_ind-IS_beg
+
+        IM_ms_id = np.column_stack(
+            [ms[x][IS_beg:IS_end][IV_ms_sel] for x in ms_id_var]
+            ).astype(np.int64)
+        ZM_ms_len = np.column_stack(
+            [ms[x][IS_beg:IS_end][IV_ms_sel] for x in ms_len_var]
+            ).astype(np.float64)
+
+    return IM_ms_id, ZM_ms_len
+
+
+# ******************************************************************************
+# Define function to retrieve region (first two digits) of reach IDs
+# ******************************************************************************
+def trans_reg(IV_id):
+
+    IV_id = np.maximum(np.asarray(IV_id, dtype=np.int64), 1)
+    IV_dig = np.floor(np.log10(IV_id)).astype(np.int64)+1
+    return IV_id // 10 ** np.maximum(IV_dig-2, 0)
+
+
+# ******************************************************************************
+# Define function to build sparse translation from MERIT to SWORD reaches
+# ******************************************************************************
+# IM_ms_id, ZM_ms_len: translations of SWORD reaches (see trans_read)
+# IV_sw_id:            SWORD reach IDs (rows of the translation)
+# IV_mb_id:            MERIT reach IDs (columns of the translation)
+# Returns a dictionary with:
+# 'mat':   (SWORD x MERIT) matrix of overlapping lengths normalized by the sum
+#          of overlapping lengths of each SWORD reach
+# 'val':   whether each SWORD reach has any overlap and a valid translation
+# 'sw_id': SWORD reach IDs
+# 'mb_id': MERIT reach IDs
+def trans_bld(IM_ms_id, ZM_ms_len, IV_sw_id, IV_mb_id):
+
+    IV_sw_id = np.asarray(IV_sw_id, dtype=np.int64)
+    IV_mb_id = np.asarray(IV_mb_id, dtype=np.int64)
+
+    # --------------------------------------------------------------------------
+    # Sum overlapping lengths of each SWORD reach
+    # --------------------------------------------------------------------------
+    # One reach at a time because summing along an axis of a 2-D array is done
+    # in a different order than summing a 1-D array, which changes the last
+    # digits of weights
+    overlap_sum = np.array([np.sum(ZV_ms_len) for ZV_ms_len in ZM_ms_len])
+
+    # Reaches with no overlap or no valid translation are not translated
+    BV_val = (overlap_sum != 0) & (IM_ms_id[:, 0] != 0)
+
+    # --------------------------------------------------------------------------
+    # Retrieve valid translations of each SWORD reach
+    # --------------------------------------------------------------------------
+    # Translations are used until the first one that is not valid or that is
+    # from a different region than the SWORD reach
+    BM_ms = (IM_ms_id > 0) &                                                  \
+        (trans_reg(IM_ms_id) == trans_reg(IV_sw_id)[:, None])
+    BM_ms = np.cumprod(BM_ms, axis=1).astype(bool) & BV_val[:, None]
+
+    # Retrieve column of MERIT reaches through COMID index
+    IM_ms_ind = pd.Index(IV_mb_id).get_indexer(
+        IM_ms_id.ravel()).reshape(IM_ms_id.shape)
+
+    if (IM_ms_ind[BM_ms] == -1).any():
+        print('ERROR - MERIT-SWORD reaches missing from MERIT reaches')
+        raise SystemExit(22)
+
+    # --------------------------------------------------------------------------
+    # Store weights row by row, keeping translation order within each row
+    # --------------------------------------------------------------------------
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ZM_ms_wgt = ZM_ms_len / overlap_sum[:, None]
+
+    IM_trans = scipy.sparse.csr_matrix(
+        (ZM_ms_wgt[BM_ms], IM_ms_ind[BM_ms],
+         np.concatenate(([0], np.cumsum(BM_ms.sum(axis=1))))),
+        shape=(len(IV_sw_id), len(IV_mb_id)))
+
+    return {'mat': IM_trans, 'val': BV_val, 'sw_id': IV_sw_id,
+            'mb_id': IV_mb_id}
+
+
+# ******************************************************************************
+# Define function to compute content hash of a translation file
+# ******************************************************************************
+# Read in chunks of 1 MiB so that large files are not loaded in memory
+def trans_hsh(ms_nc):
+
+    IM_hsh = hashlib.sha256()
+    with open(ms_nc, 'rb') as ms_fl:
+        for ms_chk in iter(lambda: ms_fl.read(1 << 20), b''):
+            IM_hsh.update(ms_chk)
+
+    return IM_hsh.hexdigest()
+
+
+# ******************************************************************************
+# Define functions to save and load sparse translation
+# ******************************************************************************
+# ms_hsh: content hash of the translation file the sparse translation was built
+#         from, returned as 'hash' when loaded (empty if not saved)
+def trans_save(IM_trans, trans_fp, ms_hsh=''):
+
+    IM_mat = IM_trans['mat']
+    with open(trans_fp, 'wb') as trans:
+        np.savez_compressed(trans, data=IM_mat.data, indices=IM_mat.indices,
+                            indptr=IM_mat.indptr, shape=IM_mat.shape,
+                            val=IM_trans['val'], sw_id=IM_trans['sw_id'],
+                            mb_id=IM_trans['mb_id'], hash=ms_hsh)
+
+
+def trans_load(trans_fp):
+
+    with np.load(trans_fp) as trans:
+        IM_mat = scipy.sparse.csr_matrix(
+            (trans['data'], trans['indices'], trans['indptr']),
+            shape=tuple(trans['shape']))
+        ms_hsh = str(trans['hash']) if 'hash' in trans.files else ''
+        return {'mat': IM_mat, 'val': trans['val'], 'sw_id': trans['sw_id'],
+                'mb_id': trans['mb_id'], 'hash': ms_hsh}
+
+
+# ******************************************************************************
+# Define function to apply sparse translation to MERIT values
+# ******************************************************************************
+# ZV_mb_val: values of MERIT reaches, either one per reach (MERIT) or one per
+#            time step and reach (time x MERIT)
+# Returns overlap-weighted values of SWORD reaches, (SWORD) or (time x SWORD)
+def trans_app(IM_trans, ZV_mb_val):
+
+    ZV_mb_val = np.asarray(ZV_mb_val)
+
+    if ZV_mb_val.ndim == 1:
+        return IM_trans['mat'].dot(ZV_mb_val)
+
+    return IM_trans['mat'].dot(ZV_mb_val.T).T
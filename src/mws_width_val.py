@@ -5,7 +5,11 @@
 
 # Purpose:
 # Given uncorrected MeanDRS rivers, SWORD reaches, and MERIT-SWORD translations,
-# compare MeanDRS estimated river widths to SWORD GRWL widths
+# compare MeanDRS estimated river widths to SWORD GRWL widths. MeanDRS widths
+# are averaged over each SWORD reach with a sparse translation (see
+# mws_trans.py), which can optionally be saved and reused. Optionally,
+# validation statistics of the region can also be written (see mws_stats.py)
+# so that they can be merged across regions without reading validation files.
 
 # Author:
 # Jeffrey Wade, Cedric H. David, 2025
@@ -18,7 +22,8 @@ import os
 import pandas as pd
 import numpy as np
 import fiona
-import xarray as xr
+import mws_stats
+import mws_trans
 
 
 # ******************************************************************************
@@ -28,14 +33,17 @@ import xarray as xr
 # 2 - riv_uncor_shp
 # 3 - sword_shp
 # 4 - val_out
+# 5 - ms_npz (optional, sparse translation saved on first use and reused, or
+#     'no_ms_npz')
+# 6 - sts_npz (optional, validation statistics of the region)
 
 
 # ******************************************************************************
 # Get command line arguments
 # ******************************************************************************
 IS_arg = len(sys.argv)
-if IS_arg != 5:
-    print('ERROR - 4 arguments must be used')
+if (IS_arg < 5) or (IS_arg > 7):
+    print('ERROR - 4 to 6 arguments must be used')
     raise SystemExit(22)
 
 ms_nc = sys.argv[1]
@@ -43,6 +51,16 @@ riv_uncor_shp = sys.argv[2]
 sword_shp = sys.argv[3]
 val_out = sys.argv[4]
 
+# Allow option of saving and reusing the sparse translation
+ms_npz = None
+if IS_arg >= 6 and sys.argv[5] != 'no_ms_npz':
+    ms_npz = sys.argv[5]
+
+# Allow option of writing validation statistics
+sts_npz = None
+if IS_arg == 7:
+    sts_npz = sys.argv[6]
+
 
 # ******************************************************************************
 # Check if files/folders exist
@@ -102,8 +120,7 @@ riv_sword = fiona.open(sword_shp, 'r')
 # ------------------------------------------------------------------------------
 # MERIT-SWORD
 # ------------------------------------------------------------------------------
-# Read translations
-ms_df = xr.open_dataset(ms_nc).to_dataframe()
+# Translations are only read for the SWORD reaches of sword_shp (see below)
 
 
 # ******************************************************************************
@@ -113,15 +130,18 @@ print('Retrieving GRWL river widths from SWORD')
 # ------------------------------------------------------------------------------
 # Calculate river width from mean discharge in each region
 # ------------------------------------------------------------------------------
-# Initialize dictionary to store widths
-m_wid = {}
+# Initialize lists to store COMIDs and widths
+m_id = []
+m_wid = []
 
 # Loop through river reaches
 for riv_fea in riv_uncor:
 
     # Estimate mean river width by Moody & Troutman, 2002
-    m_wid[riv_fea['properties']['COMID']] = \
-        np.round(7.2*(riv_fea['properties']['meanQ']**0.5), 5)
+    m_id.append(riv_fea['properties']['COMID'])
+    m_wid.append(np.round(7.2*(riv_fea['properties']['meanQ']**0.5), 5))
+
+m_wid = np.array(m_wid)
 
 # ------------------------------------------------------------------------------
 # Retrieve river width from SWORD
@@ -137,59 +157,47 @@ for riv_fea in riv_sword:
         riv_fea['properties']['width']
 
 # Retrieve unique SWORD reaches
-sw_rch = sw_wid.keys()
+sw_rch = np.array(list(sw_wid.keys()))
+sw_wid = np.array(list(sw_wid.values()))
 
 
 # ******************************************************************************
 # Pair MeanDRS and GRWL widths using MERIT-SWORD
 # ******************************************************************************
 print('Compare GRWL and MeanDRS widths')
-# Initialize dataframe to store width comparisons
-wid_df = pd.DataFrame(0., index=sw_rch, columns=["sw_wid", "m_wid"])
-
-# Loop through SWORD reaches
-for rch in sw_wid.keys():
-
-    # Retrieve most overlapping MERIT reaches for each SWORD reach
-    ms_trans = ms_df.loc[rch]
-
-    # Retrieve sum of overlapping lengths
-    overlap_sum = np.sum(ms_trans.iloc[40:])
-
-    # If overlap_sum equals 0, skip to next reach
-    if overlap_sum == 0:
-        continue
-
-    # If reach has no valid translation, skip to next reach
-    if ms_trans.mb_1 == 0:
-        continue
-
-    # Initialize value to store weighted MeanDRS widths
-    m_wid_weight = 0
-
-    # Loop through valid translations and their corresponding partial lens
-    for j in range(0, len(ms_trans)):
-
-        # Retrieve translation
-        trans_j = ms_trans.iloc[j]
-
-        # If no valid translation, exit loop
-        if trans_j <= 0:
-            break
-
-        # If reaches are from different regions, skip comparison
-        if int(str(int(trans_j))[:2]) != int(str(rch)[:2]):
-            break
-
-        # Retrieve weighting frac of SWORD reach corresponding to MB reach
-        weight = ms_trans.iloc[j + 40] / overlap_sum
+# ------------------------------------------------------------------------------
+# Build or load sparse translation from MERIT to SWORD reaches
+# ------------------------------------------------------------------------------
+IM_trans = None
+
+# Reuse saved translation if it was built from the same translation file and
+# for the same reaches
+if ms_npz is not None:
+    ms_hsh = mws_trans.trans_hsh(ms_nc)
+
+if ms_npz is not None and os.path.isfile(ms_npz):
+    IM_trans = mws_trans.trans_load(ms_npz)
+    if not (IM_trans['hash'] == ms_hsh and
+            np.array_equal(IM_trans['sw_id'], sw_rch) and
+            np.array_equal(IM_trans['mb_id'], m_id)):
+        IM_trans = None
+
+if IM_trans is None:
+    # Most overlapping MERIT reaches and their overlapping lengths
+    IM_ms_id, ZM_ms_len = mws_trans.trans_read(ms_nc, sw_rch)
+    IM_trans = mws_trans.trans_bld(IM_ms_id, ZM_ms_len, sw_rch, m_id)
+    if ms_npz is not None:
+        mws_trans.trans_save(IM_trans, ms_npz, ms_hsh)
 
-        # Add weighted MeanDRS width
-        m_wid_weight += weight * m_wid[trans_j]
+# ------------------------------------------------------------------------------
+# Compute weighted MeanDRS widths
+# ------------------------------------------------------------------------------
+m_wid_weight = mws_trans.trans_app(IM_trans, m_wid)
+BV_val = IM_trans['val']
 
-    # Add weighted MeanDRS width and GRWL width to dataframe
-    wid_df.loc[rch, 'sw_wid'] = sw_wid[rch]
-    wid_df.loc[rch, 'm_wid'] = m_wid_weight
+# Store weighted MeanDRS width and GRWL width of compared reaches
+wid_df = pd.DataFrame({'sw_wid': np.where(BV_val, sw_wid, 0.),
+                       'm_wid': m_wid_weight}, index=sw_rch)
 
 # Remove rows without valid translations
 wid_df = wid_df.loc[~((wid_df["sw_wid"] == 0) & (wid_df["m_wid"] == 0))]
@@ -205,3 +213,8 @@ wid_df_t1 = wid_df.iloc[sw_type == 1, :]
 print('Writing to file')
 # Write to CSV
 wid_df_t1.to_csv(val_out, index=False)
+
+# Write validation statistics
+if sts_npz is not None:
+    IM_sts = mws_stats.sts_val(wid_df_t1.m_wid, wid_df_t1.sw_wid)
+    mws_stats.sts_save(IM_sts, sts_npz)
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# ******************************************************************************
+# tst_bch.py
+# ******************************************************************************
+
+# Purpose:
+# Given a text file listing stages of the pipeline (one per line: name of
+# stage, mws_*.py script, and its arguments, with lines continued by a
+# backslash as in the test scripts), run each stage on its fixed inputs and
+# measure its wall time, CPU time (user and system, including the processes it
+# starts) and peak resident set size. Stages run in order from the folder of
+# the text file, each in a separate Python process, and can be repeated, in
+# which case the median times and the largest peak memory are kept. Results
+# are appended to a csv file that stores the history of all benchmark runs,
+# and are compared, stage by stage, to the latest previous run on the same
+# host, so that regressions and improvements are quantified.
+
+# Author:
+# Jeffrey Wade, Cedric H. David, 2025
+
+
+# ******************************************************************************
+# Import Python modules
+# ******************************************************************************
+import sys
+import os
+import datetime
+import platform
+import shlex
+import subprocess
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+
+# ******************************************************************************
+# Declaration of variables (given as command line arguments)
+# ******************************************************************************
+# 1 - bch_txt
+# 2 - bch_csv
+# 3 - IS_rep (optional, number of repetitions of each stage, 1 by default)
+# 4 - ZS_thr (optional, relative change reported as a regression or an
+#     improvement, 0.1 by default)
+
+
+# ******************************************************************************
+# Get command line arguments
+# ******************************************************************************
+IS_arg = len(sys.argv)
+if (IS_arg < 3) or (IS_arg > 5):
+    print('ERROR - 2 to 4 arguments must be used')
+    raise SystemExit(22)
+
+bch_txt = sys.argv[1]
+bch_csv = sys.argv[2]
+
+# Allow option of repeating stages
+IS_rep = 1
+if IS_arg >= 4:
+    IS_rep = int(sys.argv[3])
+
+# Allow option of setting the relative change that is reported
+ZS_thr = 0.1
+if IS_arg == 5:
+    ZS_thr = float(sys.argv[4])
+
+
+# ******************************************************************************
+# Check if files exist
+# ******************************************************************************
+try:
+    with open(bch_txt) as file:
+        pass
+except IOError:
+    print('ERROR - Unable to open '+bch_txt)
+    raise SystemExit(22)
+
+if IS_rep < 1:
+    print('ERROR - The number of repetitions must be at least 1')
+    raise SystemExit(22)
+
+
+# ******************************************************************************
+# Declaration of variables
+# ******************************************************************************
+# Stages are run from the folder of the text file, and write to a folder of
+# benchmark outputs whose subfolders are created as needed
+bch_dir = os.path.dirname(os.path.abspath(bch_txt))
+bch_out = '../output_bench/'
+
+# Measurements stored for each stage
+IV_bch_var = ['wall_s', 'cpu_s', 'rss_mb']
+
+# Identification of this run
+bch_run = datetime.datetime.now(datetime.timezone.utc)                        \
+    .strftime('%Y-%m-%dT%H:%M:%SZ')
+bch_hst = platform.node()
+
+
+# ******************************************************************************
+# Define function to run and measure a stage
+# ******************************************************************************
+# Resource usage is that of the stage process and all processes it waited for;
+# peak resident set size is given in kilobytes on Linux
+def bch_stg(bch_cmd):
+
+    bch_env = dict(os.environ, MPLBACKEND='Agg')
+    with tempfile.TemporaryFile(mode='w+') as bch_log:
+        ZS_beg = time.perf_counter()
+        bch_prc = subprocess.Popen([sys.executable] + bch_cmd, cwd=bch_dir,
+                                   env=bch_env, stdout=bch_log,
+                                   stderr=subprocess.STDOUT)
+        _, IS_sts, bch_use = os.wait4(bch_prc.pid, 0)
+        ZS_wal = time.perf_counter() - ZS_beg
+        bch_prc.returncode = os.waitstatus_to_exitcode(IS_sts)
+
+        bch_log.seek(0)
+        return bch_prc.returncode, bch_log.read(),                            \
+            [ZS_wal, bch_use.ru_utime + bch_use.ru_stime,
+             bch_use.ru_maxrss / 1024]
+
+
+# ******************************************************************************
+# Define function to get the current commit
+# ******************************************************************************
+def bch_git():
+
+    try:
+        bch_res = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                 cwd=bch_dir, stdout=subprocess.PIPE,
+                                 stderr=subprocess.DEVNULL,
+                                 universal_newlines=True)
+    except OSError:
+        return 'unknown'
+
+    if bch_res.returncode != 0:
+        return 'unknown'
+
+    return bch_res.stdout.strip()
+
+
+# ******************************************************************************
+# Read files
+# ******************************************************************************
+print('- Reading files')
+# ------------------------------------------------------------------------------
+# Stages, joining continued lines and ignoring blank lines and comments
+# ------------------------------------------------------------------------------
+IM_bch_cmd = {}
+with open(bch_txt) as bch_fl:
+    bch_ln_all = bch_fl.read().replace('\\\n', ' ').splitlines()
+
+for bch_ln in bch_ln_all:
+    bch_cmd = shlex.split(bch_ln, comments=True)
+    if len(bch_cmd) == 0:
+        continue
+    if len(bch_cmd) < 2:
+        print('ERROR - No script given for stage '+bch_cmd[0])
+        raise SystemExit(22)
+    if bch_cmd[0] in IM_bch_cmd:
+        print('ERROR - Stage '+bch_cmd[0]+' is given more than once')
+        raise SystemExit(22)
+    if not os.path.isfile(os.path.join(bch_dir, bch_cmd[1])):
+        print('ERROR - Unable to open '+bch_cmd[1])
+        raise SystemExit(22)
+    IM_bch_cmd[bch_cmd[0]] = bch_cmd[1:]
+
+# ------------------------------------------------------------------------------
+# History of previous runs
+# ------------------------------------------------------------------------------
+if os.path.isfile(bch_csv):
+    bch_his = pd.read_csv(bch_csv, dtype={'run': str, 'commit': str,
+                                          'host': str, 'stage': str})
+else:
+    bch_his = pd.DataFrame(columns=['run', 'commit', 'host', 'stage'] +
+                           IV_bch_var)
+
+
+# ******************************************************************************
+# Run stages
+# ******************************************************************************
+print('- Running '+str(len(IM_bch_cmd))+' stage(s), '+str(IS_rep) +
+      ' time(s) each')
+IM_bch_res = {}
+for bch_stg_nm, bch_cmd in IM_bch_cmd.items():
+
+    # Create folders of benchmark outputs
+    for bch_arg in bch_cmd[1:]:
+        if bch_arg.startswith(bch_out):
+            bch_arg_dir = bch_arg if bch_arg.endswith('/') else               \
+                os.path.dirname(bch_arg)
+            os.makedirs(os.path.join(bch_dir, bch_arg_dir), exist_ok=True)
+
+    ZM_bch = np.zeros((IS_rep, len(IV_bch_var)))
+    for JS_rep in range(IS_rep):
+        IS_ret, bch_log, ZM_bch[JS_rep, :] = bch_stg(bch_cmd)
+        if IS_ret != 0:
+            print('ERROR - Failed run: '+bch_stg_nm)
+            print(bch_log)
+            raise SystemExit(IS_ret)
+
+    IM_bch_res[bch_stg_nm] = [np.median(ZM_bch[:, 0]),
+                              np.median(ZM_bch[:, 1]),
+                              np.max(ZM_bch[:, 2])]
+    print('  . '+bch_stg_nm.ljust(24) +
+          '{:10.2f} s wall {:10.2f} s cpu {:10.1f} MB'
+          .format(*IM_bch_res[bch_stg_nm]))
+
+
+# ******************************************************************************
+# Compare to the latest previous run on the same host
+# ******************************************************************************
+bch_prv = bch_his[bch_his['host'] == bch_hst]
+if len(bch_prv) > 0:
+    bch_prv_run = bch_prv['run'].iloc[-1]
+    bch_prv = bch_prv[bch_prv['run'] == bch_prv_run].set_index('stage')
+    print('- Comparing to run '+bch_prv_run+' (commit ' +
+          str(bch_prv['commit'].iloc[0])+')')
+
+    for bch_stg_nm in IM_bch_res:
+        if bch_stg_nm not in bch_prv.index:
+            print('  . '+bch_stg_nm.ljust(24)+'new stage')
+            continue
+
+        bch_cmp = []
+        for j, bch_var in enumerate(IV_bch_var):
+            ZS_prv = float(bch_prv.loc[bch_stg_nm, bch_var])
+            ZS_rat = IM_bch_res[bch_stg_nm][j] / ZS_prv if ZS_prv > 0 else   \
+                np.nan
+            bch_tag = ''
+            if ZS_rat > 1 + ZS_thr:
+                bch_tag = ' (regression)'
+            elif ZS_rat < 1 - ZS_thr:
+                bch_tag = ' (improvement)'
+            bch_cmp.append(bch_var+' x{:.2f}'.format(ZS_rat)+bch_tag)
+
+        print('  . '+bch_stg_nm.ljust(24)+', '.join(bch_cmp))
+else:
+    print('- No previous run on host '+bch_hst)
+
+
+# ******************************************************************************
+# Store results
+# ******************************************************************************
+print('- Storing results')
+bch_new = pd.DataFrame([[bch_run, bch_git(), bch_hst, x] + IM_bch_res[x]
+                        for x in IM_bch_res],
+                       columns=['run', 'commit', 'host', 'stage'] +
+                       IV_bch_var)
+bch_new.to_csv(bch_csv, mode='a', index=False,
+               header=not os.path.isfile(bch_csv))
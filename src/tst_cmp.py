@@ -5,7 +5,12 @@
 
 # Purpose:
 # Given an original file and a file generating during testing,
-# ensure that files are identical.
+# ensure that files are identical. Files that are not identical byte for byte
+# are compared by content: csv files row by row, netCDF files variable by
+# variable, and shapefiles feature by feature (attributes and geometries). All
+# are read in chunks and compared numerically within relative and absolute
+# tolerances, stopping at the first difference, which is reported. Other files
+# must be identical.
 
 # Author:
 # Jeffrey Wade, Cedric H. David, 2025
@@ -16,6 +21,9 @@
 # ******************************************************************************
 import sys
 import filecmp
+import os
+import numpy as np
+import pandas as pd
 
 
 # ******************************************************************************
@@ -23,19 +31,30 @@ import filecmp
 # ******************************************************************************
 # 1 - file_org
 # 2 - file_tst
+# 3 - ZS_rtol (optional, relative tolerance, 1e-12 by default)
+# 4 - ZS_atol (optional, absolute tolerance, 0 by default)
 
 
 # ******************************************************************************
 # Get command line arguments
 # ******************************************************************************
 IS_arg = len(sys.argv)
-if IS_arg != 3:
-    print('ERROR - 2 arguments must be used')
+if (IS_arg < 3) or (IS_arg > 5):
+    print('ERROR - 2 to 4 arguments must be used')
     raise SystemExit(22)
 
 file_org = sys.argv[1]
 file_tst = sys.argv[2]
 
+# Allow option of setting tolerances of numerical comparisons
+ZS_rtol = 1e-12
+if IS_arg >= 4:
+    ZS_rtol = float(sys.argv[3])
+
+ZS_atol = 0.
+if IS_arg == 5:
+    ZS_atol = float(sys.argv[4])
+
 
 # ******************************************************************************
 # Check if files exist
@@ -55,6 +74,207 @@ except IOError:
     raise SystemExit(22)
 
 
+# ******************************************************************************
+# Declaration of variables
+# ******************************************************************************
+# Number of csv rows or netCDF values along the first dimension read at once
+IS_chk = 100000
+
+
+# ******************************************************************************
+# Define function to compare arrays
+# ******************************************************************************
+# Numbers are compared within tolerances (NaNs are equal), other values must
+# be equal. Returns the index of the first difference, or None
+def cmp_arr(ZV_org, ZV_tst):
+
+    ZV_org = np.asarray(ZV_org)
+    ZV_tst = np.asarray(ZV_tst)
+
+    if ZV_org.dtype.kind in 'iufb' and ZV_tst.dtype.kind in 'iufb':
+        BV_eq = np.isclose(ZV_org.astype(np.float64),
+                           ZV_tst.astype(np.float64), rtol=ZS_rtol,
+                           atol=ZS_atol, equal_nan=True)
+    else:
+        BV_eq = ZV_org.astype(str) == ZV_tst.astype(str)
+
+    if np.all(BV_eq):
+        return None
+
+    return np.unravel_index(np.argmin(BV_eq), BV_eq.shape)
+
+
+# ******************************************************************************
+# Define function to compare csv files
+# ******************************************************************************
+# Returns a description of the first difference, or None
+def cmp_csv(file_org, file_tst):
+
+    try:
+        csv_org = pd.read_csv(file_org, chunksize=IS_chk,
+                              float_precision='round_trip')
+    except pd.errors.EmptyDataError:
+        return 'original file is empty'
+
+    try:
+        csv_tst = pd.read_csv(file_tst, chunksize=IS_chk,
+                              float_precision='round_trip')
+    except pd.errors.EmptyDataError:
+        return 'test file is empty'
+
+    IS_row = 0
+    for chk_org in csv_org:
+        chk_tst = next(csv_tst, None)
+
+        if chk_tst is None:
+            return 'test file has fewer rows, from row '+str(IS_row)
+        if list(chk_org.columns) != list(chk_tst.columns):
+            return 'columns differ: '+str(list(chk_org.columns))+' vs ' +     \
+                str(list(chk_tst.columns))
+        if len(chk_org) != len(chk_tst):
+            return 'files have different numbers of rows, from row ' +        \
+                str(IS_row+min(len(chk_org), len(chk_tst)))
+
+        for col in chk_org.columns:
+            JS_dif = cmp_arr(chk_org[col].to_numpy(), chk_tst[col].to_numpy())
+            if JS_dif is not None:
+                return 'row '+str(IS_row+JS_dif[0])+', column '+str(col) +    \
+                    ': '+str(chk_org[col].iloc[JS_dif[0]])+' vs ' +           \
+                    str(chk_tst[col].iloc[JS_dif[0]])
+
+        IS_row = IS_row + len(chk_org)
+
+    if next(csv_tst, None) is not None:
+        return 'test file has more rows, from row '+str(IS_row)
+
+    return None
+
+
+# ******************************************************************************
+# Define function to compare netCDF files
+# ******************************************************************************
+# Dimensions, variables and their values are compared, attributes are not
+def cmp_nc(file_org, file_tst):
+
+    import netCDF4 as nc
+
+    with nc.Dataset(file_org, 'r') as nc_org,                                 \
+            nc.Dataset(file_tst, 'r') as nc_tst:
+
+        IM_dim_org = {x: len(y) for x, y in nc_org.dimensions.items()}
+        IM_dim_tst = {x: len(y) for x, y in nc_tst.dimensions.items()}
+        if IM_dim_org != IM_dim_tst:
+            return 'dimensions differ: '+str(IM_dim_org)+' vs ' +             \
+                str(IM_dim_tst)
+
+        if list(nc_org.variables) != list(nc_tst.variables):
+            return 'variables differ: '+str(list(nc_org.variables))+' vs ' +  \
+                str(list(nc_tst.variables))
+
+        for var in nc_org.variables:
+            var_org = nc_org.variables[var]
+            var_tst = nc_tst.variables[var]
+            if var_org.dimensions != var_tst.dimensions:
+                return 'dimensions of '+var+' differ'
+
+            # Scalars are read at once, other variables in chunks along their
+            # first dimension
+            IS_len = var_org.shape[0] if len(var_org.shape) > 0 else 1
+            for JS_beg in range(0, IS_len, IS_chk):
+                if len(var_org.shape) > 0:
+                    ZV_org = var_org[JS_beg:JS_beg+IS_chk]
+                    ZV_tst = var_tst[JS_beg:JS_beg+IS_chk]
+                else:
+                    ZV_org = var_org[...]
+                    ZV_tst = var_tst[...]
+                ZV_org = cmp_msk(ZV_org)
+                ZV_tst = cmp_msk(ZV_tst)
+
+                JS_dif = cmp_arr(ZV_org, ZV_tst)
+                if JS_dif is not None:
+                    IV_idx = tuple(int(x) for x in JS_dif)
+                    if len(IV_idx) > 0:
+                        IV_idx = (JS_beg+IV_idx[0],) + IV_idx[1:]
+                    return 'variable '+var+', index '+str(IV_idx)+': ' +      \
+                        str(ZV_org[JS_dif])+' vs '+str(ZV_tst[JS_dif])
+
+    return None
+
+
+# Define function to replace masked (fill) values of a netCDF variable by NaN
+def cmp_msk(ZV_var):
+
+    if np.ma.is_masked(ZV_var):
+        return np.ma.filled(ZV_var.astype(np.float64), np.nan)
+
+    return np.ma.getdata(ZV_var)
+
+
+# ******************************************************************************
+# Define function to compare shapefiles
+# ******************************************************************************
+# Features are read one at a time, geometries are compared by type and
+# coordinates
+def cmp_shp(file_org, file_tst):
+
+    import fiona
+
+    with fiona.open(file_org, 'r') as shp_org,                                \
+            fiona.open(file_tst, 'r') as shp_tst:
+
+        if dict(shp_org.schema['properties']) !=                              \
+                dict(shp_tst.schema['properties']) or                         \
+                shp_org.schema['geometry'] != shp_tst.schema['geometry']:
+            return 'schemas differ: '+str(shp_org.schema)+' vs ' +            \
+                str(shp_tst.schema)
+
+        if len(shp_org) != len(shp_tst):
+            return 'files have different numbers of features: ' +             \
+                str(len(shp_org))+' vs '+str(len(shp_tst))
+
+        for JS_fea, (fea_org, fea_tst) in enumerate(zip(shp_org, shp_tst)):
+
+            for att in shp_org.schema['properties']:
+                val_org = fea_org['properties'][att]
+                val_tst = fea_tst['properties'][att]
+                if cmp_arr([np.nan if val_org is None else val_org],
+                           [np.nan if val_tst is None else val_tst])        \
+                        is not None:
+                    return 'feature '+str(JS_fea)+', attribute '+att+': ' +   \
+                        str(val_org)+' vs '+str(val_tst)
+
+            geo_org = fea_org['geometry']
+            geo_tst = fea_tst['geometry']
+            if (geo_org is None) != (geo_tst is None):
+                return 'feature '+str(JS_fea)+': geometries differ'
+            if geo_org is None:
+                continue
+
+            if geo_org['type'] != geo_tst['type']:
+                return 'feature '+str(JS_fea)+': geometry types differ'
+
+            # Coordinates of all parts are flattened, with numbers of
+            # vertices of parts
+            ZV_org = cmp_crd(geo_org['coordinates'])
+            ZV_tst = cmp_crd(geo_tst['coordinates'])
+            if ZV_org.shape != ZV_tst.shape or                                \
+                    cmp_arr(ZV_org, ZV_tst) is not None:
+                return 'feature '+str(JS_fea)+': coordinates differ'
+
+    return None
+
+
+# Define function to flatten nested coordinates of a geometry, with the number
+# of vertices of each part
+def cmp_crd(crd):
+
+    if len(crd) > 0 and np.isscalar(crd[0]):
+        return np.asarray(crd, dtype=np.float64)
+
+    ZV_crd = [cmp_crd(x) for x in crd]
+    return np.hstack([[len(x) for x in ZV_crd]] + ZV_crd)
+
+
 # ******************************************************************************
 # Compare original and test files
 # ******************************************************************************
@@ -62,9 +282,33 @@ except IOError:
 # Clear cache
 filecmp.clear_cache()
 
-# If files are not identical, raise error
-if not (filecmp.cmp(file_org, file_tst, shallow=False)):
+# Files that are identical byte for byte are not read, attributes of
+# shapefiles are in their dBASE file
+file_ext = os.path.splitext(file_org)[1].lower()
+file_all = [(file_org, file_tst)]
+if file_ext == '.shp':
+    file_all.append((os.path.splitext(file_org)[0]+'.dbf',
+                     os.path.splitext(file_tst)[0]+'.dbf'))
+
+if all(os.path.isfile(x) and os.path.isfile(y) and
+       filecmp.cmp(x, y, shallow=False) for x, y in file_all):
+    print('Comparison successful!')
+    raise SystemExit(0)
+
+# Otherwise, compare content of known formats
+if file_ext == '.csv':
+    cmp_dif = cmp_csv(file_org, file_tst)
+elif file_ext == '.nc':
+    cmp_dif = cmp_nc(file_org, file_tst)
+elif file_ext == '.shp':
+    cmp_dif = cmp_shp(file_org, file_tst)
+else:
+    cmp_dif = 'files are not identical'
+
+# If files differ, raise error
+if cmp_dif is not None:
     print('ERROR - Comparison failed.')
+    print(cmp_dif)
     raise SystemExit(99)
 else:
     print('Comparison successful!')
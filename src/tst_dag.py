@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# ******************************************************************************
+# tst_dag.py
+# ******************************************************************************
+
+# Purpose:
+# Given one of the tst_pub_repr*.sh test scripts, run its unit tests
+# concurrently while respecting the dependencies between them. Unit tests keep
+# the numbering of the script (commented unit tests are not counted), and each
+# is run by the script itself with its unit number. A unit test depends on an
+# earlier one if it refers to a file in a folder of ../output_test/ created
+# by the earlier unit test (and not by itself). As with the test scripts, the
+# first and last unit tests can be selected, in which case dependencies on
+# unit tests outside of the selection are assumed to be met.
+
+# Author:
+# Jeffrey Wade, Cedric H. David, 2025
+
+
+# ******************************************************************************
+# Import Python modules
+# ******************************************************************************
+import sys
+import os
+import re
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+
+# ******************************************************************************
+# Declaration of variables (given as command line arguments)
+# ******************************************************************************
+# 1 - tst_sh
+# 2 - IS_cpu
+# 3 - fst (optional, first unit test, 1 by default)
+# 4 - lst (optional, last unit test, fst if only fst is given, last unit test
+#     of the script otherwise)
+
+
+# ******************************************************************************
+# Get command line arguments
+# ******************************************************************************
+IS_arg = len(sys.argv)
+if (IS_arg < 3) or (IS_arg > 5):
+    print('ERROR - 2 to 4 arguments must be used')
+    raise SystemExit(22)
+
+tst_sh = sys.argv[1]
+IS_cpu = int(sys.argv[2])
+
+# Allow option of selecting unit tests, as in test scripts
+fst = None
+lst = None
+if IS_arg >= 4:
+    fst = int(sys.argv[3])
+    lst = fst
+if IS_arg == 5:
+    lst = int(sys.argv[4])
+
+
+# ******************************************************************************
+# Check if files exist
+# ******************************************************************************
+try:
+    with open(tst_sh) as file:
+        pass
+except IOError:
+    print('ERROR - Unable to open ' + tst_sh)
+    raise SystemExit(22)
+
+
+# ******************************************************************************
+# Declaration of variables
+# ******************************************************************************
+# Line starting a unit test, and folder of test outputs
+tst_unt = 'unt=$((unt+1))'
+tst_out = '../output_test/'
+
+# Test scripts are run from their folder
+tst_dir = os.path.dirname(os.path.abspath(tst_sh))
+tst_fl = os.path.basename(tst_sh)
+
+
+# ******************************************************************************
+# Define function to run a unit test
+# ******************************************************************************
+def tst_run(unt):
+
+    tst_res = subprocess.run(['bash', tst_fl, str(unt), str(unt)],
+                             cwd=tst_dir, stdout=subprocess.PIPE,
+                             stderr=subprocess.STDOUT, universal_newlines=True)
+
+    return tst_res.returncode, tst_res.stdout
+
+
+# ******************************************************************************
+# Read file
+# ******************************************************************************
+print('- Reading test script')
+# ------------------------------------------------------------------------------
+# Split active (uncommented) lines of unit tests
+# ------------------------------------------------------------------------------
+IM_unt_ln = {}
+with open(tst_sh) as tst:
+    unt = 0
+    for tst_ln in tst:
+        tst_ln = tst_ln.strip()
+        if tst_ln == tst_unt:
+            unt = unt + 1
+            IM_unt_ln[unt] = []
+        elif unt > 0 and not tst_ln.startswith('#'):
+            IM_unt_ln[unt].append(tst_ln)
+
+tot = len(IM_unt_ln)
+if fst is None:
+    fst = 1
+    lst = tot
+
+if not (1 <= fst <= lst <= tot):
+    print('ERROR - Unit tests must be between 1 and '+str(tot))
+    raise SystemExit(22)
+
+# ------------------------------------------------------------------------------
+# Folders created by, and test outputs referred to by, each unit test
+# ------------------------------------------------------------------------------
+IM_unt_dir = {}
+IM_unt_ref = {}
+for unt in IM_unt_ln:
+    IM_unt_dir[unt] = set()
+    IM_unt_ref[unt] = set()
+    for tst_ln in IM_unt_ln[unt]:
+        tst_mkd = re.match(r'mkdir -p "?([^"\s]+)"?', tst_ln)
+        if tst_mkd is not None:
+            IM_unt_dir[unt].add(os.path.normpath(tst_mkd.group(1)))
+        for tst_ref in re.findall(re.escape(tst_out)+r'[^\s"\\]*', tst_ln):
+            IM_unt_ref[unt].add(os.path.normpath(tst_ref))
+
+
+# ******************************************************************************
+# Build dependencies between unit tests
+# ******************************************************************************
+print('- Building dependencies between unit tests')
+
+
+def tst_in(tst_ref, IV_dir):
+
+    return any(tst_ref == x or tst_ref.startswith(x+os.sep) for x in IV_dir)
+
+
+IM_unt_dep = {}
+for unt in range(fst, lst+1):
+    IV_ref = [x for x in IM_unt_ref[unt] if not tst_in(x, IM_unt_dir[unt])]
+    IM_unt_dep[unt] = set(x for x in range(fst, unt) if
+                          any(tst_in(y, IM_unt_dir[x]) for y in IV_ref))
+    if len(IM_unt_dep[unt]) > 0:
+        print('  . Unit test '+str(unt)+' depends on: ' +
+              ', '.join(str(x) for x in sorted(IM_unt_dep[unt])))
+
+
+# ******************************************************************************
+# Run unit tests
+# ******************************************************************************
+print('- Running unit tests '+str(fst)+'-'+str(lst)+' on '+str(IS_cpu) +
+      ' process(es)')
+print('********************')
+IV_don = set()
+IM_fut = {}
+IS_err = 0
+with ProcessPoolExecutor(max_workers=IS_cpu,
+                         mp_context=multiprocessing.get_context('fork')
+                         ) as executor:
+
+    IV_tdo = list(range(fst, lst+1))
+    while len(IV_tdo) > 0 or len(IM_fut) > 0:
+
+        # Start all unit tests whose dependencies are met, unless one failed
+        if IS_err == 0:
+            for unt in [x for x in IV_tdo if IM_unt_dep[x] <= IV_don]:
+                IM_fut[executor.submit(tst_run, unt)] = unt
+                IV_tdo.remove(unt)
+        elif len(IM_fut) == 0:
+            break
+
+        # Report unit tests as they finish
+        fut_don, _ = wait(IM_fut, return_when=FIRST_COMPLETED)
+        for fut in fut_don:
+            unt = IM_fut.pop(fut)
+            IS_ret, tst_log = fut.result()
+            print(tst_log, end='')
+            if IS_ret == 0:
+                IV_don.add(unt)
+            elif IS_err == 0:
+                IS_err = IS_ret
+                print('Failed unit test: '+str(unt), file=sys.stderr)
+
+if IS_err != 0:
+    raise SystemExit(IS_err)
+
+print('All '+str(lst-fst+1)+' unit test(s) successful')
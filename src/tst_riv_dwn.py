@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# ******************************************************************************
+# tst_riv_dwn.py
+# ******************************************************************************
+
+# Purpose:
+# Given a RAPID routing connectivity csv and MeanDRS river reaches of the same
+# region, relate each reach to the outlet it drains to, and compute the number
+# of reaches and the river length (km) along its downstream path to the outlet,
+# by walking downstream from each reach one reach at a time. The output has the
+# format of mws_riv_dwn.py and is used as a reference to test it.
+
+# Author:
+# Jeffrey Wade, Cedric H. David, 2025
+
+# ******************************************************************************
+# Import packages
+# ******************************************************************************
+import csv
+import fiona
+import numpy as np
+import pandas as pd
+import sys
+
+
+# ******************************************************************************
+# Declaration of variables (given as command line arguments)
+# ******************************************************************************
+# 1 - con_csv
+# 2 - riv_shp
+# 3 - dwn_out
+
+
+# ******************************************************************************
+# Get command line arguments
+# ******************************************************************************
+IS_arg = len(sys.argv)
+if IS_arg != 4:
+    print('ERROR - 3 arguments must be used')
+    raise SystemExit(22)
+
+con_csv = sys.argv[1]
+riv_shp = sys.argv[2]
+dwn_out = sys.argv[3]
+
+
+# ******************************************************************************
+# Check if files exist
+# ******************************************************************************
+try:
+    with open(con_csv) as file:
+        pass
+except IOError:
+    print('ERROR - Unable to open '+con_csv)
+    raise SystemExit(22)
+
+try:
+    with open(riv_shp) as file:
+        pass
+except IOError:
+    print('ERROR - Unable to open '+riv_shp)
+    raise SystemExit(22)
+
+
+# ******************************************************************************
+# Read files
+# ******************************************************************************
+print('- Reading files')
+# ------------------------------------------------------------------------------
+# Next downstream reach of each reach of the connectivity file
+# ------------------------------------------------------------------------------
+IV_riv_tot_id = []
+IM_riv_dwn = {}
+with open(con_csv, 'r') as csvfile:
+    csvreader = csv.reader(csvfile)
+    for row in csvreader:
+        IV_riv_tot_id.append(int(row[0]))
+        IM_riv_dwn[int(row[0])] = int(row[1])
+
+# ------------------------------------------------------------------------------
+# Length of reaches
+# ------------------------------------------------------------------------------
+IM_riv_len = {}
+with fiona.open(riv_shp, 'r') as riv:
+    for riv_fea in riv:
+        IM_riv_len[riv_fea['properties']['COMID']] =                          \
+            riv_fea['properties']['lengthkm']
+
+
+# ******************************************************************************
+# Walk downstream from each reach to its outlet
+# ******************************************************************************
+print('- Walking downstream from each reach')
+IS_riv_tot = len(IV_riv_tot_id)
+IV_out_id = []
+IV_riv_nb = []
+ZV_riv_len = []
+
+for IS_riv_id in IV_riv_tot_id:
+    IS_out_id = IS_riv_id
+    IS_nb = 1
+    ZS_len = IM_riv_len.get(IS_riv_id, 0.)
+    while IM_riv_dwn[IS_out_id] in IM_riv_dwn:
+        IS_out_id = IM_riv_dwn[IS_out_id]
+        IS_nb = IS_nb+1
+        ZS_len = ZS_len+IM_riv_len.get(IS_out_id, 0.)
+        if IS_nb > IS_riv_tot:
+            print('ERROR - Connectivity contains a loop')
+            raise SystemExit(22)
+
+    IV_out_id.append(IS_out_id)
+    IV_riv_nb.append(IS_nb)
+    ZV_riv_len.append(ZS_len)
+
+
+# ******************************************************************************
+# Write to file
+# ******************************************************************************
+print('- Writing to file')
+dwn_df = pd.DataFrame({'COMID': IV_riv_tot_id,
+                       'outlet_id': IV_out_id,
+                       'riv_nb': IV_riv_nb,
+                       'lengthkm': np.round(ZV_riv_len, 5)})
+
+dwn_df.to_csv(dwn_out, index=False)
@@ -43,7 +43,7 @@ num_files=$(ls ../input/MeanDRS/Qout_COR/* | wc -l)
 #Select which unit tests to perform based on inputs to this shell script
 #*****************************************************************************
 #Perform all unit tests if no options are given
-tot=33
+tot=35
 if [ "$#" = "0" ]; then
      fst=1
      lst=$tot
@@ -1947,3 +1947,120 @@ fi
 #echo "Success"
 #echo "********************"
 #fi
+
+
+#*****************************************************************************
+#Relate reaches to their outlet and downstream path
+#*****************************************************************************
+unt=$((unt+1))
+if (("$unt" >= "$fst")) && (("$unt" <= "$lst")) ; then
+echo "Running unit test $unt/$tot"
+
+run_file=tmp_run_$unt.txt
+cmp_file=tmp_cmp_$unt.txt
+
+mkdir -p "../output_test/riv_dwn"
+
+echo "- Relating reaches to their outlet and downstream path"
+../src/mws_riv_dwn.py                                                          \
+    ../input/MeanDRS/rapid_connect/rapid_connect_pfaf_${pfaf}.csv              \
+    ../input/MeanDRS/riv_UNCOR/riv_pfaf_${pfaf}_MERIT_Hydro_v07_Basins_v01_GLDAS_ENS.shp\
+    ../output_test/riv_dwn/riv_dwn_pfaf_${pfaf}.csv                            \
+    > $run_file
+x=$? && if [ $x -gt 0 ] ; then echo "Failed run: $run_file" >&2 ; exit $x ; fi
+
+echo "- Walking downstream from each reach"
+../src/tst_riv_dwn.py                                                          \
+    ../input/MeanDRS/rapid_connect/rapid_connect_pfaf_${pfaf}.csv              \
+    ../input/MeanDRS/riv_UNCOR/riv_pfaf_${pfaf}_MERIT_Hydro_v07_Basins_v01_GLDAS_ENS.shp\
+    ../output_test/riv_dwn/riv_dwn_pfaf_${pfaf}_walk.csv                       \
+    > $run_file
+x=$? && if [ $x -gt 0 ] ; then echo "Failed run: $run_file" >&2 ; exit $x ; fi
+
+echo "- Comparing downstream path file (.csv)"
+../src/tst_cmp.py                                                              \
+    ../output_test/riv_dwn/riv_dwn_pfaf_${pfaf}_walk.csv                       \
+    ../output_test/riv_dwn/riv_dwn_pfaf_${pfaf}.csv                            \
+    1e-12                                                                      \
+    1e-5                                                                       \
+    > $cmp_file
+x=$? && if [ $x -gt 0 ] ; then echo "Failed comparison: $cmp_file" >&2 ; exit $x ; fi
+
+echo "- Checking that a loop in connectivity is rejected"
+awk -F, -v OFS=, '!f && $3 > 0 {$2 = $4 ; f = 1} {print}'                      \
+    ../input/MeanDRS/rapid_connect/rapid_connect_pfaf_${pfaf}.csv              \
+    > ../output_test/riv_dwn/rapid_connect_pfaf_${pfaf}_loop.csv
+../src/mws_riv_dwn.py                                                          \
+    ../output_test/riv_dwn/rapid_connect_pfaf_${pfaf}_loop.csv                 \
+    ../input/MeanDRS/riv_UNCOR/riv_pfaf_${pfaf}_MERIT_Hydro_v07_Basins_v01_GLDAS_ENS.shp\
+    ../output_test/riv_dwn/riv_dwn_pfaf_${pfaf}_loop.csv                       \
+    > $run_file
+x=$? && if [ $x -ne 22 ] ; then echo "Failed run: $run_file" >&2 ; exit 1 ; fi
+
+rm -f $run_file
+rm -f $cmp_file
+echo "Success"
+echo "********************"
+fi
+
+
+#*****************************************************************************
+#Identify narrow rivers draining to the coast: several width thresholds
+#*****************************************************************************
+unt=$((unt+1))
+if (("$unt" >= "$fst")) && (("$unt" <= "$lst")) ; then
+echo "Running unit test $unt/$tot"
+
+run_file=tmp_run_$unt.txt
+cmp_file=tmp_cmp_$unt.txt
+
+mkdir -p "../output_test/smallest_rivs_thr/one"
+mkdir -p "../output_test/smallest_rivs_thr/two"
+
+echo "- Identifying narrow coastal rivers: one width threshold"
+../src/mws_smallest_rivs.py                                                    \
+    ../input/MeanDRS/rapid_connect/rapid_connect_pfaf_${pfaf}.csv              \
+    ../output/riv_coast/cor/riv_coast_pfaf_${pfaf}_COR.shp                     \
+    ../output/riv_coast/uncor/riv_coast_pfaf_${pfaf}_UNCOR.shp                 \
+    ../input/MeanDRS/riv_COR/riv_pfaf_${pfaf}_MERIT_Hydro_v07_Basins_v01_GLDAS_COR.shp\
+    ../input/MeanDRS/riv_UNCOR/riv_pfaf_${pfaf}_MERIT_Hydro_v07_Basins_v01_GLDAS_ENS.shp\
+    ../input/MB/cat/cat_pfaf_${pfaf}_MERIT_Hydro_v07_Basins_v01.shp            \
+    ../output_test/smallest_rivs_thr/one/riv_pfaf_${pfaf}_small.shp            \
+    ../output_test/smallest_rivs_thr/one/cat_pfaf_${pfaf}_small.shp            \
+    100                                                                        \
+    > $run_file
+x=$? && if [ $x -gt 0 ] ; then echo "Failed run: $run_file" >&2 ; exit $x ; fi
+
+echo "- Identifying narrow coastal rivers: two width thresholds"
+../src/mws_smallest_rivs.py                                                    \
+    ../input/MeanDRS/rapid_connect/rapid_connect_pfaf_${pfaf}.csv              \
+    ../output/riv_coast/cor/riv_coast_pfaf_${pfaf}_COR.shp                     \
+    ../output/riv_coast/uncor/riv_coast_pfaf_${pfaf}_UNCOR.shp                 \
+    ../input/MeanDRS/riv_COR/riv_pfaf_${pfaf}_MERIT_Hydro_v07_Basins_v01_GLDAS_COR.shp\
+    ../input/MeanDRS/riv_UNCOR/riv_pfaf_${pfaf}_MERIT_Hydro_v07_Basins_v01_GLDAS_ENS.shp\
+    ../input/MB/cat/cat_pfaf_${pfaf}_MERIT_Hydro_v07_Basins_v01.shp            \
+    ../output_test/smallest_rivs_thr/two/riv_pfaf_${pfaf}_small.shp            \
+    ../output_test/smallest_rivs_thr/two/cat_pfaf_${pfaf}_small.shp            \
+    200,100.0                                                                  \
+    > $run_file
+x=$? && if [ $x -gt 0 ] ; then echo "Failed run: $run_file" >&2 ; exit $x ; fi
+
+echo "- Comparing traced reaches of first threshold (.shp)"
+../src/tst_cmp.py                                                              \
+    ../output_test/smallest_rivs_thr/one/riv_pfaf_${pfaf}_small_100m.shp       \
+    ../output_test/smallest_rivs_thr/two/riv_pfaf_${pfaf}_small_100m.shp       \
+    > $cmp_file
+x=$? && if [ $x -gt 0 ] ; then echo "Failed comparison: $cmp_file" >&2 ; exit $x ; fi
+
+echo "- Comparing traced catchments of first threshold (.shp)"
+../src/tst_cmp.py                                                              \
+    ../output_test/smallest_rivs_thr/one/cat_pfaf_${pfaf}_small_100m.shp       \
+    ../output_test/smallest_rivs_thr/two/cat_pfaf_${pfaf}_small_100m.shp       \
+    > $cmp_file
+x=$? && if [ $x -gt 0 ] ; then echo "Failed comparison: $cmp_file" >&2 ; exit $x ; fi
+
+rm -f $run_file
+rm -f $cmp_file
+echo "Success"
+echo "********************"
+fi
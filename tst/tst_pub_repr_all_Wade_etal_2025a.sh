@@ -31,7 +31,7 @@ echo "********************"
 #Select which unit tests to perform based on inputs to this shell script
 #*****************************************************************************
 #Perform all unit tests if no options are given
-tot=33
+tot=35
 if [ "$#" = "0" ]; then
      fst=1
      lst=$tot
@@ -129,19 +129,6 @@ pfaf=(
       91
       )
       
-rank=(
-      10
-      9
-      8
-      7
-      6
-      5
-      4
-      3
-      2
-      1
-      )
-
 reg=(
      "af"
      "af"
@@ -796,24 +783,18 @@ mkdir -p "../output_test/largest_rivs/cat"
 mkdir -p "../output_test/largest_rivs/riv"
 
 echo "- Tracing contributing reaches and catchments of largest river basins"
-for ((i = 0; i < ${#rank[@]}; i++)); do
-
-    echo $i
-
-    ../src/mws_largest_rivs_trace.py                                           \
-        ../output_test/largest_rivs/csv/Q_df_top10.csv                         \
-        ../input/MeanDRS/rapid_connect/                                        \
-        ../input/MeanDRS/riv_COR/                                              \
-        ../input/MeanDRS/riv_UNCOR/                                            \
-        ../input/MB/cat/                                                       \
-        ${rank[i]}                                                             \
-        ../output_test/largest_rivs/riv/riv_top10_n${rank[i]}.shp              \
-        ../output_test/largest_rivs/cat/cat_top10_n${rank[i]}.shp              \
-        ../output_test/largest_rivs/cat/cat_dis_top10_n${rank[i]}.shp          \
-        > $run_file
-    x=$? && if [ $x -gt 0 ] ; then echo "Failed run: $run_file" >&2 ; exit $x ; fi
-        
-done
+../src/mws_largest_rivs_trace.py                                               \
+    ../output_test/largest_rivs/csv/Q_df_top10.csv                             \
+    ../input/MeanDRS/rapid_connect/                                            \
+    ../input/MeanDRS/riv_COR/                                                  \
+    ../input/MeanDRS/riv_UNCOR/                                                \
+    ../input/MB/cat/                                                           \
+    1,2,3,4,5,6,7,8,9,10                                                       \
+    ../output_test/largest_rivs/riv/riv_top10.shp                              \
+    ../output_test/largest_rivs/cat/cat_top10.shp                              \
+    ../output_test/largest_rivs/cat/cat_dis_top10.shp                          \
+    > $run_file
+x=$? && if [ $x -gt 0 ] ; then echo "Failed run: $run_file" >&2 ; exit $x ; fi
 
 rm -f $run_file
 echo "Success"
@@ -1329,3 +1310,230 @@ rm -f $cmp_file
 echo "Success"
 echo "********************"
 fi
+
+
+#*****************************************************************************
+#Build global table of reach attributes and use it for ranking and summaries
+#*****************************************************************************
+unt=$((unt+1))
+if (("$unt" >= "$fst")) && (("$unt" <= "$lst")) ; then
+echo "Running unit test $unt/$tot"
+
+run_file=tmp_run_$unt.txt
+cmp_file=tmp_cmp_$unt.txt
+
+mkdir -p "../output_test/riv_tbl"
+
+echo "- Building global table of reach attributes"
+../src/mws_riv_tbl.py                                                          \
+    ../input/MeanDRS/riv_COR/                                                  \
+    ../input/MeanDRS/riv_UNCOR/                                                \
+    ../output_test/riv_coast/uncor/                                            \
+    ../output_test/riv_tbl/riv_tbl.nc                                          \
+    > $run_file
+x=$? && if [ $x -gt 0 ] ; then echo "Failed run: $run_file" >&2 ; exit $x ; fi
+
+echo "- Identifying 10 largest river basins from table"
+../src/mws_largest_rivs_rank.py                                                \
+    ../output_test/riv_tbl/riv_tbl.nc                                          \
+    ../output_test/riv_coast/uncor/                                            \
+    ../input/MeanDRS/riv_COR/                                                  \
+    ../input/MeanDRS/riv_UNCOR/                                                \
+    ../input/MB/cat/                                                           \
+    ../output_test/riv_tbl/Q_df_top10_tbl.csv                                  \
+    > $run_file
+x=$? && if [ $x -gt 0 ] ; then echo "Failed run: $run_file" >&2 ; exit $x ; fi
+
+echo "- Comparing largest river basin ranking file from table (.csv)"
+../src/tst_cmp.py                                                              \
+    ../output_test/largest_rivs/csv/Q_df_top10.csv                             \
+    ../output_test/riv_tbl/Q_df_top10_tbl.csv                                  \
+    > $cmp_file
+x=$? && if [ $x -gt 0 ] ; then echo "Failed comparison: $cmp_file" >&2 ; exit $x ; fi
+
+echo "- Computing global summary for narrow coastal rivers from table"
+../src/mws_smallest_rivs_global.py                                             \
+    ../output_test/riv_tbl/riv_tbl.nc                                          \
+    ../output_test/riv_coast/uncor/                                            \
+    ../output_test/smallest_rivs/cat/                                          \
+    ../output_test/riv_tbl/Q_wid_100m_tbl.csv                                  \
+    ../output_test/riv_tbl/cat_dis_global_small_100m_tbl.shp                   \
+    no_gl_dis                                                                  \
+    > $run_file
+x=$? && if [ $x -gt 0 ] ; then echo "Failed run: $run_file" >&2 ; exit $x ; fi
+
+echo "- Comparing narrow coastal rivers summary file from table (.csv)"
+../src/tst_cmp.py                                                              \
+    ../output_test/smallest_rivs/csv/Q_wid_100m.csv                            \
+    ../output_test/riv_tbl/Q_wid_100m_tbl.csv                                  \
+    > $cmp_file
+x=$? && if [ $x -gt 0 ] ; then echo "Failed comparison: $cmp_file" >&2 ; exit $x ; fi
+
+rm -f $run_file
+rm -f $cmp_file
+echo "Success"
+echo "********************"
+fi
+
+
+#*****************************************************************************
+#Consolidate global summaries and produce supplemental visualizations from it
+#*****************************************************************************
+unt=$((unt+1))
+if (("$unt" >= "$fst")) && (("$unt" <= "$lst")) ; then
+echo "Running unit test $unt/$tot"
+
+run_file=tmp_run_$unt.txt
+cmp_file=tmp_cmp_$unt.txt
+
+mkdir -p "../output_test/sum_all"
+
+echo "- Computing consolidated global summary of all datasets"
+../src/mws_summary_all.py                                                      \
+    ../output_test/sum_all/sum_all.csv                                         \
+    Qout_COR                                                                   \
+    ../output_test/Qout_rivwidth/                                              \
+    Qout_VIC                                                                   \
+    ../output_test/rivwidth_sens/Qout_rivwidth_VIC/                            \
+    Qout_CLSM                                                                  \
+    ../output_test/rivwidth_sens/Qout_rivwidth_CLSM/                           \
+    Qout_NOAH                                                                  \
+    ../output_test/rivwidth_sens/Qout_rivwidth_NOAH/                           \
+    Qout_ENS                                                                   \
+    ../output_test/cor_sens/Qout_rivwidth_ENS/                                 \
+    V_nrm_COR                                                                  \
+    ../output_test/V_rivwidth_nrm/                                             \
+    V_nrm_VIC                                                                  \
+    ../output_test/rivwidth_sens/V_rivwidth_nrm_VIC/                           \
+    V_nrm_CLSM                                                                 \
+    ../output_test/rivwidth_sens/V_rivwidth_nrm_CLSM/                          \
+    V_nrm_NOAH                                                                 \
+    ../output_test/rivwidth_sens/V_rivwidth_nrm_NOAH/                          \
+    V_nrm_ENS                                                                  \
+    ../output_test/cor_sens/V_rivwidth_nrm_ENS/                                \
+    > $run_file
+x=$? && if [ $x -gt 0 ] ; then echo "Failed run: $run_file" >&2 ; exit $x ; fi
+
+echo "- Producing Supplemental Figures Part 1 from global summaries (.png)"
+../src/mws_plots_supp1.py                                                      \
+    ../output_test/global_summary/Qout_rivwidth/Qout_rivwidth_prop.csv         \
+    ../output_test/global_summary/Qout_rivwidth/Qout_range_prop.csv            \
+    ../output_test/rivwidth_sens/global_summary_VIC/Qout_rivwidth/Qout_rivwidth_prop_VIC_wid.csv\
+    ../output_test/rivwidth_sens/global_summary_VIC/Qout_rivwidth/Qout_range_prop_VIC_wid.csv\
+    ../output_test/rivwidth_sens/global_summary_CLSM/Qout_rivwidth/Qout_rivwidth_prop_CLSM_wid.csv\
+    ../output_test/rivwidth_sens/global_summary_CLSM/Qout_rivwidth/Qout_range_prop_CLSM_wid.csv\
+    ../output_test/rivwidth_sens/global_summary_NOAH/Qout_rivwidth/Qout_rivwidth_prop_NOAH_wid.csv\
+    ../output_test/rivwidth_sens/global_summary_NOAH/Qout_rivwidth/Qout_range_prop_NOAH_wid.csv\
+    ../output_test/global_summary/V_rivwidth_nrm/V_rivwidth_nrm_prop.csv       \
+    ../output_test/global_summary/V_rivwidth_nrm/V_nrm_range_prop.csv          \
+    ../output_test/rivwidth_sens/global_summary_VIC/V_rivwidth_nrm/V_rivwidth_nrm_prop_VIC_wid.csv\
+    ../output_test/rivwidth_sens/global_summary_VIC/V_rivwidth_nrm/V_nrm_range_prop_VIC_wid.csv\
+    ../output_test/rivwidth_sens/global_summary_CLSM/V_rivwidth_nrm/V_rivwidth_nrm_prop_CLSM_wid.csv\
+    ../output_test/rivwidth_sens/global_summary_CLSM/V_rivwidth_nrm/V_nrm_range_prop_CLSM_wid.csv\
+    ../output_test/rivwidth_sens/global_summary_NOAH/V_rivwidth_nrm/V_rivwidth_nrm_prop_NOAH_wid.csv\
+    ../output_test/rivwidth_sens/global_summary_NOAH/V_rivwidth_nrm/V_nrm_range_prop_NOAH_wid.csv\
+    ../output_test/sum_all/figure_s1_gs.png                                    \
+    ../output_test/sum_all/figure_s2_gs.png                                    \
+    ../output_test/sum_all/figure_s3_gs.png                                    \
+    ../output_test/sum_all/figure_s4_gs.png                                    \
+    > $run_file
+x=$? && if [ $x -gt 0 ] ; then echo "Failed run: $run_file" >&2 ; exit $x ; fi
+
+echo "- Producing Supplemental Figures Part 1 from consolidated summary (.png)"
+../src/mws_plots_supp1.py                                                      \
+    ../output_test/sum_all/sum_all.csv                                         \
+    ../output_test/sum_all/figure_s1_sa.png                                    \
+    ../output_test/sum_all/figure_s2_sa.png                                    \
+    ../output_test/sum_all/figure_s3_sa.png                                    \
+    ../output_test/sum_all/figure_s4_sa.png                                    \
+    > $run_file
+x=$? && if [ $x -gt 0 ] ; then echo "Failed run: $run_file" >&2 ; exit $x ; fi
+
+echo "- Producing Supplemental Figures Part 2 from global summaries (.png)"
+../src/mws_plots_supp2.py                                                      \
+    ../output_test/cor_sens/global_summary_ENS/Qout_rivwidth/Qout_rivwidth_prop_ENS.csv\
+    ../output_test/cor_sens/global_summary_ENS/Qout_rivwidth/Qout_range_prop_ENS.csv\
+    ../output_test/cor_sens/global_summary_ENS/V_rivwidth_nrm/V_rivwidth_nrm_prop_ENS.csv\
+    ../output_test/cor_sens/global_summary_ENS/V_rivwidth_nrm/V_nrm_range_prop_ENS.csv\
+    ../output_test/global_summary/Qout_rivwidth/Qout_rivwidth_prop.csv         \
+    ../output_test/global_summary/Qout_rivwidth/Qout_range_prop.csv            \
+    ../output_test/global_summary/V_rivwidth_nrm/V_rivwidth_nrm_prop.csv       \
+    ../output_test/global_summary/V_rivwidth_nrm/V_nrm_range_prop.csv          \
+    ../output_test/sum_all/figure_s5_gs.png                                    \
+    ../output_test/sum_all/figure_s6_gs.png                                    \
+    ../output_test/sum_all/figure_s7_gs.png                                    \
+    ../output_test/sum_all/figure_s8_gs.png                                    \
+    > $run_file
+x=$? && if [ $x -gt 0 ] ; then echo "Failed run: $run_file" >&2 ; exit $x ; fi
+
+echo "- Producing Supplemental Figures Part 2 from consolidated summary (.png)"
+../src/mws_plots_supp2.py                                                      \
+    ../output_test/sum_all/sum_all.csv                                         \
+    ../output_test/sum_all/figure_s5_sa.png                                    \
+    ../output_test/sum_all/figure_s6_sa.png                                    \
+    ../output_test/sum_all/figure_s7_sa.png                                    \
+    ../output_test/sum_all/figure_s8_sa.png                                    \
+    > $run_file
+x=$? && if [ $x -gt 0 ] ; then echo "Failed run: $run_file" >&2 ; exit $x ; fi
+
+echo "- Comparing Supplemental Figure 1 from consolidated summary (.png)"
+../src/tst_cmp.py                                                              \
+    ../output_test/sum_all/figure_s1_gs.png                                    \
+    ../output_test/sum_all/figure_s1_sa.png                                    \
+    > $cmp_file
+x=$? && if [ $x -gt 0 ] ; then echo "Failed comparison: $cmp_file" >&2 ; exit $x ; fi
+
+echo "- Comparing Supplemental Figure 2 from consolidated summary (.png)"
+../src/tst_cmp.py                                                              \
+    ../output_test/sum_all/figure_s2_gs.png                                    \
+    ../output_test/sum_all/figure_s2_sa.png                                    \
+    > $cmp_file
+x=$? && if [ $x -gt 0 ] ; then echo "Failed comparison: $cmp_file" >&2 ; exit $x ; fi
+
+echo "- Comparing Supplemental Figure 3 from consolidated summary (.png)"
+../src/tst_cmp.py                                                              \
+    ../output_test/sum_all/figure_s3_gs.png                                    \
+    ../output_test/sum_all/figure_s3_sa.png                                    \
+    > $cmp_file
+x=$? && if [ $x -gt 0 ] ; then echo "Failed comparison: $cmp_file" >&2 ; exit $x ; fi
+
+echo "- Comparing Supplemental Figure 4 from consolidated summary (.png)"
+../src/tst_cmp.py                                                              \
+    ../output_test/sum_all/figure_s4_gs.png                                    \
+    ../output_test/sum_all/figure_s4_sa.png                                    \
+    > $cmp_file
+x=$? && if [ $x -gt 0 ] ; then echo "Failed comparison: $cmp_file" >&2 ; exit $x ; fi
+
+echo "- Comparing Supplemental Figure 5 from consolidated summary (.png)"
+../src/tst_cmp.py                                                              \
+    ../output_test/sum_all/figure_s5_gs.png                                    \
+    ../output_test/sum_all/figure_s5_sa.png                                    \
+    > $cmp_file
+x=$? && if [ $x -gt 0 ] ; then echo "Failed comparison: $cmp_file" >&2 ; exit $x ; fi
+
+echo "- Comparing Supplemental Figure 6 from consolidated summary (.png)"
+../src/tst_cmp.py                                                              \
+    ../output_test/sum_all/figure_s6_gs.png                                    \
+    ../output_test/sum_all/figure_s6_sa.png                                    \
+    > $cmp_file
+x=$? && if [ $x -gt 0 ] ; then echo "Failed comparison: $cmp_file" >&2 ; exit $x ; fi
+
+echo "- Comparing Supplemental Figure 7 from consolidated summary (.png)"
+../src/tst_cmp.py                                                              \
+    ../output_test/sum_all/figure_s7_gs.png                                    \
+    ../output_test/sum_all/figure_s7_sa.png                                    \
+    > $cmp_file
+x=$? && if [ $x -gt 0 ] ; then echo "Failed comparison: $cmp_file" >&2 ; exit $x ; fi
+
+echo "- Comparing Supplemental Figure 8 from consolidated summary (.png)"
+../src/tst_cmp.py                                                              \
+    ../output_test/sum_all/figure_s8_gs.png                                    \
+    ../output_test/sum_all/figure_s8_sa.png                                    \
+    > $cmp_file
+x=$? && if [ $x -gt 0 ] ; then echo "Failed comparison: $cmp_file" >&2 ; exit $x ; fi
+
+rm -f $run_file
+rm -f $cmp_file
+echo "Success"
+echo "********************"
+fi